@@ -1,6 +1,8 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
 from alembic import context
 
 from app.core.config import settings
@@ -9,10 +11,13 @@ from app.models.models import Recipe, Tag, Ingredient  # noqa: F401 - load model
 
 config = context.config
 
-# Override sqlalchemy.url from settings
+# Override sqlalchemy.url from settings (used for offline SQL generation)
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL_SYNC)
 
-if config.config_file_name is not None:
+# A connection passed in by app.core.migrations; that caller owns logging
+external_connection = config.attributes.get("connection")
+
+if config.config_file_name is not None and external_connection is None:
     fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
@@ -30,16 +35,25 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    # The app's asyncpg driver, so no separate sync driver is needed
+    connectable = create_async_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
 def run_migrations_online() -> None:
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+    if external_connection is not None:
+        do_run_migrations(external_connection)
+    else:
+        asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
@@ -0,0 +1,37 @@
+"""add GIN index on ingredient name characters for short queries
+
+Revision ID: a7d3e9f2c4b6
+Revises: f4a1c9e7b2d8
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f2c4b6'
+down_revision: Union[str, None] = 'f4a1c9e7b2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1-2 character queries get no trigrams; see app.models.models.INGREDIENT_NAME_CHARS
+    with op.get_context().autocommit_block():
+        drop_invalid_index('ix_ingredients_name_chars')
+        op.create_index(
+            'ix_ingredients_name_chars', 'ingredients', [sa.text("regexp_split_to_array(lower(name), '')")],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_ingredients_name_chars', table_name='ingredients',
+            postgresql_concurrently=True, if_exists=True,
+        )
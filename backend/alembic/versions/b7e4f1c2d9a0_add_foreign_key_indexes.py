@@ -0,0 +1,49 @@
+"""add indexes on foreign key columns
+
+Revision ID: b7e4f1c2d9a0
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migrations import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4f1c2d9a0'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs; index names follow SQLAlchemy's ix_<table>_<column>
+# convention so they match what `index=True` produces with create_all.
+FK_INDEXES = [
+    ('recipe_ingredients', 'recipe_id'),
+    ('recipe_ingredients', 'ingredient_id'),
+    ('recipe_images', 'recipe_id'),
+    ('recipe_tags', 'tag_id'),
+    ('tags', 'category_id'),
+    ('ingredients', 'category_id'),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table, column in FK_INDEXES:
+            drop_invalid_index(f'ix_{table}_{column}')
+            op.create_index(
+                f'ix_{table}_{column}', table, [column],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, column in FK_INDEXES:
+            op.drop_index(
+                f'ix_{table}_{column}', table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
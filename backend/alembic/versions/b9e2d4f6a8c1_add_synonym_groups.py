@@ -0,0 +1,33 @@
+"""add synonym_groups table
+
+Revision ID: b9e2d4f6a8c1
+Revises: a7d3e9f2c4b6
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e2d4f6a8c1'
+down_revision: Union[str, None] = 'a7d3e9f2c4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'synonym_groups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('words', postgresql.ARRAY(sa.String(100)), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index('ix_synonym_groups_id', 'synonym_groups', ['id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_synonym_groups_id', table_name='synonym_groups')
+    op.drop_table('synonym_groups')
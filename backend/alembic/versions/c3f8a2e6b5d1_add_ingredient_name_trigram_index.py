@@ -0,0 +1,37 @@
+"""add pg_trgm GIN index on ingredient names
+
+Revision ID: c3f8a2e6b5d1
+Revises: b7e4f1c2d9a0
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migrations import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a2e6b5d1'
+down_revision: Union[str, None] = 'b7e4f1c2d9a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        drop_invalid_index('ix_ingredients_name_trgm')
+        op.create_index(
+            'ix_ingredients_name_trgm', 'ingredients', ['name'],
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_ingredients_name_trgm', table_name='ingredients',
+            postgresql_concurrently=True, if_exists=True,
+        )
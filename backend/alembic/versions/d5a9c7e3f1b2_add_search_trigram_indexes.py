@@ -0,0 +1,41 @@
+"""add pg_trgm GIN indexes on recipe and tag names for fallback search
+
+Revision ID: d5a9c7e3f1b2
+Revises: c3f8a2e6b5d1
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.migrations import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9c7e3f1b2'
+down_revision: Union[str, None] = 'c3f8a2e6b5d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = [
+    ('ix_recipes_name_trgm', 'recipes'),
+    ('ix_tags_name_trgm', 'tags'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, table in TRGM_INDEXES:
+            drop_invalid_index(name)
+            op.create_index(
+                name, table, ['name'],
+                postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in TRGM_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
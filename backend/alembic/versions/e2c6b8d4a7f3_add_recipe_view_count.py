@@ -0,0 +1,28 @@
+"""add view_count to recipes
+
+Revision ID: e2c6b8d4a7f3
+Revises: d5a9c7e3f1b2
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c6b8d4a7f3'
+down_revision: Union[str, None] = 'd5a9c7e3f1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'recipes', sa.Column('view_count', sa.Integer(), nullable=False, server_default='0'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('recipes', 'view_count')
@@ -0,0 +1,34 @@
+"""add admin_credentials table
+
+Revision ID: f4a1c9e7b2d8
+Revises: e2c6b8d4a7f3
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a1c9e7b2d8'
+down_revision: Union[str, None] = 'e2c6b8d4a7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'admin_credentials',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('username', sa.String(50), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index('ix_admin_credentials_id', 'admin_credentials', ['id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_admin_credentials_id', table_name='admin_credentials')
+    op.drop_table('admin_credentials')
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.core.auth import verify_token
+from app.core.database import engine, read_engine, pool_stats
+from app.core import profiler
+from app.core.loop_monitor import loop_monitor
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(verify_token)])
+
+
+@router.get("/db/pool")
+async def db_pool_stats():
+    """Connection pool usage of the worker serving this request."""
+    return {
+        "primary": pool_stats(engine),
+        "replica": pool_stats(read_engine) if read_engine is not engine else None,
+    }
+
+
+@router.get("/loop")
+async def event_loop_stats():
+    """Event-loop lag and the worst loop-blocking call sites of the worker serving this request.
+
+    Empty unless LOOP_MONITOR_ENABLED is set.
+    """
+    return loop_monitor.stats()
+
+
+@router.delete("/loop", status_code=204)
+async def reset_event_loop_stats():
+    """Clear this worker's offender table and max lag, e.g. after a deploy."""
+    loop_monitor.reset()
+
+
+@router.post("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=profiler.MAX_SECONDS),
+    hz: int = Query(profiler.DEFAULT_HZ, ge=1, le=profiler.MAX_HZ),
+):
+    """Sample every thread of the worker serving this request for `seconds`.
+
+    Returns collapsed stacks (text/plain) for flamegraph.pl or speedscope.
+    """
+    try:
+        sampler = await profiler.profile_for(seconds, hz)
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running in this worker")
+    return sampler.response()
+
+
+@router.post("/profile/next")
+async def profile_next_request(
+    request: Request,
+    route: str = Query(..., description="Route template, e.g. /api/recipes/{recipe_id}"),
+    method: str = Query("GET"),
+    timeout: float = Query(60, gt=0, le=600),
+    hz: int = Query(profiler.DEFAULT_HZ, ge=1, le=profiler.MAX_HZ),
+):
+    """Profile the next `method route` request this worker handles; collapsed stacks as above.
+
+    With several workers, only requests reaching the same worker are caught.
+    """
+    if not any(getattr(r, "path", None) == route for r in request.app.router.routes):
+        raise HTTPException(status_code=404, detail=f"No route {route}")
+    try:
+        sampler = await profiler.profile_next(method, route, timeout, hz)
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running in this worker")
+    except TimeoutError:
+        raise HTTPException(status_code=408, detail=f"No {method.upper()} {route} request within {timeout}s")
+    return sampler.response()
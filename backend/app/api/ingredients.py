@@ -1,15 +1,24 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func
+from sqlalchemy import Text, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import verify_token
-from app.models.models import Ingredient, RecipeIngredient, IngredientCategory
+from app.core.metrics import SEARCH_SYNC_FAILURES
+from app.models.models import INGREDIENT_NAME_CHARS, Ingredient, RecipeIngredient, IngredientCategory
 from app.schemas.ingredient import (
     IngredientCreate, IngredientUpdate, IngredientOut,
     IngredientCategoryCreate, IngredientCategoryOut,
 )
+from app.services.search import (
+    INDEX_NAME, INGREDIENT_INDEX, index_ingredient, remove_ingredient, reindex_recipes_with_ingredient,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/ingredients", tags=["ingredients"])
 
@@ -36,6 +45,15 @@ async def _pick_ingredient_color(db: AsyncSession) -> str:
     return INGREDIENT_CATEGORY_COLORS[(count or 0) % len(INGREDIENT_CATEGORY_COLORS)]
 
 
+def _sync_search_index(ing: Ingredient):
+    """Sync ingredient to the ingredient search index. Best-effort, log errors."""
+    try:
+        index_ingredient(ing)
+    except Exception as e:
+        SEARCH_SYNC_FAILURES.labels(INGREDIENT_INDEX).inc()
+        logger.warning(f"Failed to sync search index for ingredient {ing.id}: {e}")
+
+
 def _build_ingredient_out(ing: Ingredient) -> dict:
     """Build ingredient output with resolved category name."""
     return {
@@ -101,16 +119,44 @@ async def delete_ingredient_category(
     await db.commit()
 
 
+# pg_trgm extracts no trigram from a shorter pattern, so its index cannot narrow the match
+TRIGRAM_MIN_LENGTH = 3
+
+
+def name_search(stmt, q: str):
+    """Filter an ingredient select to names containing `q` (case-insensitive), best matches first.
+
+    Queries of TRIGRAM_MIN_LENGTH characters or more are served by the pg_trgm
+    GIN index. Shorter ones, like most ingredient names (鸡蛋, 番茄), are first
+    narrowed to names containing each of their characters, on the
+    INGREDIENT_NAME_CHARS index; otherwise they would read every row.
+    """
+    if not q:
+        return stmt.order_by(Ingredient.name)
+    stmt = stmt.where(Ingredient.name.icontains(q, autoescape=True))
+    if len(q) < TRIGRAM_MIN_LENGTH:
+        return stmt.where(INGREDIENT_NAME_CHARS.contains(literal(list(q.lower()), ARRAY(Text)))).order_by(
+            func.length(Ingredient.name), Ingredient.name,
+        )
+    return stmt.order_by(
+        func.similarity(Ingredient.name, q).desc(),
+        func.length(Ingredient.name),
+        Ingredient.name,
+    )
+
+
 # ============== Ingredients ==============
 
 @router.get("", response_model=list[IngredientOut])
 async def list_ingredients(
     q: str = Query("", description="Search keyword"),
-    db: AsyncSession = Depends(get_db),
+    limit: int | None = Query(None, ge=1, le=500, description="Max results, omit for all"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    stmt = select(Ingredient).options(selectinload(Ingredient.category_rel)).order_by(Ingredient.name)
-    if q:
-        stmt = stmt.where(Ingredient.name.ilike(f"%{q}%"))
+    """List ingredients, optionally matching `q` (see name_search)."""
+    stmt = name_search(select(Ingredient).options(selectinload(Ingredient.category_rel)), q.strip())
+    if limit is not None:
+        stmt = stmt.limit(limit)
     result = await db.execute(stmt)
     return [_build_ingredient_out(i) for i in result.scalars().all()]
 
@@ -125,6 +171,7 @@ async def create_ingredient(data: IngredientCreate, db: AsyncSession = Depends(g
         select(Ingredient).where(Ingredient.id == ing.id).options(selectinload(Ingredient.category_rel))
     )
     ing = result.scalars().first()
+    _sync_search_index(ing)
     return _build_ingredient_out(ing)
 
 
@@ -138,6 +185,12 @@ async def update_ingredient(
     ing = await db.get(Ingredient, ingredient_id)
     if not ing:
         raise HTTPException(status_code=404, detail="Ingredient not found")
+    # Recipe documents carry calories and main ingredient names (chosen by category)
+    recipes_stale = (
+        (data.name is not None and data.name != ing.name)
+        or (data.calorie is not None and data.calorie != ing.calorie)
+        or (data.category_id is not None and data.category_id != ing.category_id)
+    )
     if data.name is not None:
         ing.name = data.name
     if data.unit is not None:
@@ -152,6 +205,13 @@ async def update_ingredient(
         select(Ingredient).where(Ingredient.id == ingredient_id).options(selectinload(Ingredient.category_rel))
     )
     ing = result.scalars().first()
+    _sync_search_index(ing)
+    if recipes_stale:
+        try:
+            await reindex_recipes_with_ingredient(db, ingredient_id)
+        except Exception as e:
+            SEARCH_SYNC_FAILURES.labels(INDEX_NAME).inc()
+            logger.warning(f"Failed to re-index recipes using ingredient {ingredient_id}: {e}")
     return _build_ingredient_out(ing)
 
 
@@ -175,3 +235,8 @@ async def delete_ingredient(
         )
     await db.delete(ing)
     await db.commit()
+    try:
+        remove_ingredient(ingredient_id)
+    except Exception as e:
+        SEARCH_SYNC_FAILURES.labels(INGREDIENT_INDEX).inc()
+        logger.warning(f"Failed to remove ingredient {ingredient_id} from search index: {e}")
@@ -1,14 +1,17 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import verify_token
+from app.core.metrics import SEARCH_SYNC_FAILURES
 from app.models.models import Recipe, Tag, RecipeIngredient, Ingredient
 from app.schemas.recipe import RecipeCreate, RecipeUpdate, RecipeOut, RecipeListOut
-from app.services.search import index_recipe, remove_recipe
+from app.services.nutrition import recipe_calories
+from app.services.search import INDEX_NAME, index_recipe, remove_recipe, main_ingredient_names
+from app.services.views import view_counter
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +40,15 @@ def _build_ingredient_out(ri: RecipeIngredient) -> dict:
     }
 
 
-def _sync_search_index(recipe, tag_names: list[str], main_ingredients: list[str]):
+def _sync_search_index(recipe, tag_names: list[str], main_ingredients: list[str], calories: int = 0):
     """Sync recipe to MeiliSearch index. Best-effort, log errors."""
     try:
-        index_recipe(recipe.id, recipe.name, tag_names, main_ingredients)
+        index_recipe(
+            recipe.id, recipe.name, tag_names, main_ingredients, calories,
+            recipe.description, recipe.steps, recipe.tips, recipe.view_count or 0,
+        )
     except Exception as e:
+        SEARCH_SYNC_FAILURES.labels(INDEX_NAME).inc()
         logger.warning(f"Failed to sync search index for recipe {recipe.id}: {e}")
 
 
@@ -52,27 +59,13 @@ def _format_datetime(dt):
     return dt.isoformat()
 
 
-def _calc_calories(recipe) -> int:
-    """Calculate total calories for a recipe from its ingredients."""
-    total = 0.0
-    if hasattr(recipe, "recipe_ingredients"):
-        for ri in recipe.recipe_ingredients:
-            try:
-                amount = float(ri.amount) if ri.amount else 0
-            except (ValueError, TypeError):
-                amount = 0
-            cal = ri.ingredient.calorie if ri.ingredient and ri.ingredient.calorie else 0
-            total += amount * cal
-    return round(total)
-
-
 async def _build_recipe_list_out(recipe) -> dict:
     """Build recipe list output dict."""
     return {
         "id": recipe.id,
         "name": recipe.name,
         "description": recipe.description or "",
-        "calories": _calc_calories(recipe),
+        "calories": recipe_calories(recipe),
         "created_at": _format_datetime(recipe.created_at),
         "updated_at": _format_datetime(recipe.updated_at),
         "images": recipe.images,
@@ -99,8 +92,51 @@ _ingredient_load = (
 )
 
 
+async def load_recipe_cards(db: AsyncSession, recipe_ids: list[int]) -> list[dict]:
+    """Load card data for many recipes in one batched fetch, keeping the given order.
+
+    Ids that no longer exist (e.g. a stale search index) are skipped.
+    """
+    if not recipe_ids:
+        return []
+    result = await db.execute(
+        select(Recipe)
+        .where(Recipe.id.in_(recipe_ids))
+        .options(
+            selectinload(Recipe.images),
+            selectinload(Recipe.tags).selectinload(Tag.category_rel),
+            selectinload(Recipe.recipe_ingredients).selectinload(RecipeIngredient.ingredient),
+        )
+    )
+    recipes = {r.id: r for r in result.scalars().unique().all()}
+    cards = []
+    for rid in recipe_ids:
+        recipe = recipes.get(rid)
+        if recipe is None:
+            continue
+        cards.append({
+            "id": recipe.id,
+            "name": recipe.name,
+            "description": recipe.description or "",
+            "calories": recipe_calories(recipe),
+            "cover_image": recipe.images[0].image_path if recipe.images else None,
+            "tags": [_build_tag_brief(t) for t in recipe.tags],
+        })
+    return cards
+
+
+# list_recipes orderings: newest first, or most viewed first
+_LIST_ORDERS = {
+    "new": (Recipe.id.desc(),),
+    "popular": (Recipe.view_count.desc(), Recipe.id.desc()),
+}
+
+
 @router.get("", response_model=list[RecipeListOut])
-async def list_recipes(db: AsyncSession = Depends(get_db)):
+async def list_recipes(
+    sort: str = Query("new", pattern="^(new|popular)$", description="'new' or 'popular' (most viewed)"),
+    db: AsyncSession = Depends(get_read_db),
+):
     result = await db.execute(
         select(Recipe)
         .options(
@@ -108,14 +144,21 @@ async def list_recipes(db: AsyncSession = Depends(get_db)):
             selectinload(Recipe.tags).selectinload(Tag.category_rel),
             _ingredient_load,
         )
-        .order_by(Recipe.id.desc())
+        .order_by(*_LIST_ORDERS[sort])
     )
     recipes = result.scalars().unique().all()
     return [await _build_recipe_list_out(r) for r in recipes]
 
 
 @router.get("/{recipe_id}", response_model=RecipeOut)
-async def get_recipe(recipe_id: int, db: AsyncSession = Depends(get_db)):
+async def get_recipe(recipe_id: int, db: AsyncSession = Depends(get_read_db)):
+    recipe_out = await _load_recipe_out(recipe_id, db)
+    # Buffered, flushed in batches: no write on the read path
+    view_counter.record(recipe_id)
+    return recipe_out
+
+
+async def _load_recipe_out(recipe_id: int, db: AsyncSession) -> dict:
     result = await db.execute(
         select(Recipe)
         .where(Recipe.id == recipe_id)
@@ -176,16 +219,10 @@ async def create_recipe(data: RecipeCreate, db: AsyncSession = Depends(get_db),
         .options(_ingredient_load)
     )
     recipe_full = result.scalars().unique().first()
-    main_ingredients = []
-    if recipe_full:
-        main_cat_names = {"主料", "辅料"}
-        main_ingredients = [
-            ri.ingredient.name for ri in recipe_full.recipe_ingredients
-            if ri.ingredient and ri.ingredient.category_rel
-            and ri.ingredient.category_rel.name in main_cat_names
-        ]
-    _sync_search_index(recipe, tag_names, main_ingredients)
-    return await get_recipe(recipe.id, db)
+    main_ingredients = main_ingredient_names(recipe_full) if recipe_full else []
+    calories = recipe_calories(recipe_full) if recipe_full else 0
+    _sync_search_index(recipe, tag_names, main_ingredients, calories)
+    return await _load_recipe_out(recipe.id, db)
 
 
 @router.put("/{recipe_id}", response_model=RecipeOut)
@@ -246,14 +283,9 @@ async def update_recipe(
     recipe_full = result.scalars().unique().first()
     if recipe_full:
         tag_names = [t.name for t in recipe_full.tags]
-        main_cat_names = {"主料", "辅料"}
-        main_ingredients = [
-            ri.ingredient.name for ri in recipe_full.recipe_ingredients
-            if ri.ingredient and ri.ingredient.category_rel
-            and ri.ingredient.category_rel.name in main_cat_names
-        ]
-        _sync_search_index(recipe_full, tag_names, main_ingredients)
-    return await get_recipe(recipe_id, db)
+        main_ingredients = main_ingredient_names(recipe_full)
+        _sync_search_index(recipe_full, tag_names, main_ingredients, recipe_calories(recipe_full))
+    return await _load_recipe_out(recipe_id, db)
 
 
 @router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -266,4 +298,5 @@ async def delete_recipe(recipe_id: int, db: AsyncSession = Depends(get_db), _=De
     try:
         remove_recipe(recipe_id)
     except Exception as e:
+        SEARCH_SYNC_FAILURES.labels(INDEX_NAME).inc()
         logger.warning(f"Failed to remove recipe {recipe_id} from search index: {e}")
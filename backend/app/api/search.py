@@ -1,7 +1,19 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.recipes import load_recipe_cards
 from app.core.auth import verify_token
-from app.services.search import search_recipes, update_synonyms, get_synonyms, setup_index
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.schemas.search import SynonymGroup
+from app.services.search import (
+    INDEX_NAME, INGREDIENT_INDEX, TAG_INDEX, SUGGEST_MAX_LIMIT,
+    SearchFilters, SearchSetupError, search_with_fallback, multi_search_with_fallback, suggest_with_fallback, reindex_all,
+    update_synonyms, add_synonym_group, remove_synonym_group, get_synonyms, get_task,
+    setup_index, search_cache, get_index_version,
+)
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
@@ -10,36 +22,163 @@ router = APIRouter(prefix="/api/search", tags=["search"])
 async def search(
     q: str = Query("", description="Search keyword"),
     tag: str = Query("", description="Tag filter, e.g. '川菜'"),
+    tags: list[str] = Query([], description="Tag filters, repeatable"),
+    tag_mode: str = Query("and", pattern="^(and|or)$", description="Match all tags or any tag"),
+    ingredients: list[str] = Query([], description="Main ingredient filters (all required), repeatable"),
+    min_calories: int | None = Query(None, ge=0),
+    max_calories: int | None = Query(None, ge=0),
+    facets: bool = Query(False, description="Also return facet counts for tags and main ingredients"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    hydrate: str | None = Query(None, pattern="^card$", description="'card' returns recipe card data per hit"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Search recipes via MeiliSearch."""
-    tag_filter = f'tags = "{tag}"' if tag else None
-    result = search_recipes(query=q, tag_filter=tag_filter, limit=limit, offset=offset)
-    return {
-        "hits": result.get("hits", []),
+    """Search recipes via MeiliSearch, or PostgreSQL while Meili is unavailable.
+
+    Hits carry card fields plus a 'snippet': matching description / steps / tips
+    text, cropped and highlighted. With hydrate=card, hits carry cover image,
+    calories and tag colors, loaded for all hits at once and kept in search
+    ranking order.
+    """
+    tag_names = tuple(dict.fromkeys(t for t in [tag, *tags] if t))
+    filters = None
+    if tag_names or ingredients or min_calories is not None or max_calories is not None:
+        filters = SearchFilters(
+            tags=tag_names,
+            tag_mode=tag_mode,
+            ingredients=tuple(dict.fromkeys(i for i in ingredients if i)),
+            min_calories=min_calories,
+            max_calories=max_calories,
+        )
+    result = await search_with_fallback(
+        db, query=q, filters=filters, limit=limit, offset=offset, facets=facets,
+    )
+    hits = result.get("hits", [])
+    if hydrate == "card":
+        snippets = {h["id"]: h.get("snippet", "") for h in hits}
+        hits = [
+            {**card, "snippet": snippets[card["id"]]}
+            for card in await load_recipe_cards(db, list(snippets))
+        ]
+    response = {
+        "hits": hits,
         "total": result.get("estimatedTotalHits", 0),
     }
+    if facets:
+        response["facets"] = result.get("facetDistribution", {})
+    return response
+
+
+@router.get("/suggest")
+async def suggest(
+    response: Response,
+    q: str = Query("", description="Typed prefix"),
+    limit: int = Query(8, ge=1, le=SUGGEST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Search-as-you-type suggestions: recipe id, name and highlighted name only."""
+    hits = await suggest_with_fallback(db, q, limit)
+    response.headers["Cache-Control"] = f"public, max-age={int(settings.SEARCH_SUGGEST_CACHE_TTL_SECONDS)}"
+    return {"hits": hits}
+
+
+@router.get("/multi")
+async def multi_search(
+    q: str = Query("", description="Search keyword"),
+    recipes_limit: int = Query(5, ge=0, le=50),
+    ingredients_limit: int = Query(5, ge=0, le=50),
+    tags_limit: int = Query(5, ge=0, le=50),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Search recipes, ingredients and tags in one round trip.
+
+    Each group has its own limit; a limit of 0 leaves that group out.
+    """
+    limits = {
+        INDEX_NAME: recipes_limit,
+        INGREDIENT_INDEX: ingredients_limit,
+        TAG_INDEX: tags_limit,
+    }
+    results = await multi_search_with_fallback(db, q, {k: v for k, v in limits.items() if v})
+    return {
+        name: {
+            "hits": results.get(name, {}).get("hits", []),
+            "total": results.get(name, {}).get("estimatedTotalHits", 0),
+        }
+        for name in limits
+    }
 
 
 @router.post("/setup")
 async def setup_search_index(_=Depends(verify_token)):
-    """Initialize/configure MeiliSearch index settings."""
-    setup_index()
-    return {"status": "ok"}
+    """Initialize/configure MeiliSearch index settings, applying only what changed."""
+    try:
+        applied = await asyncio.to_thread(setup_index, int(settings.SEARCH_SETUP_TIMEOUT_SECONDS * 1000))
+    except SearchSetupError as e:
+        raise HTTPException(status_code=502, detail=f"Search index settings rejected: {e}")
+    return {"status": "ok", "updated": applied}
+
+
+@router.post("/reindex")
+async def reindex(db: AsyncSession = Depends(get_db), _=Depends(verify_token)):
+    """Rebuild the recipe, ingredient and tag indexes from the database."""
+    return {"status": "ok", "indexed": await reindex_all(db)}
 
 
 @router.get("/synonyms")
 async def list_synonyms(_=Depends(verify_token)):
     """Get current synonym groups."""
     try:
-        return get_synonyms()
+        return await asyncio.to_thread(get_synonyms)
     except Exception:
         return {}
 
 
+def _synonyms_changed(changed: bool, task_uid: int | None) -> dict:
+    return {"status": "ok", "changed": changed, "task_uid": task_uid}
+
+
 @router.put("/synonyms")
-async def set_synonyms(synonyms: dict[str, list[str]], _=Depends(verify_token)):
-    """Update synonym groups. Example: {"番茄": ["西红柿"]}"""
-    update_synonyms(synonyms)
-    return {"status": "ok"}
+async def set_synonyms(synonyms: dict[str, list[str]], db: AsyncSession = Depends(get_db), _=Depends(verify_token)):
+    """Replace all synonym groups. Example: {"番茄": ["西红柿"]}"""
+    return _synonyms_changed(*await update_synonyms(db, synonyms))
+
+
+@router.post("/synonyms/groups")
+async def add_synonyms(group: SynonymGroup, db: AsyncSession = Depends(get_db), _=Depends(verify_token)):
+    """Add one synonym group, e.g. {"words": ["番茄", "西红柿"]}; groups sharing a word merge."""
+    return _synonyms_changed(*await add_synonym_group(db, group.words))
+
+
+@router.delete("/synonyms/groups")
+async def remove_synonyms(
+    words: list[str] = Query(..., min_length=2),
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_token),
+):
+    """Remove one stored synonym group: /synonyms/groups?words=番茄&words=西红柿"""
+    return _synonyms_changed(*await remove_synonym_group(db, words))
+
+
+@router.get("/tasks/{task_uid}")
+async def search_task_status(
+    task_uid: int,
+    wait: bool = Query(False, description="Wait for the task to finish"),
+    timeout_ms: int = Query(5000, ge=0, le=60000),
+    _=Depends(verify_token),
+):
+    """MeiliSearch task status, e.g. for a synonym update's task_uid."""
+    if settings.SEARCH_BACKEND == "memory":
+        raise HTTPException(status_code=404, detail="The memory search backend has no tasks")
+    from meilisearch.errors import MeilisearchApiError
+
+    try:
+        return await asyncio.to_thread(get_task, task_uid, wait, timeout_ms)
+    except MeilisearchApiError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@router.get("/cache")
+async def search_cache_stats(_=Depends(verify_token)):
+    """Search result cache statistics, for sizing SEARCH_CACHE_SIZE / TTL."""
+    return {**search_cache.stats(), "index_version": get_index_version()}
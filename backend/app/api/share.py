@@ -3,14 +3,14 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.models import Recipe
 
 router = APIRouter(prefix="/api/share", tags=["share"])
 
 
 @router.get("/{recipe_id}")
-async def get_share_info(recipe_id: int, db: AsyncSession = Depends(get_db)):
+async def get_share_info(recipe_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get recipe info for sharing (title, description, URL)."""
     result = await db.execute(
         select(Recipe)
@@ -1,12 +1,18 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import verify_token
+from app.core.metrics import SEARCH_SYNC_FAILURES
 from app.models.models import Tag, RecipeTag, TagCategory
 from app.schemas.tag import TagCreate, TagUpdate, TagOut, TagCategoryCreate, TagCategoryOut
+from app.services.search import TAG_INDEX, index_tag, reindex_tags_in_categories, remove_tag
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tags", tags=["tags"])
 
@@ -33,6 +39,15 @@ async def _pick_color(db: AsyncSession) -> str:
     return CATEGORY_COLORS[(count or 0) % len(CATEGORY_COLORS)]
 
 
+def _sync_search_index(tag: Tag):
+    """Sync tag to the tag search index. Best-effort, log errors."""
+    try:
+        index_tag(tag)
+    except Exception as e:
+        SEARCH_SYNC_FAILURES.labels(TAG_INDEX).inc()
+        logger.warning(f"Failed to sync search index for tag {tag.id}: {e}")
+
+
 # ============== Tag Categories ==============
 
 @router.get("/categories", response_model=list[TagCategoryOut])
@@ -40,13 +55,19 @@ async def list_tag_categories(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(TagCategory).order_by(TagCategory.id))
     cats = result.scalars().all()
     # Auto-assign colors to categories that don't have one
-    changed = False
+    changed = []
     for idx, cat in enumerate(cats):
         if not cat.color:
             cat.color = CATEGORY_COLORS[idx % len(CATEGORY_COLORS)]
-            changed = True
+            changed.append(cat.id)
     if changed:
         await db.commit()
+        # Tag documents carry their category's color
+        try:
+            await reindex_tags_in_categories(db, changed)
+        except Exception as e:
+            SEARCH_SYNC_FAILURES.labels(TAG_INDEX).inc()
+            logger.warning(f"Failed to re-index tags of categories {changed}: {e}")
     return cats
 
 
@@ -76,7 +97,7 @@ async def delete_tag_category(cat_id: int, db: AsyncSession = Depends(get_db), _
 # ============== Tags ==============
 
 @router.get("", response_model=list[TagOut])
-async def list_tags(db: AsyncSession = Depends(get_db)):
+async def list_tags(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(Tag).options(selectinload(Tag.category_rel)).order_by(Tag.category_id, Tag.name)
     )
@@ -104,6 +125,7 @@ async def create_tag(data: TagCreate, db: AsyncSession = Depends(get_db), _=Depe
         select(Tag).where(Tag.id == tag.id).options(selectinload(Tag.category_rel))
     )
     tag = result.scalars().first()
+    _sync_search_index(tag)
     return TagOut(
         id=tag.id,
         name=tag.name,
@@ -128,6 +150,7 @@ async def update_tag(tag_id: int, data: TagUpdate, db: AsyncSession = Depends(ge
         select(Tag).where(Tag.id == tag_id).options(selectinload(Tag.category_rel))
     )
     tag = result.scalars().first()
+    _sync_search_index(tag)
     return TagOut(
         id=tag.id,
         name=tag.name,
@@ -148,3 +171,8 @@ async def delete_tag(tag_id: int, db: AsyncSession = Depends(get_db), _=Depends(
         raise HTTPException(status_code=409, detail=f"Tag is used by {ref_count} recipe(s), cannot delete")
     await db.delete(tag)
     await db.commit()
+    try:
+        remove_tag(tag_id)
+    except Exception as e:
+        SEARCH_SYNC_FAILURES.labels(TAG_INDEX).inc()
+        logger.warning(f"Failed to remove tag {tag_id} from search index: {e}")
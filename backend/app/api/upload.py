@@ -1,18 +1,8 @@
-import io
 import os
 import uuid
 
 import aiofiles
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from PIL import Image
-
-# Register HEIF/HEIC support
-try:
-    from pillow_heif import register_heif_opener
-    register_heif_opener()
-except ImportError:
-    pass
-
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,6 +10,7 @@ from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import verify_token
 from app.models.models import Recipe, RecipeImage
+from app.services.images import to_jpeg
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
@@ -45,14 +36,7 @@ async def upload_general_image(
         raise HTTPException(status_code=400, detail="File too large (max 10MB)")
 
     try:
-        img = Image.open(io.BytesIO(content))
-        if img.mode in ("RGBA", "LA", "P"):
-            img = img.convert("RGB")
-        elif img.mode != "RGB":
-            img = img.convert("RGB")
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=85, optimize=True)
-        content = buf.getvalue()
+        content = to_jpeg(content)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Cannot process image file: {e}")
 
@@ -93,14 +77,7 @@ async def upload_recipe_image(
 
     # Convert all images to JPEG
     try:
-        img = Image.open(io.BytesIO(content))
-        if img.mode in ("RGBA", "LA", "P"):
-            img = img.convert("RGB")
-        elif img.mode != "RGB":
-            img = img.convert("RGB")
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=85, optimize=True)
-        content = buf.getvalue()
+        content = to_jpeg(content)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Cannot process image file: {e}")
 
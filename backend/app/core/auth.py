@@ -2,16 +2,18 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
 
 from app.core.config import settings
 
+# python-jose (and its crypto backends) is imported on first use to keep startup fast
+
 security = HTTPBearer()
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
 
 def create_access_token(data: dict) -> str:
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     to_encode.update({"exp": expire})
@@ -20,6 +22,7 @@ def create_access_token(data: dict) -> str:
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """FastAPI dependency: verify JWT token and return username."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[ALGORITHM])
         username: str | None = payload.get("sub")
@@ -23,9 +23,83 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    # Optional read replica (same credentials and database); read-only GET
+    # handlers use it, except for a client's requests shortly after it wrote
+    POSTGRES_REPLICA_HOST: str | None = None
+    POSTGRES_REPLICA_PORT: int = 5432
+    READ_PRIMARY_AFTER_WRITE_SECONDS: int = 10
+
+    @property
+    def DATABASE_REPLICA_URL(self) -> str | None:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_REPLICA_HOST}:{self.POSTGRES_REPLICA_PORT}/{self.POSTGRES_DB}"
+        )
+
+    # API worker processes for scripts/serve.py; 0 means one per available CPU.
+    # Each worker has its own connection pool (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # plus one LISTEN connection; all workers together must fit in
+    # DB_MAX_CONNECTIONS (0 disables the check).
+    WEB_CONCURRENCY: int = 0
+    # Postgres connections the API workers may use at most; the default leaves
+    # room for scripts and psql under Postgres' max_connections=100
+    DB_MAX_CONNECTIONS: int = 90
+
+    # Run migrations at startup instead of only checking the schema version
+    # (dev convenience; deploys run scripts/migrate.py once before the workers)
+    AUTO_MIGRATE: bool = False
+    # How long migration DDL waits for table locks before failing (0 = no limit)
+    MIGRATION_LOCK_TIMEOUT_MS: int = 10000
+
+    # Connection pool, per worker process: DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # connections at most, waiting DB_POOL_TIMEOUT seconds for a free one
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    # Recycle connections older than this (seconds; -1 never), and test each
+    # one on checkout so connections broken by a Postgres restart are replaced
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statements cached per connection (0 disables, e.g. behind PgBouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Server-side statement_timeout in milliseconds (0 disables)
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    # Log statements slower than this (milliseconds, 0 disables) with their EXPLAIN plan
+    SLOW_QUERY_MS: int = 500
+
+    # Event-loop monitor: measures loop lag and records the stack of anything
+    # blocking the loop longer than the threshold (GET /api/admin/loop)
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_BLOCK_THRESHOLD_MS: int = 100
+    LOOP_MONITOR_MAX_OFFENDERS: int = 20
+
+    # Search backend: "meili", or "memory" for the in-process engine
+    # (single-process deployments and tests; rebuilt from the DB at startup)
+    SEARCH_BACKEND: str = "meili"
+    SEARCH_SYNONYMS_FILE: str | None = None
+
     # MeiliSearch
     MEILI_HOST: str = "http://localhost:7700"
     MEILI_MASTER_KEY: str = "recipe_meili_master_key"
+    MEILI_TIMEOUT: float = 2.0
+    # Max wait for each index settings task when setting up at startup
+    SEARCH_SETUP_TIMEOUT_SECONDS: float = 10.0
+    # Consecutive Meili failures before search falls back to PostgreSQL,
+    # and how long to stay on the fallback before retrying Meili
+    SEARCH_BREAKER_FAILURES: int = 3
+    SEARCH_BREAKER_RESET_SECONDS: float = 30.0
+    # Per-process search result cache (0 disables); other workers' index
+    # writes invalidate it via LISTEN/NOTIFY, the TTL bounds staleness if
+    # a notification is missed
+    SEARCH_CACHE_SIZE: int = 1024
+    SEARCH_CACHE_TTL_SECONDS: float = 30.0
+    # Autocomplete suggestions, cached briefly per prefix
+    SEARCH_SUGGEST_CACHE_TTL_SECONDS: float = 10.0
+
+    # How often buffered recipe view counts are written to the database
+    VIEW_FLUSH_INTERVAL_SECONDS: float = 30.0
 
     # Auth
     SECRET_KEY: str = "change-me-to-a-random-string"
@@ -1,10 +1,37 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+def engine_options() -> dict:
+    """create_async_engine keyword arguments from the DB_* settings."""
+    connect_args = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return {
+        "echo": False,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options())
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Replica pool for read-only handlers; the primary when no replica is configured
+read_engine = (
+    create_async_engine(settings.DATABASE_REPLICA_URL, **engine_options())
+    if settings.DATABASE_REPLICA_URL else engine
+)
+read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+# Set on responses to writes; while present, the client's reads go to the
+# primary so it sees its own writes despite replication lag
+READ_PRIMARY_COOKIE = "read_primary"
 
 
 class Base(DeclarativeBase):
@@ -15,3 +42,28 @@ async def get_db():
     """FastAPI dependency that yields an async database session."""
     async with async_session() as session:
         yield session
+
+
+async def get_read_db(request: Request):
+    """FastAPI dependency for read-only handlers: a replica session unless pinned to primary."""
+    factory = async_session if request.cookies.get(READ_PRIMARY_COOKIE) else read_session
+    async with factory() as session:
+        yield session
+
+
+def pool_stats(db_engine: AsyncEngine = engine) -> dict:
+    """Live connection pool counters for this worker process."""
+    pool = db_engine.sync_engine.pool
+    # Tasks blocked waiting for a connection; read from the pool's asyncio
+    # queue, which SQLAlchemy does not expose publicly
+    queue = getattr(getattr(pool, "_pool", None), "_queue", None)
+    waiters = len(getattr(queue, "_getters", None) or ())
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "waiters": waiters,
+        "timeout_seconds": pool.timeout(),
+    }
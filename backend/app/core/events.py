@@ -0,0 +1,119 @@
+"""Cross-worker notifications over PostgreSQL LISTEN/NOTIFY.
+
+With several worker processes, in-process caches must hear about writes made
+by the other workers. Each worker runs `listen()` on one dedicated connection;
+`publish()` notifies every worker, and handlers registered with `subscribe()`
+run in each worker except the sender.
+
+Delivery is best-effort: notifications sent while a worker is reconnecting are
+lost, so caches relying on this must still expire on their own.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Callable
+
+import asyncpg
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "recipe_events"
+
+_handlers: dict[str, list[Callable]] = {}
+_pending: set[asyncio.Task] = set()
+_listening = False
+# The loop listen() runs on; publish_soon() hands work to it from other threads
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _origin() -> str:
+    # Evaluated per call, not at import, so forked workers differ
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def subscribe(event: str, handler: Callable):
+    """Call `handler(data)` when another worker publishes `event`."""
+    _handlers.setdefault(event, []).append(handler)
+
+
+async def publish(event: str, data=None):
+    payload = json.dumps({"event": event, "origin": _origin(), "data": data})
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+        await conn.commit()
+
+
+async def _publish_logged(event: str, data):
+    try:
+        await publish(event, data)
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} to other workers: {e}")
+
+
+def publish_soon(event: str, data=None):
+    """Publish from sync code, without waiting.
+
+    Works on the event loop and from worker threads (e.g. `asyncio.to_thread`).
+    A no-op unless this process is listening (i.e. serving requests), so
+    scripts and tests never notify.
+    """
+    loop = _loop
+    if not _listening or loop is None or loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        _start_publish(event, data)
+    else:
+        loop.call_soon_threadsafe(_start_publish, event, data)
+
+
+def _start_publish(event: str, data):
+    task = asyncio.get_running_loop().create_task(_publish_logged(event, data))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def _dispatch(payload: str):
+    message = json.loads(payload)
+    if message.get("origin") == _origin():
+        return
+    for handler in _handlers.get(message.get("event"), []):
+        try:
+            handler(message.get("data"))
+        except Exception as e:
+            logger.warning(f"Handler for {message.get('event')} failed: {e}")
+
+
+async def listen(retry_seconds: float = 5.0):
+    """Receive notifications until cancelled, reconnecting after errors."""
+    global _listening, _loop
+    _loop = asyncio.get_running_loop()
+    _listening = True
+    try:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(settings.DATABASE_URL_SYNC)
+                await conn.add_listener(CHANNEL, lambda _conn, _pid, _channel, payload: _dispatch(payload))
+                # asyncpg delivers notifications in the background; just watch the connection
+                while not conn.is_closed():
+                    await asyncio.sleep(retry_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event listener connection failed, retrying: {e}")
+                await asyncio.sleep(retry_seconds)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+    finally:
+        _listening = False
@@ -0,0 +1,158 @@
+"""Event-loop lag and blocking-call detection (opt-in: LOOP_MONITOR_ENABLED).
+
+A heartbeat task sleeps in short steps and records how late it wakes up as
+loop lag. A watchdog thread watches that heartbeat; when it stalls for longer
+than LOOP_BLOCK_THRESHOLD_MS, something is running on the loop without
+yielding, so the watchdog snapshots the loop thread's stack and the current
+task while the blocking call is still in progress. The stall is recorded as
+the gap between heartbeats, which overstates the blocking call by at most
+one heartbeat interval (a tenth of the threshold).
+
+Stalls are grouped by the innermost coroutine and app frame, keeping the
+worst LOOP_MONITOR_MAX_OFFENDERS. State is per worker process.
+"""
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.metrics import LOOP_BLOCKS, LOOP_LAG
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_LIMIT = 20
+
+
+def _coroutine_name(frame, task: asyncio.Task | None) -> str:
+    """Innermost coroutine on the stack (the handler, not the server's request task)."""
+    while frame is not None:
+        if frame.f_code.co_flags & inspect.CO_COROUTINE:
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    if task is None:
+        return "<callback>"
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or repr(coro)
+
+
+def _app_location(frame) -> str:
+    """Innermost frame in this app's code, else the innermost frame overall."""
+    innermost = None
+    while frame is not None:
+        code = frame.f_code
+        path = os.path.relpath(code.co_filename, os.path.dirname(APP_DIR))
+        location = f"{path}:{frame.f_lineno} in {code.co_name}"
+        innermost = innermost or location
+        if code.co_filename.startswith(APP_DIR + os.sep):
+            return location
+        frame = frame.f_back
+    return innermost or "<unknown>"
+
+
+class LoopMonitor:
+    """Loop lag statistics and the worst blocking offenders for one event loop."""
+
+    def __init__(self, threshold: float = 0.1, max_offenders: int = 20):
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.running = False
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._offenders: dict[tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+        self._beat = 0.0
+        self._stall: dict | None = None
+
+    @property
+    def interval(self) -> float:
+        # The heartbeat gap is a blocking call plus up to one interval of sleep
+        return self.threshold / 10
+
+    def stats(self) -> dict:
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda o: o["max_ms"], reverse=True)
+        return {
+            "running": self.running,
+            "pid": os.getpid(),
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "offenders": offenders,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._offenders.clear()
+        self.max_lag = 0.0
+
+    def record(self, coroutine: str, location: str, seconds: float, stack: list[str]):
+        """Add one blocking episode to the offender table."""
+        LOOP_BLOCKS.inc()
+        key = (coroutine, location)
+        with self._lock:
+            offender = self._offenders.get(key)
+            if offender is None:
+                if len(self._offenders) >= self.max_offenders:
+                    mildest = min(self._offenders, key=lambda k: self._offenders[k]["max_ms"])
+                    if self._offenders[mildest]["max_ms"] >= seconds * 1000:
+                        return
+                    del self._offenders[mildest]
+                offender = self._offenders[key] = {
+                    "coroutine": coroutine, "location": location,
+                    "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                }
+            offender["count"] += 1
+            offender["total_ms"] = round(offender["total_ms"] + seconds * 1000, 1)
+            if seconds * 1000 >= offender["max_ms"]:
+                offender["max_ms"] = round(seconds * 1000, 1)
+                offender["stack"] = stack
+            offender["last_seen"] = datetime.now(timezone.utc).isoformat()
+
+    def _snapshot(self, loop: asyncio.AbstractEventLoop, loop_thread: int) -> dict:
+        frame = sys._current_frames().get(loop_thread)
+        return {
+            "coroutine": _coroutine_name(frame, asyncio.current_task(loop)),
+            "location": _app_location(frame),
+            "stack": traceback.format_stack(frame, limit=STACK_LIMIT) if frame else [],
+        }
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread: int, stop: threading.Event):
+        """Watchdog thread: catch the loop mid-stall, record the stall once it ends."""
+        while not stop.wait(self.interval):
+            beat = self._beat
+            if self._stall is None:
+                if time.monotonic() - beat > self.threshold:
+                    self._stall = {"beat": beat, **self._snapshot(loop, loop_thread)}
+            elif beat != self._stall["beat"]:
+                stall, self._stall = self._stall, None
+                self.record(stall["coroutine"], stall["location"], beat - stall["beat"], stall["stack"])
+
+    async def run(self):
+        """Measure lag until cancelled; starts and stops the watchdog thread."""
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        self._beat = time.monotonic()
+        watchdog = threading.Thread(
+            target=self._watch, args=(loop, threading.get_ident(), stop),
+            name="loop-monitor", daemon=True,
+        )
+        watchdog.start()
+        self.running = True
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(self.interval)
+                self._beat = time.monotonic()
+                self.last_lag = max(self._beat - start - self.interval, 0.0)
+                self.max_lag = max(self.max_lag, self.last_lag)
+                LOOP_LAG.observe(self.last_lag)
+        finally:
+            self.running = False
+            stop.set()
+
+
+loop_monitor = LoopMonitor(settings.LOOP_BLOCK_THRESHOLD_MS / 1000, settings.LOOP_MONITOR_MAX_OFFENDERS)
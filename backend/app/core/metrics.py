@@ -0,0 +1,131 @@
+"""Prometheus metrics, served in text format on /metrics.
+
+With several workers (scripts/serve.py), each process writes its samples to
+files under PROMETHEUS_MULTIPROC_DIR and `render()` merges every worker's
+files, so any worker answers a scrape for the whole server. Without that
+variable (dev server, tests) the process's own registry is served.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.datastructures import MutableHeaders
+
+from app.core import query_stats
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time until the response headers are sent",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled", ["method"],
+    multiprocess_mode="livesum",
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size, when Content-Length is known",
+    ["route"], buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total", "Requests answered with a 5xx or an unhandled exception",
+    ["method", "route"],
+)
+IMAGE_PROCESSING = Histogram(
+    "image_processing_seconds", "Decoding and re-encoding an uploaded image",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SEARCH_LATENCY = Histogram(
+    "search_backend_duration_seconds", "Search backend calls, excluding cache hits",
+    ["backend", "operation"],
+)
+SEARCH_SYNC_FAILURES = Counter(
+    "search_sync_failures_total", "Failed best-effort writes to a search index",
+    ["index"],
+)
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the loop monitor's heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total", "Stalls of the event loop longer than LOOP_BLOCK_THRESHOLD_MS",
+)
+
+# Label for requests no route matched, so random paths cannot add series
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _route(scope) -> str:
+    return getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+class RequestMetricsMiddleware:
+    """Count and time every request, labelled by route template rather than URL.
+
+    Also collects the request's query and search time (app.core.query_stats)
+    and reports it in a Server-Timing header. Plain ASGI that only wraps
+    `send`, so the bookkeeping adds no task or stream per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status = "500"  # unless a response is started
+        started = False
+
+        with query_stats.collect() as stats:
+            async def send_with_metrics(message):
+                nonlocal status, started
+                if message["type"] == "http.response.start":
+                    started = True
+                    status = str(message["status"])
+                    elapsed = time.perf_counter() - start
+                    route = _route(scope)
+                    REQUEST_LATENCY.labels(method, route).observe(elapsed)
+                    headers = MutableHeaders(scope=message)
+                    length = headers.get("content-length")
+                    if length is not None:
+                        RESPONSE_SIZE.labels(route).observe(int(length))
+                    headers["Server-Timing"] = query_stats.server_timing(stats, elapsed)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_metrics)
+            finally:
+                in_progress.dec()
+                route = _route(scope)
+                if not started:
+                    REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+                REQUESTS.labels(method, route, status).inc()
+                if status.startswith("5"):
+                    REQUEST_ERRORS.labels(method, route).inc()
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in Prometheus text format, and their content type."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_exited():
+    """Drop this worker's live gauges (in-progress requests) from the aggregate."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,167 @@
+"""Schema migrations: a one-shot upgrade for deploys and a cheap check for workers.
+
+`migrate()` runs `alembic upgrade head` under a PostgreSQL advisory lock, so
+concurrent deploy steps serialize instead of racing. Waiters poll for the
+lock between transactions rather than blocking in pg_advisory_lock: a
+blocked statement holds a snapshot, and CREATE INDEX CONCURRENTLY in the
+lock holder waits for every older snapshot, so the two would deadlock.
+Index migrations drop an INVALID index left by an interrupted concurrent
+build (`drop_invalid_index`) before recreating it. It uses its own
+connection without the app's statement_timeout: waiting for another deploy's
+migration and building indexes on large tables may take minutes. Once the
+lock is held, MIGRATION_LOCK_TIMEOUT_MS bounds how long DDL waits for table
+locks, so a migration fails instead of queueing every query on a table
+behind a long-running transaction. Databases that predate Alembic tracking
+are adopted first:
+- an empty database gets the current schema from the models and is stamped at head
+- one created by the old create_all startup is stamped at its baseline and upgraded
+
+Workers only call `check_schema()`, a single-row read of alembic_version.
+Alembic itself is imported on first use, not when the app module loads.
+"""
+import asyncio
+import logging
+import os
+
+from sqlalchemy import inspect, pool, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini")
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_KEY = 7_324_001
+# Seconds between attempts to take the migration lock
+MIGRATION_LOCK_POLL_SECONDS = 1.0
+# Revision matching a schema created by create_all before migrations were tracked
+BASELINE_REVISION = "a1b2c3d4e5f6"
+
+
+def _alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    if connection is not None:
+        # Picked up by alembic/env.py instead of opening its own connection
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def _upgrade(connection):
+    from alembic import command
+
+    config = _alembic_config(connection)
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    if "recipes" not in tables:
+        logger.info("Empty database: creating schema and stamping head")
+        Base.metadata.create_all(connection)
+        connection.commit()
+        command.stamp(config, "head")
+        return
+    if "alembic_version" not in tables:
+        columns = {c["name"] for c in inspector.get_columns("tag_categories")}
+        if "color" in columns:
+            logger.info(f"Untracked schema: stamping baseline {BASELINE_REVISION}")
+            connection.commit()
+            command.stamp(config, BASELINE_REVISION)
+    # Alembic manages its own transactions (and autocommit blocks) from here
+    connection.commit()
+    command.upgrade(config, "head")
+
+
+def drop_invalid_index(name: str):
+    """Drop index `name` if an interrupted CREATE INDEX CONCURRENTLY left it INVALID.
+
+    Call inside an autocommit block before creating the index with
+    if_not_exists, which would otherwise keep the unusable index forever.
+    """
+    from alembic import op
+
+    if op.get_context().as_sql:  # offline SQL generation has no database to inspect
+        return
+    invalid = op.get_bind().scalar(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name},
+    )
+    if invalid:
+        logger.warning(f"Dropping invalid index {name} to rebuild it")
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+async def _acquire_lock(conn):
+    """Take the migration lock, polling so no snapshot is held while waiting."""
+    logged = False
+    while True:
+        acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.commit()
+        if acquired:
+            return
+        if not logged:
+            logger.info("Waiting for another migration to finish")
+            logged = True
+        await asyncio.sleep(MIGRATION_LOCK_POLL_SECONDS)
+
+
+async def _set_timeouts(conn, statement_timeout_ms: int | None, lock_timeout_ms: int | None):
+    """Session-level timeouts in milliseconds (0: none); None restores the connection default."""
+    for name, value in (("statement_timeout", statement_timeout_ms), ("lock_timeout", lock_timeout_ms)):
+        if value is None:
+            await conn.execute(text(f"RESET {name}"))
+        else:
+            await conn.execute(text("SELECT set_config(:name, :value, false)"), {"name": name, "value": str(value)})
+    await conn.commit()
+
+
+async def migrate(db_engine: AsyncEngine | None = None) -> str:
+    """Upgrade the database to the head revision; returns it. Safe to run concurrently.
+
+    Runs on a dedicated unpooled connection unless `db_engine` is given.
+    """
+    own_engine = db_engine is None
+    if own_engine:
+        db_engine = create_async_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        async with db_engine.connect() as conn:
+            # No statement timeout at all: index builds may take minutes
+            await _set_timeouts(conn, 0, settings.MIGRATION_LOCK_TIMEOUT_MS)
+            await _acquire_lock(conn)
+            try:
+                await conn.run_sync(_upgrade)
+                await conn.commit()
+            finally:
+                # Leaves nothing open after a failed upgrade, so the unlock still runs
+                await conn.rollback()
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                await _set_timeouts(conn, None, None)
+    finally:
+        if own_engine:
+            await db_engine.dispose()
+    return head_revision()
+
+
+async def current_revision(db_engine: AsyncEngine = engine) -> str | None:
+    async with db_engine.connect() as conn:
+        try:
+            return await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        except Exception:
+            # No alembic_version table: never migrated
+            return None
+
+
+async def check_schema(db_engine: AsyncEngine = engine):
+    """Raise RuntimeError unless the database is at the head revision."""
+    current, head = await current_revision(db_engine), head_revision()
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}; "
+            "run `python scripts/migrate.py` (or set AUTO_MIGRATE=true)"
+        )
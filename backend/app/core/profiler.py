@@ -0,0 +1,189 @@
+"""On-demand statistical profiler with collapsed-stack (flamegraph) output.
+
+A sampler thread reads every other thread's stack with sys._current_frames
+at a fixed rate and counts identical stacks. Output is one line per stack,
+"thread;outer frame;...;inner frame count", as read by flamegraph.pl,
+speedscope and similar tools.
+
+Overhead and duration are capped: runs stop after MAX_SECONDS, and when
+sampling takes more than MAX_OVERHEAD of the elapsed time the sampler
+halves its rate. One profile runs per worker at a time.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi import Response
+from starlette.routing import Match
+
+MAX_SECONDS = 60
+MAX_HZ = 1000
+DEFAULT_HZ = 100
+MAX_OVERHEAD = 0.05
+MAX_DEPTH = 128
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this worker."""
+
+
+def _frame_label(code) -> str:
+    """'app/api/recipes.py:list_recipes' style label; no ';' or spaces (collapsed format)."""
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR + os.sep):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_qualname}".replace(";", ":").replace(" ", "_")
+
+
+class StackSampler:
+    """Samples all threads but its own from start() until stop() or `max_seconds`."""
+
+    def __init__(self, hz: int = DEFAULT_HZ, max_seconds: float = MAX_SECONDS):
+        self.interval = 1 / min(max(hz, 1), MAX_HZ)
+        self.max_seconds = min(max_seconds, MAX_SECONDS)
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, str(ident)).replace(";", ":").replace(" ", "_"))
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self):
+        start = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            t0 = time.perf_counter()
+            self._sample()
+            self.sampling_seconds += time.perf_counter() - t0
+            self.elapsed = time.perf_counter() - start
+            if self.elapsed >= self.max_seconds:
+                break
+            if self.sampling_seconds > MAX_OVERHEAD * self.elapsed:
+                self.interval *= 2
+        self.elapsed = time.perf_counter() - start
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def response(self) -> Response:
+        """The collapsed stacks as text/plain, with run statistics in headers."""
+        overhead = self.sampling_seconds / self.elapsed if self.elapsed else 0.0
+        return Response(self.collapsed(), media_type="text/plain", headers={
+            "X-Profile-Samples": str(self.samples),
+            "X-Profile-Seconds": f"{self.elapsed:.3f}",
+            "X-Profile-Overhead": f"{overhead:.4f}",
+        })
+
+
+_lock = threading.Lock()
+# Set by profile_next() until a matching request claims it:
+# {"method", "route", "hz", "future"}
+_armed: dict | None = None
+
+
+def _acquire():
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy()
+
+
+async def profile_for(seconds: float, hz: int = DEFAULT_HZ) -> StackSampler:
+    """Sample this worker for `seconds` (capped at MAX_SECONDS)."""
+    _acquire()
+    try:
+        sampler = StackSampler(hz, seconds)
+        sampler.start()
+        try:
+            await asyncio.sleep(sampler.max_seconds)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+        return sampler
+    finally:
+        _lock.release()
+
+
+async def profile_next(method: str, route: str, timeout: float, hz: int = DEFAULT_HZ) -> StackSampler:
+    """Sample while the next request for `method route` (a route template) is handled.
+
+    Raises TimeoutError if none arrives within `timeout` seconds. Other
+    requests running concurrently in this worker appear in the samples too.
+    """
+    global _armed
+    _acquire()
+    try:
+        future = asyncio.get_running_loop().create_future()
+        _armed = {"method": method.upper(), "route": route, "hz": hz, "future": future}
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            _armed = None
+    finally:
+        _lock.release()
+
+
+def _matches(scope, route: str) -> bool:
+    for candidate in scope["app"].router.routes:
+        if getattr(candidate, "path", None) == route:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                return True
+    return False
+
+
+class ProfileMiddleware:
+    """Profile the request a profile_next() call is waiting for; otherwise a pass-through.
+
+    Plain ASGI rather than an http middleware, so unprofiled requests cost
+    one attribute check and no extra task or stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _armed
+        armed = _armed
+        if (
+            armed is None
+            or scope["type"] != "http"
+            or scope["method"] != armed["method"]
+            or not _matches(scope, armed["route"])
+        ):
+            return await self.app(scope, receive, send)
+        _armed = None  # claimed: concurrent matches run unprofiled
+        sampler = StackSampler(armed["hz"])
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+            if not armed["future"].done():
+                armed["future"].set_result(sampler)
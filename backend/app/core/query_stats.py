@@ -0,0 +1,137 @@
+"""Per-request SQL statistics, Server-Timing headers and the slow-query log.
+
+Cursor events are registered on the Engine class, so they cover every engine:
+primary, replica and the ones tests create. Each request gets a RequestStats
+through a context variable (`collect()`, entered by the request metrics
+middleware in app.core.metrics); SQLAlchemy's async greenlets and `to_thread`
+both inherit it, so queries and search calls made for a request add to it.
+
+Statements slower than SLOW_QUERY_MS are logged with their EXPLAIN plan
+(plan only, never ANALYZE, so the statement does not run twice). The EXPLAIN
+runs in the caller's transaction under a savepoint, so if it fails the
+transaction carries on unharmed.
+"""
+import contextlib
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    search_seconds: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+# Statement lists being recorded by capture_queries()
+_captures: list[list[str]] = []
+
+
+def current() -> RequestStats | None:
+    return _current.get()
+
+
+def add_search_time(seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.search_seconds += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute never fires for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    for statements in _captures:
+        statements.append(statement)
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        plan = None
+        if not executemany and statement.lstrip().lower().startswith(EXPLAINABLE):
+            plan = _explain(conn, statement, parameters)
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.0f}ms): {statement}"
+            + (f"\n{plan}" if plan else "")
+        )
+
+
+def _explain(conn, statement: str, parameters) -> str | None:
+    """EXPLAIN a statement on the same connection, bypassing these events."""
+    try:
+        # A raw DBAPI cursor: its queries are not counted or logged again
+        cursor = conn.connection.cursor()
+        # An error inside a transaction would abort it for the caller
+        savepoint = not getattr(conn.connection.dbapi_connection, "autocommit", False)
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN {statement}", parameters)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                    cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+
+
+@contextlib.contextmanager
+def capture_queries():
+    """Record every SQL statement executed while active, from any request (tests)."""
+    statements: list[str] = []
+    _captures.append(statements)
+    try:
+        yield statements
+    finally:
+        _captures.remove(statements)
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """Server-Timing header value: db, search, and the rest as app time."""
+    app_seconds = max(total_seconds - stats.db_seconds - stats.search_seconds, 0.0)
+    return ", ".join([
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"',
+        f"search;dur={stats.search_seconds * 1000:.1f}",
+        f"app;dur={app_seconds * 1000:.1f}",
+        f"total;dur={total_seconds * 1000:.1f}",
+    ])
+
+
+@contextlib.contextmanager
+def collect():
+    """Attribute queries and search calls made while active to a new RequestStats."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
@@ -1,30 +1,59 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
-from app.api import auth, recipes, tags, ingredients, search, upload, import_export, share
+from app.api import admin, auth, recipes, tags, ingredients, search, upload, import_export, share
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core import events, metrics, profiler
+from app.core.database import engine, read_engine, async_session, READ_PRIMARY_COOKIE
+from app.core.loop_monitor import loop_monitor
+from app.core.migrations import check_schema, migrate
+from app.services.search import build_memory_index, setup_index
+from app.services.views import view_counter
 
 # Ensure all models are imported so Base.metadata is complete
 import app.models.models  # noqa: F401
 
-# Register HEIF/HEIC support
-try:
-    from pillow_heif import register_heif_opener
-    register_heif_opener()
-except ImportError:
-    pass
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create tables if they don't exist
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Schema changes belong to the one-shot migration step; workers only verify
+    if settings.AUTO_MIGRATE:
+        await migrate()
+    else:
+        await check_schema()
+    if settings.SEARCH_BACKEND == "memory":
+        async with async_session() as db:
+            await build_memory_index(db)
+    else:
+        # Best-effort: search falls back to PostgreSQL while Meili is unreachable
+        try:
+            applied = await asyncio.to_thread(setup_index, int(settings.SEARCH_SETUP_TIMEOUT_SECONDS * 1000))
+            if applied:
+                logger.info(f"Updated search index settings: {applied}")
+        except Exception as e:
+            logger.warning(f"Search index setup failed: {e}")
+    view_flusher = asyncio.create_task(view_counter.run(async_session, settings.VIEW_FLUSH_INTERVAL_SECONDS))
+    # Cache invalidations from the other worker processes
+    event_listener = asyncio.create_task(events.listen())
+    monitor = asyncio.create_task(loop_monitor.run()) if settings.LOOP_MONITOR_ENABLED else None
     yield
+    if monitor is not None:
+        monitor.cancel()
+    event_listener.cancel()
+    # Cancelling runs a final flush of buffered view counts
+    view_flusher.cancel()
+    try:
+        await view_flusher
+    except asyncio.CancelledError:
+        pass
+    metrics.mark_worker_exited()
 
 
 app = FastAPI(title="Recipe API", version="0.1.0", lifespan=lifespan)
@@ -37,6 +66,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def pin_reads_after_write(request: Request, call_next):
+    """After a successful write, route this client's reads to the primary for a while."""
+    response = await call_next(request)
+    if (
+        read_engine is not engine
+        and request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, "1",
+            max_age=settings.READ_PRIMARY_AFTER_WRITE_SECONDS, httponly=True, samesite="lax",
+        )
+    return response
+
+
+app.add_middleware(profiler.ProfileMiddleware)
+# Added last so it is outermost and times the other middleware too
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+
 # Register routers
 app.include_router(auth.router)
 app.include_router(recipes.router)
@@ -46,6 +96,7 @@ app.include_router(search.router)
 app.include_router(upload.router)
 app.include_router(import_export.router)
 app.include_router(share.router)
+app.include_router(admin.router)
 
 # Serve uploaded files - use same path as upload.py
 upload_dir = os.path.abspath(settings.UPLOAD_DIR)
@@ -56,3 +107,10 @@ app.mount("/uploads", StaticFiles(directory=upload_dir), name="uploads")
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint, aggregated over all worker processes."""
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
@@ -1,11 +1,15 @@
 from sqlalchemy import (
     Column, Integer, String, Text, Float, SmallInteger,
-    ForeignKey, DateTime, func,
+    ForeignKey, DateTime, Index, DDL, event, func, text,
 )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
+# Trigram indexes below need pg_trgm; make create_all work on a fresh database
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 
 class TagCategory(Base):
     __tablename__ = "tag_categories"
@@ -29,12 +33,21 @@ class IngredientCategory(Base):
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Serves the PostgreSQL fallback search on recipe names
+        Index(
+            "ix_recipes_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, default="")
     steps = Column(Text, default="")
     tips = Column(Text, default="")
+    # Accumulated in memory and flushed in batches by services.views
+    view_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -47,7 +60,7 @@ class RecipeImage(Base):
     __tablename__ = "recipe_images"
 
     id = Column(Integer, primary_key=True, index=True)
-    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False, index=True)
     image_path = Column(String(500), nullable=False)
     sort_order = Column(SmallInteger, default=0)
 
@@ -56,23 +69,37 @@ class RecipeImage(Base):
 
 class Ingredient(Base):
     __tablename__ = "ingredients"
+    __table_args__ = (
+        # Serves substring ILIKE and similarity() lookups of 3+ characters from the ingredient picker
+        Index(
+            "ix_ingredients_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False)
     unit = Column(String(20), nullable=False)
     calorie = Column(Float, nullable=True)
-    category_id = Column(Integer, ForeignKey("ingredient_categories.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("ingredient_categories.id"), nullable=True, index=True)
 
     category_rel = relationship("IngredientCategory", back_populates="ingredients")
     recipe_ingredients = relationship("RecipeIngredient", back_populates="ingredient")
 
 
+# The characters of an ingredient's lowercased name. pg_trgm extracts no trigram
+# from 1-2 character queries such as 鸡蛋, so the picker narrows those with
+# `INGREDIENT_NAME_CHARS @> <query characters>` on this GIN index instead
+INGREDIENT_NAME_CHARS = func.regexp_split_to_array(func.lower(Ingredient.name), text("''"), type_=ARRAY(Text))
+Index("ix_ingredients_name_chars", INGREDIENT_NAME_CHARS, postgresql_using="gin")
+
+
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
 
     id = Column(Integer, primary_key=True, index=True)
-    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
-    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False, index=True)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False, index=True)
     amount = Column(String(50), default="")
 
     recipe = relationship("Recipe", back_populates="recipe_ingredients")
@@ -81,10 +108,16 @@ class RecipeIngredient(Base):
 
 class Tag(Base):
     __tablename__ = "tags"
+    __table_args__ = (
+        Index(
+            "ix_tags_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False)
-    category_id = Column(Integer, ForeignKey("tag_categories.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("tag_categories.id"), nullable=True, index=True)
 
     category_rel = relationship("TagCategory", back_populates="tags")
     recipes = relationship("Recipe", secondary="recipe_tags", back_populates="tags")
@@ -94,4 +127,23 @@ class RecipeTag(Base):
     __tablename__ = "recipe_tags"
 
     recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
-    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    # The composite PK leads with recipe_id, so tag_id lookups need their own index
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class AdminCredential(Base):
+    """Admin password set through change-password; ADMIN_PASSWORD applies until one exists."""
+    __tablename__ = "admin_credentials"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String(50), unique=True, nullable=False)
+    password_hash = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SynonymGroup(Base):
+    """Search synonyms as entered; the backend gets them expanded (app.services.search.expand_groups)."""
+    __tablename__ = "synonym_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    words = Column(ARRAY(String(100)), nullable=False)
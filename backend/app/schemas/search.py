@@ -0,0 +1,5 @@
+from pydantic import BaseModel, Field
+
+
+class SynonymGroup(BaseModel):
+    words: list[str] = Field(min_length=2)
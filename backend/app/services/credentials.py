@@ -0,0 +1,72 @@
+"""Admin credential storage.
+
+The admin password hash lives in `admin_credentials`, so a change made on one
+worker applies to every worker and survives restarts. Until a password has
+been changed, ADMIN_PASSWORD from the settings applies.
+
+Logins read the hash through a small per-process cache; changing the password
+updates it locally and tells the other workers to drop theirs (app.core.events).
+Tokens are verified without any of this: verify_token only checks the JWT.
+"""
+import asyncio
+import functools
+import secrets
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.events import publish_soon, subscribe
+from app.models.models import AdminCredential
+
+
+@functools.cache
+def pwd_context():
+    """The passlib context, imported on first login rather than at startup."""
+    from passlib.context import CryptContext
+
+    # pbkdf2 rather than bcrypt: passlib's bcrypt support breaks with bcrypt>=4.1
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+
+# username -> password hash, or "" when the settings password still applies.
+# The TTL covers invalidation notifications that never arrive.
+_credential_cache = TTLCache(maxsize=16, ttl=300)
+CREDENTIAL_CHANGED_EVENT = "admin_credential_changed"
+
+subscribe(CREDENTIAL_CHANGED_EVENT, lambda _data: _credential_cache.clear())
+
+
+async def _password_hash(db: AsyncSession, username: str) -> str:
+    password_hash = _credential_cache.get(username)
+    if password_hash is None:
+        password_hash = await db.scalar(
+            select(AdminCredential.password_hash).where(AdminCredential.username == username)
+        ) or ""
+        _credential_cache.set(username, password_hash)
+    return password_hash
+
+
+async def verify_password(db: AsyncSession, username: str, password: str) -> bool:
+    """Check an admin username/password pair."""
+    if username != settings.ADMIN_USERNAME:
+        return False
+    password_hash = await _password_hash(db, username)
+    if not password_hash:
+        return secrets.compare_digest(password.encode(), settings.ADMIN_PASSWORD.encode())
+    # Hash verification is deliberately slow; keep it off the event loop
+    return await asyncio.to_thread(pwd_context().verify, password, password_hash)
+
+
+async def set_password(db: AsyncSession, username: str, password: str):
+    """Store a new hashed password for `username` and invalidate every worker's cache."""
+    password_hash = await asyncio.to_thread(pwd_context().hash, password)
+    credential = await db.scalar(select(AdminCredential).where(AdminCredential.username == username))
+    if credential is None:
+        db.add(AdminCredential(username=username, password_hash=password_hash))
+    else:
+        credential.password_hash = password_hash
+    await db.commit()
+    _credential_cache.set(username, password_hash)
+    publish_soon(CREDENTIAL_CHANGED_EVENT)
@@ -0,0 +1,37 @@
+"""Image decoding and conversion for uploads.
+
+Pillow and pillow-heif are imported on first use rather than at startup, and
+HEIF/HEIC support is registered once per process.
+"""
+import functools
+import io
+
+from app.core.metrics import IMAGE_PROCESSING
+
+
+@functools.cache
+def _pillow():
+    from PIL import Image
+
+    # Register HEIF/HEIC support
+    try:
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+    except ImportError:
+        pass
+    return Image
+
+
+def to_jpeg(content: bytes, quality: int = 85) -> bytes:
+    """Decode any supported image and re-encode it as RGB JPEG.
+
+    Raises whatever Pillow raises for unreadable input.
+    """
+    Image = _pillow()
+    with IMAGE_PROCESSING.time():
+        img = Image.open(io.BytesIO(content))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=quality, optimize=True)
+        return buf.getvalue()
@@ -0,0 +1,28 @@
+"""Recipe nutrition calculations."""
+import re
+
+# Amounts counted towards calories: plain decimals like "2" or "1.5". The
+# database fallback search applies the same pattern in SQL (search_db).
+AMOUNT_PATTERN = r"^\s*[0-9]+(\.[0-9]+)?\s*$"
+_AMOUNT_RE = re.compile(AMOUNT_PATTERN, re.ASCII)
+
+
+def parse_amount(amount: str | None) -> float:
+    """An ingredient amount as a number; anything not matching AMOUNT_PATTERN is zero."""
+    if not amount or not _AMOUNT_RE.match(amount):
+        return 0.0
+    return float(amount)
+
+
+def recipe_calories(recipe) -> int:
+    """Total calories for a recipe from its ingredients (needs ingredients loaded).
+
+    Amounts that are not plain numbers (e.g. "适量", "1e2") count as zero.
+    """
+    total = 0.0
+    if hasattr(recipe, "recipe_ingredients"):
+        for ri in recipe.recipe_ingredients:
+            amount = parse_amount(ri.amount)
+            cal = ri.ingredient.calorie if ri.ingredient and ri.ingredient.calorie else 0
+            total += amount * cal
+    return round(total)
@@ -1,93 +1,996 @@
-"""MeiliSearch integration service for recipe indexing and search."""
-import meilisearch
+"""Search service for recipe indexing and search.
+
+Backed by MeiliSearch, or by the in-process engine in `search_memory` when
+SEARCH_BACKEND is "memory". Callers use the functions below either way.
+"""
+import asyncio
+import contextlib
+import html
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core import query_stats
+from app.core.cache import TTLCache, SingleFlight
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.events import publish_soon, subscribe
+from app.core.metrics import SEARCH_LATENCY
+from app.models.models import Recipe, RecipeIngredient, Ingredient, SynonymGroup, Tag
+from app.services.nutrition import recipe_calories
+from app.services.search_memory import memory_index, memory_ingredient_index, memory_tag_index
 
-_client: meilisearch.Client | None = None
+if TYPE_CHECKING:
+    import meilisearch
+
+logger = logging.getLogger(__name__)
+
+_client: "meilisearch.Client | None" = None
 INDEX_NAME = "recipes"
+INGREDIENT_INDEX = "ingredients"
+TAG_INDEX = "tags"
+
+_MEMORY_INDEXES = {
+    INDEX_NAME: memory_index,
+    INGREDIENT_INDEX: memory_ingredient_index,
+    TAG_INDEX: memory_tag_index,
+}
+
+# Ingredient categories whose names are indexed as main_ingredients
+MAIN_INGREDIENT_CATEGORIES = {"主料", "辅料"}
+# Attributes whose value counts are returned when facets are requested
+FACET_ATTRIBUTES = ["tags", "main_ingredients"]
+
+# Trips after repeated Meili failures/timeouts so search goes straight to PostgreSQL
+meili_breaker = CircuitBreaker(
+    failure_threshold=settings.SEARCH_BREAKER_FAILURES,
+    reset_timeout=settings.SEARCH_BREAKER_RESET_SECONDS,
+)
+
+# Search results keyed on (index version, normalized query, filters, paging).
+# The version is bumped after every successful index or synonym write, so
+# entries cached before a write are never served after it; other workers
+# bump theirs when notified through app.core.events. Meili applies writes
+# asynchronously: until a write's task has finished nothing is cached, and
+# the version is bumped again once it has (see _track_task).
+search_cache = TTLCache(maxsize=settings.SEARCH_CACHE_SIZE, ttl=settings.SEARCH_CACHE_TTL_SECONDS)
+# Autocomplete suggestions per (index version, prefix), kept only briefly;
+# concurrent identical prefixes share one backend call. Every limit is served
+# from the top SUGGEST_MAX_LIMIT hits. A longer prefix is not served by
+# filtering a shorter one's hits: Meili matches typos and every searchable
+# field, so its hits for "番茄炒" are not a subset of those for "番茄".
+SUGGEST_MAX_LIMIT = 20
+suggest_cache = TTLCache(maxsize=settings.SEARCH_CACHE_SIZE, ttl=settings.SEARCH_SUGGEST_CACHE_TTL_SECONDS)
+suggest_inflight = SingleFlight()
+_index_version = 0
+_version_lock = threading.Lock()
+# Meili tasks of index / synonym writes not yet applied, awaited in order by one thread
+_pending_tasks: set[int] = set()
+_task_waiter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="meili-tasks")
+TASK_WAIT_TIMEOUT_MS = 60000
+# Transaction-level advisory lock key serializing synonym group edits across workers
+SYNONYM_LOCK_KEY = 7_324_002
+
+# Tags around matches in snippets and suggestion highlights. Those are HTML:
+# the text around the tags is always escaped.
+HIGHLIGHT_PRE_TAG = "<em>"
+HIGHLIGHT_POST_TAG = "</em>"
+# What Meili is asked to put around matches in '_formatted' instead, since it
+# does not escape the text; see _meili_markup
+MEILI_PRE_TAG = "\ue000"
+MEILI_POST_TAG = "\ue001"
+
+
+def get_index_version() -> int:
+    return _index_version
+
+
+INDEX_CHANGED_EVENT = "search_index_changed"
+
+
+def _bump_index_version(notify: bool = True):
+    """Invalidate cached results here and, via events, in the other workers."""
+    global _index_version
+    with _version_lock:
+        _index_version += 1
+    if notify:
+        publish_soon(INDEX_CHANGED_EVENT)
+
+
+def _track_task(task_uid: int | None):
+    """Invalidate cached results for a write Meili has enqueued, and again once it is applied.
+
+    Searches made in between may still see the old documents, so they are not
+    cached (see _cacheable) while any write is pending.
+    """
+    _bump_index_version()
+    if task_uid is None:
+        return
+    with _version_lock:
+        _pending_tasks.add(task_uid)
+    _task_waiter.submit(_await_task, task_uid)
+
+
+def _await_task(task_uid: int):
+    try:
+        task = get_meili_client().wait_for_task(task_uid, timeout_in_ms=TASK_WAIT_TIMEOUT_MS)
+        if task.status != "succeeded":
+            logger.warning(f"MeiliSearch task {task_uid} {task.status}: {task.error}")
+    except Exception as e:
+        logger.warning(f"Could not wait for MeiliSearch task {task_uid}: {e}")
+    finally:
+        with _version_lock:
+            _pending_tasks.discard(task_uid)
+        _bump_index_version()
+
+
+def _cacheable() -> bool:
+    """Whether results read now may be cached: no index write is still being applied."""
+    return not _pending_tasks
 
 
-def get_meili_client() -> meilisearch.Client:
+subscribe(INDEX_CHANGED_EVENT, lambda _data: _bump_index_version(notify=False))
+
+
+def get_meili_client() -> "meilisearch.Client":
     global _client
     if _client is None:
-        _client = meilisearch.Client(settings.MEILI_HOST, settings.MEILI_MASTER_KEY)
+        # Imported here: the client library is slow to import and unused by the memory backend
+        import meilisearch
+        _client = meilisearch.Client(
+            settings.MEILI_HOST, settings.MEILI_MASTER_KEY, timeout=settings.MEILI_TIMEOUT,
+        )
     return _client
 
 
-def setup_index():
-    """Configure MeiliSearch index settings."""
-    client = get_meili_client()
-    index = client.index(INDEX_NAME)
-    # Searchable attributes by priority: name > main ingredients > tags
-    index.update_searchable_attributes(["name", "main_ingredients", "tags"])
-    # Filterable attributes for tag filtering
-    index.update_filterable_attributes(["tags"])
-    # Sortable attributes
-    index.update_sortable_attributes(["name"])
+def _use_memory() -> bool:
+    return settings.SEARCH_BACKEND == "memory"
 
 
-def index_recipe(recipe_id: int, name: str, tags: list[str], main_ingredients: list[str]):
-    """Add or update a recipe in the search index."""
-    client = get_meili_client()
-    index = client.index(INDEX_NAME)
-    doc = {
+@contextlib.contextmanager
+def _timed(operation: str, backend: str | None = None):
+    """Time a search backend call for SEARCH_LATENCY (defaults to the configured backend).
+
+    Also adds it to the request's search time, except for the database
+    fallback, whose queries already count as database time.
+    """
+    backend = backend or ("memory" if _use_memory() else "meili")
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SEARCH_LATENCY.labels(backend, operation).observe(elapsed)
+        if backend != "database":
+            query_stats.add_search_time(elapsed)
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _add_documents(index_name: str, docs: list[dict]):
+    task_uid = None
+    if _use_memory():
+        _MEMORY_INDEXES[index_name].add_documents(docs)
+    else:
+        task_uid = get_meili_client().index(index_name).add_documents(docs).task_uid
+    _track_task(task_uid)
+
+
+def _delete_document(index_name: str, doc_id: int):
+    task_uid = None
+    if _use_memory():
+        _MEMORY_INDEXES[index_name].delete_document(doc_id)
+    else:
+        task_uid = get_meili_client().index(index_name).delete_document(doc_id).task_uid
+    _track_task(task_uid)
+
+
+# Long text fields: searchable below name / ingredients / tags, returned only as a snippet
+TEXT_FIELDS = ["description", "steps", "tips"]
+# Fields a recipe search hit carries, enough for a result card
+HIT_ATTRIBUTES = ["id", "name", "tags", "main_ingredients", "calories"]
+# Snippet size: Meili crops in words, the memory / PostgreSQL backends in characters
+MEILI_CROP_LENGTH = 20
+SNIPPET_LENGTH = 40
+CROP_MARKER = "…"
+
+_HTML_BLOCK_TAG_RE = re.compile(r"</?(?:p|div|br|li|ul|ol|h[1-6]|tr|td|th|blockquote|pre)\b[^>]*>", re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_MARKUP_RE = re.compile(r"[#>*`~|]+")
+
+
+def plain_text(text: str | None) -> str:
+    """Strip HTML tags and Markdown markup from rich text, collapsing whitespace."""
+    text = _HTML_TAG_RE.sub("", _HTML_BLOCK_TAG_RE.sub(" ", text or ""))
+    text = _MD_LINK_RE.sub(r"\1", _MD_IMAGE_RE.sub(" ", html.unescape(text)))
+    return " ".join(_MD_MARKUP_RE.sub("", text).split())
+
+
+def recipe_document(
+    recipe_id: int, name: str, tags: list[str], main_ingredients: list[str], calories: int = 0,
+    description: str = "", steps: str = "", tips: str = "", views: int = 0,
+) -> dict:
+    """Search document for a recipe; rich text fields are stored as plain text."""
+    return {
         "id": recipe_id,
         "name": name,
         "tags": tags,
         "main_ingredients": main_ingredients,
+        "calories": calories,
+        "description": plain_text(description),
+        "steps": plain_text(steps),
+        "tips": plain_text(tips),
+        "views": views,
     }
-    index.add_documents([doc])
+
+
+def crop_snippet(text: str, query: str, length: int = SNIPPET_LENGTH) -> str:
+    """Crop `text` to about `length` characters around the first query match, highlighted."""
+    lowered = text.lower()
+    positions = [p for p in (lowered.find(t) for t in query.lower().split()) if p >= 0]
+    start = max(0, min(positions) - length // 4) if positions else 0
+    snippet = text[start:start + length]
+    if start > 0:
+        snippet = CROP_MARKER + snippet
+    if start + length < len(text):
+        snippet += CROP_MARKER
+    return highlight(snippet, query)
+
+
+def text_snippet(doc: dict, query: str) -> str:
+    """Snippet from the first text field that matches the query, else the description."""
+    terms = query.lower().split()
+    for field in TEXT_FIELDS:
+        text = doc.get(field) or ""
+        if terms and any(t in text.lower() for t in terms):
+            return crop_snippet(text, query)
+    return crop_snippet(doc.get("description") or "", query)
+
+
+def _meili_markup(formatted: str) -> str:
+    """Meili '_formatted' text as HTML: escaped, with the match markers turned into highlight tags."""
+    return (
+        html.escape(formatted, quote=False)
+        .replace(MEILI_PRE_TAG, HIGHLIGHT_PRE_TAG)
+        .replace(MEILI_POST_TAG, HIGHLIGHT_POST_TAG)
+    )
+
+
+def _meili_snippet(hit: dict) -> str:
+    formatted = hit.get("_formatted") or {}
+    for field in TEXT_FIELDS:
+        if MEILI_PRE_TAG in (formatted.get(field) or ""):
+            return _meili_markup(formatted[field])
+    return _meili_markup(formatted.get("description") or "")
+
+
+def _recipe_hits(result: dict, query: str) -> dict:
+    """Trim recipe hits to HIT_ATTRIBUTES plus a highlighted 'snippet'."""
+    result["hits"] = [
+        {
+            **{k: h.get(k) for k in HIT_ATTRIBUTES},
+            "snippet": _meili_snippet(h) if "_formatted" in h else text_snippet(h, query),
+        }
+        for h in result["hits"]
+    ]
+    return result
+
+
+def _recipe_search_params() -> dict:
+    """Meili parameters returning card fields and cropped, highlighted text snippets."""
+    return {
+        "attributesToRetrieve": HIT_ATTRIBUTES,
+        "attributesToCrop": TEXT_FIELDS,
+        "cropLength": MEILI_CROP_LENGTH,
+        "cropMarker": CROP_MARKER,
+        "attributesToHighlight": TEXT_FIELDS,
+        "highlightPreTag": MEILI_PRE_TAG,
+        "highlightPostTag": MEILI_POST_TAG,
+    }
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Structured search filters, translated per backend (never raw filter strings).
+
+    tags: tag names, all required (tag_mode "and") or any one (tag_mode "or")
+    ingredients: main ingredient names, all required
+    min_calories / max_calories: inclusive calorie range
+    """
+    tags: tuple[str, ...] = ()
+    tag_mode: str = "and"
+    ingredients: tuple[str, ...] = ()
+    min_calories: int | None = None
+    max_calories: int | None = None
+
+
+def _quote(value: str) -> str:
+    """Quote a string for a MeiliSearch filter expression."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def build_meili_filter(filters: SearchFilters | None) -> list | None:
+    """Build a MeiliSearch array filter: outer items are ANDed, inner lists ORed."""
+    if filters is None:
+        return None
+    clauses: list = []
+    tag_clauses = [f"tags = {_quote(t)}" for t in filters.tags]
+    if filters.tag_mode == "or" and len(tag_clauses) > 1:
+        clauses.append(tag_clauses)
+    else:
+        clauses.extend(tag_clauses)
+    clauses.extend(f"main_ingredients = {_quote(i)}" for i in filters.ingredients)
+    if filters.min_calories is not None:
+        clauses.append(f"calories >= {int(filters.min_calories)}")
+    if filters.max_calories is not None:
+        clauses.append(f"calories <= {int(filters.max_calories)}")
+    return clauses or None
+
+
+def main_ingredient_names(recipe) -> list[str]:
+    """Names of a recipe's main/side ingredients (needs ingredient categories loaded)."""
+    return [
+        ri.ingredient.name for ri in recipe.recipe_ingredients
+        if ri.ingredient and ri.ingredient.category_rel
+        and ri.ingredient.category_rel.name in MAIN_INGREDIENT_CATEGORIES
+    ]
+
+
+# Desired settings per index. Searchable attribute order is ranking priority:
+# name > main ingredients > tags > text for recipes, name > category otherwise.
+INDEX_SETTINGS = {
+    INDEX_NAME: {
+        "searchableAttributes": ["name", "main_ingredients", "tags", *TEXT_FIELDS],
+        # tag / ingredient / calorie filters and facets; id to check which recipes are indexed
+        "filterableAttributes": ["id", "tags", "main_ingredients", "calories"],
+        "sortableAttributes": ["name", "calories", "views"],
+        # Meili's default rules, with popularity as the final tie-break
+        "rankingRules": ["words", "typo", "proximity", "attribute", "sort", "exactness", "views:desc"],
+    },
+    INGREDIENT_INDEX: {"searchableAttributes": ["name", "category"]},
+    TAG_INDEX: {"searchableAttributes": ["name", "category"]},
+}
+# Settings whose value is a set, where Meili may return another order
+_UNORDERED_SETTINGS = {"filterableAttributes", "sortableAttributes"}
+
+
+def _attribute_names(value) -> list[str]:
+    """Attribute names from a settings list; newer Meili returns filterable
+    attributes as {"attributePatterns": [...], ...} objects."""
+    names = []
+    for item in value or []:
+        if isinstance(item, dict):
+            names.extend(item.get("attributePatterns", []))
+        else:
+            names.append(item)
+    return names
+
+
+def settings_diff(current: dict, desired: dict) -> dict:
+    """The part of `desired` that differs from an index's current settings."""
+    diff = {}
+    for key, value in desired.items():
+        have = _attribute_names(current.get(key))
+        if key in _UNORDERED_SETTINGS:
+            same = set(have) == set(value)
+        else:
+            same = have == value
+        if not same:
+            diff[key] = value
+    return diff
+
+
+class SearchSetupError(Exception):
+    """Meili rejected an index settings update."""
+
+
+def setup_index(timeout_ms: int = 10000) -> dict[str, dict]:
+    """Bring MeiliSearch index settings up to INDEX_SETTINGS. The memory backend needs no setup.
+
+    Settings changes make Meili reindex, so only settings that differ are sent;
+    a second run is a no-op. Waits up to `timeout_ms` for each update task
+    (MeilisearchTimeoutError if one takes longer) and raises SearchSetupError
+    if Meili rejected any of them. Returns the applied changes per index.
+    """
+    if _use_memory():
+        return {}
+    from meilisearch.errors import MeilisearchApiError
+
+    client = get_meili_client()
+    applied, task_uids = {}, {}
+    for name, desired in INDEX_SETTINGS.items():
+        index = client.index(name)
+        try:
+            current = index.get_settings()
+        except MeilisearchApiError as e:
+            if e.code != "index_not_found":
+                raise
+            current = {}  # update_settings creates the index
+        diff = settings_diff(current, desired)
+        if diff:
+            task_uids[name] = index.update_settings(diff).task_uid
+            applied[name] = diff
+    failures = []
+    for name, uid in task_uids.items():
+        task = client.wait_for_task(uid, timeout_in_ms=timeout_ms)
+        if task.status != "succeeded":
+            failures.append(f"{name}: task {uid} {task.status}: {task.error}")
+    if failures:
+        raise SearchSetupError("; ".join(failures))
+    return applied
+
+
+def index_recipe(
+    recipe_id: int, name: str, tags: list[str], main_ingredients: list[str], calories: int = 0,
+    description: str = "", steps: str = "", tips: str = "", views: int = 0,
+):
+    """Add or update a recipe in the search index. Rich text fields are stored as plain text."""
+    doc = recipe_document(recipe_id, name, tags, main_ingredients, calories, description, steps, tips, views)
+    _add_documents(INDEX_NAME, [doc])
+
+
+def update_view_counts(view_counts: dict[int, int]):
+    """Set the 'views' attribute of indexed recipes (a partial update).
+
+    Recipes missing from the index are skipped: Meili's partial update is an
+    upsert and would add them as nameless {id, views} stubs. Views only break
+    ranking ties, so cached results are left to expire.
+    """
+    if not view_counts:
+        return
+    if _use_memory():
+        memory_index.update_documents([{"id": i, "views": v} for i, v in view_counts.items()])
+        return
+    index = get_meili_client().index(INDEX_NAME)
+    indexed = index.get_documents({
+        "fields": ["id"],
+        "filter": f"id IN [{', '.join(str(int(i)) for i in view_counts)}]",
+        "limit": len(view_counts),
+    }).results
+    docs = [{"id": doc.id, "views": view_counts[doc.id]} for doc in indexed]
+    if docs:
+        index.update_documents(docs)
 
 
 def remove_recipe(recipe_id: int):
     """Remove a recipe from the search index."""
-    client = get_meili_client()
-    index = client.index(INDEX_NAME)
-    index.delete_document(recipe_id)
+    _delete_document(INDEX_NAME, recipe_id)
+
+
+def ingredient_document(ing: Ingredient) -> dict:
+    """Search document for an ingredient (needs category_rel loaded)."""
+    return {
+        "id": ing.id,
+        "name": ing.name,
+        "unit": ing.unit,
+        "category": ing.category_rel.name if ing.category_rel else "",
+    }
+
+
+def tag_document(tag: Tag) -> dict:
+    """Search document for a tag (needs category_rel loaded)."""
+    return {
+        "id": tag.id,
+        "name": tag.name,
+        "category": tag.category_rel.name if tag.category_rel else "",
+        "color": tag.category_rel.color if tag.category_rel else None,
+    }
+
+
+def index_ingredient(ing: Ingredient):
+    """Add or update an ingredient in the ingredient index."""
+    _add_documents(INGREDIENT_INDEX, [ingredient_document(ing)])
+
+
+def remove_ingredient(ingredient_id: int):
+    _delete_document(INGREDIENT_INDEX, ingredient_id)
+
 
+def index_tag(tag: Tag):
+    """Add or update a tag in the tag index."""
+    _add_documents(TAG_INDEX, [tag_document(tag)])
 
-def search_recipes(query: str, tag_filter: str | None = None, limit: int = 20, offset: int = 0) -> dict:
-    """Search recipes via MeiliSearch.
+
+def remove_tag(tag_id: int):
+    _delete_document(TAG_INDEX, tag_id)
+
+
+def search_recipes(
+    query: str,
+    filters: SearchFilters | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    facets: bool = False,
+) -> dict:
+    """Search recipes in the configured search backend.
 
     Args:
         query: Search query string
-        tag_filter: Optional MeiliSearch filter string, e.g. 'tags = "川菜"'
+        filters: Optional tag / ingredient / calorie filters
         limit: Max results to return
         offset: Offset for pagination
+        facets: Also return 'facetDistribution' counts for FACET_ATTRIBUTES
 
     Returns:
         MeiliSearch search result dict with 'hits', 'estimatedTotalHits', etc.
+        Results are served from `search_cache` when possible; callers must not mutate them.
     """
-    client = get_meili_client()
-    index = client.index(INDEX_NAME)
-    params = {"limit": limit, "offset": offset}
-    if tag_filter:
-        params["filter"] = tag_filter
-    return index.search(query, params)
+    key = (_index_version, _normalize_query(query), filters, limit, offset, facets)
+    result = search_cache.get(key)
+    if result is not None:
+        return result
+    with _timed("search"):
+        if _use_memory():
+            result = memory_index.search(
+                query, filters=filters, limit=limit, offset=offset,
+                facets=FACET_ATTRIBUTES if facets else None,
+            )
+        else:
+            client = get_meili_client()
+            index = client.index(INDEX_NAME)
+            params = {"limit": limit, "offset": offset, **_recipe_search_params()}
+            meili_filter = build_meili_filter(filters)
+            if meili_filter:
+                params["filter"] = meili_filter
+            if facets:
+                params["facets"] = FACET_ATTRIBUTES
+            result = index.search(query, params)
+    result = _recipe_hits(result, query)
+    if _cacheable():
+        search_cache.set(key, result)
+    return result
+
+
+async def search_with_fallback(
+    db: AsyncSession,
+    query: str,
+    filters: SearchFilters | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    facets: bool = False,
+) -> dict:
+    """Search via MeiliSearch, falling back to PostgreSQL when Meili is unavailable.
+
+    Meili errors and timeouts are counted by `meili_breaker`; once it opens, queries
+    go straight to the database until the reset timeout lets a trial request through.
+    Both paths return the MeiliSearch result shape ('hits', 'estimatedTotalHits').
+    """
+    if _use_memory():
+        return search_recipes(query, filters, limit=limit, offset=offset, facets=facets)
+    if meili_breaker.allow():
+        try:
+            # The Meili client is synchronous: keep its round trip off the event loop
+            result = await asyncio.to_thread(
+                search_recipes, query, filters, limit=limit, offset=offset, facets=facets,
+            )
+        except Exception as e:
+            meili_breaker.record_failure()
+            logger.warning(f"MeiliSearch unavailable, using database search: {e}")
+        else:
+            meili_breaker.record_success()
+            return result
+    # Imported here: search_db depends on this module
+    from app.services.search_db import search_recipes_db
+    with _timed("search", "database"):
+        return await search_recipes_db(db, query, filters, limit=limit, offset=offset, facets=facets)
+
+
+def highlight(text: str, query: str) -> str:
+    """HTML-escape `text` and wrap case-insensitive occurrences of the query terms in highlight tags."""
+    terms = sorted({t for t in query.split() if t}, key=len, reverse=True)
+    if not terms:
+        return html.escape(text, quote=False)
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    parts, end = [], 0
+    for m in pattern.finditer(text):
+        parts.append(html.escape(text[end:m.start()], quote=False))
+        parts.append(f"{HIGHLIGHT_PRE_TAG}{html.escape(m.group(0), quote=False)}{HIGHLIGHT_POST_TAG}")
+        end = m.end()
+    parts.append(html.escape(text[end:], quote=False))
+    return "".join(parts)
+
+
+def _suggestion(hit: dict, prefix: str) -> dict:
+    return {"id": hit["id"], "name": hit["name"], "highlight": highlight(hit["name"], prefix)}
+
+
+def suggest_recipes(prefix: str, limit: int = 8) -> list[dict]:
+    """Recipe name suggestions for a typed prefix: [{id, name, highlight}].
+
+    Meili returns only id and name, with the match highlighted in the name.
+    """
+    if _use_memory():
+        with _timed("suggest"):
+            hits = memory_index.search(prefix, limit=limit)["hits"]
+        return [_suggestion(h, prefix) for h in hits]
+    index = get_meili_client().index(INDEX_NAME)
+    with _timed("suggest"):
+        result = index.search(prefix, {
+            "limit": limit,
+            "attributesToRetrieve": ["id", "name"],
+            "attributesToHighlight": ["name"],
+            "highlightPreTag": MEILI_PRE_TAG,
+            "highlightPostTag": MEILI_POST_TAG,
+        })
+    return [
+        {"id": h["id"], "name": h["name"], "highlight": _meili_markup(h.get("_formatted", {}).get("name", h["name"]))}
+        for h in result["hits"]
+    ]
+
+
+async def suggest_with_fallback(db: AsyncSession, prefix: str, limit: int = 8) -> list[dict]:
+    """Cached, de-duplicated suggest_recipes, from PostgreSQL while Meili is unavailable.
+
+    `limit` is at most SUGGEST_MAX_LIMIT.
+    """
+    prefix = " ".join(prefix.split())
+    if not prefix:
+        return []
+    key = (_index_version, prefix.lower())
+    hits = suggest_cache.get(key)
+    if hits is not None:
+        return hits[:limit]
+    if _use_memory():
+        hits = suggest_recipes(prefix, SUGGEST_MAX_LIMIT)
+        suggest_cache.set(key, hits)
+        return hits[:limit]
+    if meili_breaker.allow():
+        try:
+            # In a thread, so identical prefixes arriving meanwhile join this call
+            hits = await suggest_inflight.do(
+                key, lambda: asyncio.to_thread(suggest_recipes, prefix, SUGGEST_MAX_LIMIT),
+            )
+        except Exception as e:
+            meili_breaker.record_failure()
+            logger.warning(f"MeiliSearch unavailable, using database suggestions: {e}")
+        else:
+            meili_breaker.record_success()
+            if _cacheable():
+                suggest_cache.set(key, hits)
+            return hits[:limit]
+    from app.services.search_db import search_recipes_db
+    with _timed("suggest", "database"):
+        result = await search_recipes_db(db, prefix, limit=limit)
+    return [_suggestion(h, prefix) for h in result["hits"]]
+
+
+def multi_search(query: str, limits: dict[str, int]) -> dict[str, dict]:
+    """Search several indexes in one backend call (Meili multi-search).
+
+    `limits` maps index name (recipes / ingredients / tags) to its max hits.
+    Returns {index name: MeiliSearch result dict}, cached like search_recipes.
+    """
+    key = ("multi", _index_version, _normalize_query(query), tuple(sorted(limits.items())))
+    results = search_cache.get(key)
+    if results is not None:
+        return results
+    with _timed("multi"):
+        if _use_memory():
+            results = {
+                name: _MEMORY_INDEXES[name].search(query, limit=limit) for name, limit in limits.items()
+            }
+        else:
+            response = get_meili_client().multi_search([
+                {
+                    "indexUid": name, "q": query, "limit": limit,
+                    **(_recipe_search_params() if name == INDEX_NAME else {}),
+                }
+                for name, limit in limits.items()
+            ])
+            results = {r["indexUid"]: r for r in response["results"]}
+    if INDEX_NAME in results:
+        _recipe_hits(results[INDEX_NAME], query)
+    if _cacheable():
+        search_cache.set(key, results)
+    return results
+
+
+async def multi_search_with_fallback(db: AsyncSession, query: str, limits: dict[str, int]) -> dict[str, dict]:
+    """multi_search, answered from PostgreSQL while Meili is unavailable."""
+    if _use_memory():
+        return multi_search(query, limits)
+    if meili_breaker.allow():
+        try:
+            results = await asyncio.to_thread(multi_search, query, limits)
+        except Exception as e:
+            meili_breaker.record_failure()
+            logger.warning(f"MeiliSearch unavailable, using database multi-search: {e}")
+        else:
+            meili_breaker.record_success()
+            return results
+    from app.services.search_db import multi_search_db
+    with _timed("multi", "database"):
+        return await multi_search_db(db, query, limits)
 
 
 def get_synonyms() -> dict[str, list[str]]:
-    """Get current synonym groups from MeiliSearch."""
+    """Get current synonym groups from the search backend."""
+    if _use_memory():
+        return memory_index.get_synonyms()
     client = get_meili_client()
     index = client.index(INDEX_NAME)
     return index.get_synonyms()
 
 
-def update_synonyms(synonyms: dict[str, list[str]]):
-    """Update synonym groups in MeiliSearch with bidirectional expansion.
+def _clean_group(words: list[str]) -> set[str]:
+    return {w.strip() for w in words if w.strip()}
+
+
+def _merge_groups(groups: list[list[str]]) -> list[set[str]]:
+    """Merge groups sharing a word, so {A, B} and {B, C} become {A, B, C}."""
+    merged: list[set[str]] = []
+    for words in groups:
+        group = _clean_group(words)
+        if len(group) < 2:
+            continue
+        for other in [g for g in merged if g & group]:
+            merged.remove(other)
+            group |= other
+        merged.append(group)
+    return merged
+
 
-    Input: {"番茄": ["西红柿", "洋柿子"]}
-    Expanded: each word in the group maps to all others.
+def expand_groups(groups: list[list[str]]) -> dict[str, list[str]]:
+    """Build the bidirectional synonym map the search backends use.
+
+    Groups sharing a word are merged first, so synonymy is transitive. Each
+    word maps to all others in its merged group.
+    """
+    return {word: sorted(group - {word}) for group in _merge_groups(groups) for word in sorted(group)}
+
+
+def expand_synonyms(synonyms: dict[str, list[str]]) -> dict[str, list[str]]:
+    """expand_groups for {"番茄": ["西红柿", "洋柿子"]}-style input, one group per key."""
+    return expand_groups([[key, *vals] for key, vals in synonyms.items()])
+
+
+def _set_synonyms(expanded: dict[str, list[str]]) -> int | None:
+    """Replace the backend's synonym map; returns the Meili task uid (None for memory).
+
+    Meili has no partial synonym update: the whole map is sent every time.
     """
-    # Build bidirectional synonym map
-    expanded: dict[str, set[str]] = {}
-    for key, vals in synonyms.items():
-        group = {key.strip()} | {v.strip() for v in vals if v.strip()}
-        for word in group:
-            if word not in expanded:
-                expanded[word] = set()
-            expanded[word].update(group - {word})
+    task_uid = None
+    if _use_memory():
+        memory_index.update_synonyms(expanded)
+    else:
+        task_uid = get_meili_client().index(INDEX_NAME).update_synonyms(expanded).task_uid
+    _track_task(task_uid)
+    return task_uid
+
+
+def _file_synonym_groups() -> list[list[str]]:
+    """Groups from SEARCH_SYNONYMS_FILE, which only the memory backend reads."""
+    if not (_use_memory() and settings.SEARCH_SYNONYMS_FILE):
+        return []
+    with open(settings.SEARCH_SYNONYMS_FILE, encoding="utf-8") as f:
+        return [[key, *vals] for key, vals in json.load(f).items()]
+
+
+async def load_synonym_groups(db: AsyncSession) -> list[list[str]]:
+    """Stored synonym groups, as given (not yet merged)."""
+    result = await db.execute(select(SynonymGroup.words).order_by(SynonymGroup.id))
+    return [list(words) for words in result.scalars().all()]
+
+
+async def _edit_synonym_groups(db: AsyncSession, edit) -> tuple[bool, int | None]:
+    """Apply `edit(db)` to the stored groups and send the backend the new map if it changed.
+
+    The synonym_groups table is the source of truth. Edits from all workers
+    are serialized by an advisory lock held until commit, so the backend
+    receives maps in the order the edits were made and the last one wins.
+    A database without groups first adopts the backend's current map, as
+    set before groups were stored. Returns (changed, Meili task uid).
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SYNONYM_LOCK_KEY})
+    groups = await load_synonym_groups(db)
+    if not groups:
+        current = await asyncio.to_thread(get_synonyms)
+        groups = [sorted(g) for g in _merge_groups([[word, *others] for word, others in current.items()])]
+        db.add_all(SynonymGroup(words=words) for words in groups)
+    before = expand_groups(groups + _file_synonym_groups())
+    await edit(db)
+    await db.flush()
+    after = expand_groups(await load_synonym_groups(db) + _file_synonym_groups())
+    task_uid = None
+    if after != before:
+        task_uid = await asyncio.to_thread(_set_synonyms, after)
+    await db.commit()
+    return after != before, task_uid
+
+
+async def update_synonyms(db: AsyncSession, synonyms: dict[str, list[str]]) -> tuple[bool, int | None]:
+    """Replace all synonym groups, one per key: {"番茄": ["西红柿"]}."""
+    async def replace(db):
+        await db.execute(delete(SynonymGroup))
+        db.add_all(
+            SynonymGroup(words=sorted(_clean_group([key, *vals])))
+            for key, vals in synonyms.items() if len(_clean_group([key, *vals])) >= 2
+        )
+
+    return await _edit_synonym_groups(db, replace)
+
+
+async def add_synonym_group(db: AsyncSession, words: list[str]) -> tuple[bool, int | None]:
+    """Store one synonym group; it merges with any group sharing a word."""
+    async def add(db):
+        db.add(SynonymGroup(words=sorted(_clean_group(words))))
+
+    return await _edit_synonym_groups(db, add)
+
+
+async def remove_synonym_group(db: AsyncSession, words: list[str]) -> tuple[bool, int | None]:
+    """Delete the stored groups made of exactly these words; groups they were merged with stay."""
+    group = _clean_group(words)
+
+    async def remove(db):
+        for row in (await db.execute(select(SynonymGroup))).scalars().all():
+            if _clean_group(row.words) == group:
+                await db.delete(row)
+
+    return await _edit_synonym_groups(db, remove)
+
+
+def get_task(task_uid: int, wait: bool = False, timeout_ms: int = 5000) -> dict:
+    """Status of a Meili task, optionally waiting up to `timeout_ms` for it to finish.
+
+    Returns the task as it stands when the wait times out.
+    """
+    from meilisearch.errors import MeilisearchTimeoutError
 
-    final = {k: sorted(v) for k, v in expanded.items() if v}
     client = get_meili_client()
-    index = client.index(INDEX_NAME)
-    index.update_synonyms(final)
+    task = None
+    if wait:
+        try:
+            task = client.wait_for_task(task_uid, timeout_in_ms=timeout_ms)
+        except MeilisearchTimeoutError:
+            pass
+    if task is None:
+        task = client.get_task(task_uid)
+    return task.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+async def load_search_documents(db: AsyncSession, *where) -> list[dict]:
+    """Build search documents for every recipe in the database, or those matching `where`."""
+    result = await db.execute(
+        select(Recipe).where(*where).options(
+            selectinload(Recipe.tags),
+            selectinload(Recipe.recipe_ingredients)
+            .selectinload(RecipeIngredient.ingredient)
+            .selectinload(Ingredient.category_rel),
+        )
+    )
+    return [
+        recipe_document(
+            r.id, r.name, [t.name for t in r.tags], main_ingredient_names(r), recipe_calories(r),
+            r.description, r.steps, r.tips, r.view_count or 0,
+        )
+        for r in result.scalars().unique().all()
+    ]
+
+
+async def reindex_recipes_with_ingredient(db: AsyncSession, ingredient_id: int, batch_size: int = 1000) -> int:
+    """Re-index the recipes using an ingredient, whose calories and name are part of their documents.
+
+    Recipes are loaded in id order, `batch_size` at a time. Returns how many were sent.
+    """
+    uses = select(RecipeIngredient.recipe_id).where(RecipeIngredient.ingredient_id == ingredient_id)
+    count, last_id, last_task = 0, 0, None
+    while True:
+        docs = await load_search_documents(
+            db, Recipe.id.in_(uses.where(RecipeIngredient.recipe_id > last_id)
+                              .order_by(RecipeIngredient.recipe_id).limit(batch_size)),
+        )
+        if not docs:
+            break
+        last_task = await asyncio.to_thread(bulk_index, INDEX_NAME, docs, batch_size) or last_task
+        count += len(docs)
+        last_id = max(d["id"] for d in docs)
+    if count:
+        _track_task(last_task)
+    return count
+
+
+async def load_ingredient_documents(db: AsyncSession) -> list[dict]:
+    result = await db.execute(select(Ingredient).options(selectinload(Ingredient.category_rel)))
+    return [ingredient_document(i) for i in result.scalars().all()]
+
+
+async def load_tag_documents(db: AsyncSession) -> list[dict]:
+    result = await db.execute(select(Tag).options(selectinload(Tag.category_rel)))
+    return [tag_document(t) for t in result.scalars().all()]
+
+
+async def reindex_tags_in_categories(db: AsyncSession, category_ids: list[int]) -> int:
+    """Re-index the tags of some categories, whose name and color are part of tag documents."""
+    result = await db.execute(
+        select(Tag).where(Tag.category_id.in_(category_ids)).options(selectinload(Tag.category_rel))
+    )
+    docs = [tag_document(t) for t in result.scalars().all()]
+    if docs:
+        _track_task(await asyncio.to_thread(bulk_index, TAG_INDEX, docs))
+    return len(docs)
+
+
+def bulk_index(index_name: str, docs: list[dict], batch_size: int = 1000) -> int | None:
+    """Add many documents to an index in batches, without waiting for Meili to apply them.
+
+    Returns the uid of the last Meili task (None for the memory backend or no
+    documents). Callers in the API pass it to _track_task once they are done.
+    """
+    if not docs:
+        return None
+    if _use_memory():
+        _MEMORY_INDEXES[index_name].add_documents(docs)
+        return None
+    tasks = get_meili_client().index(index_name).add_documents_in_batches(docs, batch_size=batch_size)
+    return tasks[-1].task_uid
+
+
+def replace_meili_documents(index_name: str, docs: list[dict], page_size: int = 10000) -> int | None:
+    """Make a Meili index hold exactly `docs`: add them all, then delete any other ids.
+
+    The others are rows deleted while Meili was unreachable or a sync failed.
+    Returns the uid of the last Meili task, like bulk_index.
+    """
+    task_uid = bulk_index(index_name, docs)
+    keep = {doc["id"] for doc in docs}
+    index = get_meili_client().index(index_name)
+    stale, offset = [], 0
+    while True:
+        page = index.get_documents({"fields": ["id"], "limit": page_size, "offset": offset})
+        stale.extend(doc.id for doc in page.results if doc.id not in keep)
+        offset += len(page.results)
+        if not page.results or offset >= page.total:
+            break
+    if stale:
+        logger.info(f"Removing {len(stale)} stale documents from {index_name}")
+        task_uid = index.delete_documents(stale).task_uid
+    return task_uid
+
+
+async def reindex_all(db: AsyncSession) -> dict[str, int]:
+    """Rebuild the recipe, ingredient and tag indexes from the database.
+
+    Documents whose rows no longer exist are removed. Returns the number of
+    documents sent to each index.
+    """
+    docs = {
+        INDEX_NAME: await load_search_documents(db),
+        INGREDIENT_INDEX: await load_ingredient_documents(db),
+        TAG_INDEX: await load_tag_documents(db),
+    }
+    last_task = None
+    for name, index_docs in docs.items():
+        if _use_memory():
+            _MEMORY_INDEXES[name].clear()
+            bulk_index(name, index_docs)
+        else:
+            last_task = await asyncio.to_thread(replace_meili_documents, name, index_docs) or last_task
+    _track_task(last_task)
+    return {name: len(index_docs) for name, index_docs in docs.items()}
+
+
+async def build_memory_index(db: AsyncSession):
+    """Populate the in-process indexes from the database (synonym groups included).
+
+    Groups in SEARCH_SYNONYMS_FILE ({"番茄": ["西红柿"]}) are added to the stored ones.
+    """
+    counts = await reindex_all(db)
+    groups = await load_synonym_groups(db) + _file_synonym_groups()
+    if groups:
+        memory_index.update_synonyms(expand_groups(groups))
+        _bump_index_version()
+    logger.info(f"Built in-memory search indexes: {counts}")
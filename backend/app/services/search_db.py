@@ -0,0 +1,215 @@
+"""PostgreSQL fallback search used when MeiliSearch is unavailable.
+
+Matches the query against recipe names, ingredient names and tag names with
+pg_trgm (substring ILIKE or trigram similarity, both served by the GIN trigram
+indexes) and ranks name > main_ingredients > tags like the Meili index does.
+"""
+from sqlalchemy import select, func, literal, or_, union_all, case, cast, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.models import Recipe, RecipeIngredient, RecipeTag, Ingredient, IngredientCategory, Tag
+from app.services.nutrition import AMOUNT_PATTERN, recipe_calories
+from app.services.search import (
+    INDEX_NAME, INGREDIENT_INDEX, TAG_INDEX, MAIN_INGREDIENT_CATEGORIES, FACET_ATTRIBUTES,
+    TEXT_FIELDS, SearchFilters, main_ingredient_names, ingredient_document, tag_document,
+    plain_text, text_snippet,
+)
+
+# Field weights; similarity() is < 1 so a name hit always outranks an ingredient hit
+NAME_WEIGHT = 3
+INGREDIENT_WEIGHT = 2
+TAG_WEIGHT = 1
+
+
+def _matches(column, query: str):
+    return or_(column.icontains(query, autoescape=True), column.op("%")(query))
+
+
+def _ranked_matches(query: str):
+    """Subquery of (recipe_id, score) for every recipe matching the query."""
+    name_hits = select(
+        Recipe.id.label("recipe_id"),
+        (literal(NAME_WEIGHT) + func.similarity(Recipe.name, query)).label("score"),
+    ).where(_matches(Recipe.name, query))
+    ingredient_hits = select(
+        RecipeIngredient.recipe_id,
+        (literal(INGREDIENT_WEIGHT) + func.similarity(Ingredient.name, query)).label("score"),
+    ).join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id).where(
+        _matches(Ingredient.name, query)
+    )
+    tag_hits = select(
+        RecipeTag.recipe_id,
+        (literal(TAG_WEIGHT) + func.similarity(Tag.name, query)).label("score"),
+    ).join(Tag, Tag.id == RecipeTag.tag_id).where(_matches(Tag.name, query))
+    hits = union_all(name_hits, ingredient_hits, tag_hits).subquery()
+    return (
+        select(hits.c.recipe_id, func.max(hits.c.score).label("score"))
+        .group_by(hits.c.recipe_id)
+        .subquery()
+    )
+
+
+def _tagged(names):
+    """Recipe ids carrying any of the given tag names."""
+    return select(RecipeTag.recipe_id).join(Tag, Tag.id == RecipeTag.tag_id).where(Tag.name.in_(names))
+
+
+def _main_ingredient_links():
+    """recipe_ingredients joined to main/side ingredients, as indexed in main_ingredients."""
+    return (
+        select(RecipeIngredient.recipe_id, Ingredient.name)
+        .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+        .join(IngredientCategory, IngredientCategory.id == Ingredient.category_id)
+        .where(IngredientCategory.name.in_(MAIN_INGREDIENT_CATEGORIES))
+    )
+
+
+def _recipe_calories():
+    """Subquery of (recipe_id, calories), mirroring nutrition.recipe_calories in SQL."""
+    amount = case(
+        (RecipeIngredient.amount.op("~")(AMOUNT_PATTERN),
+         cast(func.trim(RecipeIngredient.amount), Float)),
+        else_=0.0,
+    )
+    return (
+        select(
+            RecipeIngredient.recipe_id,
+            func.round(func.sum(amount * func.coalesce(Ingredient.calorie, 0))).label("calories"),
+        )
+        .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+        .group_by(RecipeIngredient.recipe_id)
+        .subquery()
+    )
+
+
+def _apply_filters(stmt, id_col, filters: SearchFilters):
+    if filters.tags:
+        if filters.tag_mode == "or":
+            stmt = stmt.where(id_col.in_(_tagged(filters.tags)))
+        else:
+            for name in filters.tags:
+                stmt = stmt.where(id_col.in_(_tagged([name])))
+    for name in filters.ingredients:
+        links = _main_ingredient_links().subquery()
+        stmt = stmt.where(id_col.in_(select(links.c.recipe_id).where(links.c.name == name)))
+    if filters.min_calories is not None and filters.min_calories > 0:
+        cal = _recipe_calories()
+        stmt = stmt.where(id_col.in_(select(cal.c.recipe_id).where(cal.c.calories >= filters.min_calories)))
+    if filters.max_calories is not None:
+        # Recipes without ingredients have 0 calories and no row in the subquery
+        cal = _recipe_calories()
+        stmt = stmt.where(id_col.not_in(select(cal.c.recipe_id).where(cal.c.calories > filters.max_calories)))
+    return stmt
+
+
+async def _facet_distribution(db: AsyncSession, matched_ids) -> dict:
+    """Value counts for FACET_ATTRIBUTES across the matched recipe ids."""
+    tag_counts = await db.execute(
+        select(Tag.name, func.count(func.distinct(RecipeTag.recipe_id)))
+        .join(Tag, Tag.id == RecipeTag.tag_id)
+        .where(RecipeTag.recipe_id.in_(select(matched_ids.c.id)))
+        .group_by(Tag.name)
+    )
+    links = _main_ingredient_links().subquery()
+    ingredient_counts = await db.execute(
+        select(links.c.name, func.count(func.distinct(links.c.recipe_id)))
+        .where(links.c.recipe_id.in_(select(matched_ids.c.id)))
+        .group_by(links.c.name)
+    )
+    distribution = {
+        "tags": dict(tag_counts.all()),
+        "main_ingredients": dict(ingredient_counts.all()),
+    }
+    return {k: v for k, v in distribution.items() if k in FACET_ATTRIBUTES}
+
+
+async def search_recipes_db(
+    db: AsyncSession,
+    query: str,
+    filters: SearchFilters | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    facets: bool = False,
+) -> dict:
+    """Search recipes in PostgreSQL, returning the MeiliSearch result shape."""
+    query = query.strip()
+    if query:
+        ranked = _ranked_matches(query)
+        id_col = ranked.c.recipe_id
+        stmt = select(id_col.label("id")).order_by(ranked.c.score.desc(), id_col.desc())
+    else:
+        # Empty query lists everything, like a placeholder search in Meili
+        stmt = select(Recipe.id).order_by(Recipe.id.desc())
+        id_col = Recipe.id
+    if filters is not None:
+        stmt = _apply_filters(stmt, id_col, filters)
+
+    matched_ids = stmt.order_by(None).subquery()
+    total = await db.scalar(select(func.count()).select_from(matched_ids))
+    ids = list((await db.execute(stmt.limit(limit).offset(offset))).scalars().all())
+    result = {"hits": [], "estimatedTotalHits": total or 0}
+    if facets:
+        result["facetDistribution"] = await _facet_distribution(db, matched_ids)
+    if not ids:
+        return result
+
+    rows = await db.execute(
+        select(Recipe)
+        .where(Recipe.id.in_(ids))
+        .options(
+            selectinload(Recipe.tags),
+            selectinload(Recipe.recipe_ingredients)
+            .selectinload(RecipeIngredient.ingredient)
+            .selectinload(Ingredient.category_rel),
+        )
+    )
+    recipes = {r.id: r for r in rows.scalars().unique().all()}
+    hits = [
+        {
+            "id": r.id,
+            "name": r.name,
+            "tags": [t.name for t in r.tags],
+            "main_ingredients": main_ingredient_names(r),
+            "calories": recipe_calories(r),
+            "snippet": text_snippet({f: plain_text(getattr(r, f)) for f in TEXT_FIELDS}, query),
+        }
+        for r in (recipes.get(rid) for rid in ids)
+        if r is not None
+    ]
+    result["hits"] = hits
+    return result
+
+
+async def _search_named(db: AsyncSession, model, query: str, limit: int) -> dict:
+    """Search ingredients or tags by name, best trigram match first."""
+    query = query.strip()
+    stmt = select(model).options(selectinload(model.category_rel))
+    count = select(func.count()).select_from(model)
+    if query:
+        stmt = stmt.where(_matches(model.name, query)).order_by(
+            func.similarity(model.name, query).desc(), func.length(model.name), model.id
+        )
+        count = count.where(_matches(model.name, query))
+    else:
+        stmt = stmt.order_by(model.id)
+    total = await db.scalar(count)
+    rows = await db.execute(stmt.limit(limit))
+    return {"hits": list(rows.scalars().all()), "estimatedTotalHits": total or 0}
+
+
+async def multi_search_db(db: AsyncSession, query: str, limits: dict[str, int]) -> dict[str, dict]:
+    """PostgreSQL version of search.multi_search."""
+    results = {}
+    for name, limit in limits.items():
+        if name == INDEX_NAME:
+            results[name] = await search_recipes_db(db, query, limit=limit)
+            continue
+        model, to_document = {
+            INGREDIENT_INDEX: (Ingredient, ingredient_document),
+            TAG_INDEX: (Tag, tag_document),
+        }[name]
+        found = await _search_named(db, model, query, limit)
+        found["hits"] = [to_document(obj) for obj in found["hits"]]
+        results[name] = found
+    return results
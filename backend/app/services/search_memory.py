@@ -0,0 +1,230 @@
+"""In-process search engine, a MeiliSearch stand-in for small deployments and tests.
+
+Documents are indexed into per-field inverted indexes of character unigrams and
+bigrams, which works for CJK text without a word segmenter. A query term matches
+a field when the field contains it as a substring (bigram postings narrow the
+candidates, a substring check confirms them). Every term must match some field;
+results are ranked name > main_ingredients > tags > text, like the Meili index settings.
+
+The index lives in process memory: it is rebuilt from the database at startup and
+is only suitable for single-process deployments.
+"""
+import re
+import threading
+import unicodedata
+
+# Searchable fields and their ranking weight for recipes, highest first
+FIELD_WEIGHTS = {"name": 4, "main_ingredients": 3, "tags": 2, "description": 1, "steps": 1, "tips": 1}
+# Ingredient and tag documents: name first, then their category name
+NAME_CATEGORY_WEIGHTS = {"name": 2, "category": 1}
+# Bonus when a field value equals the query term exactly
+EXACT_BONUS = 0.5
+
+_SPLIT_RE = re.compile(r"[\s,，、;；]+")
+
+
+def normalize(text: str) -> str:
+    """Case- and width-fold text (full-width Latin, compatibility forms)."""
+    return unicodedata.normalize("NFKC", text).lower().strip()
+
+
+def _index_grams(text: str) -> set[str]:
+    """All character unigrams and bigrams of each whitespace-separated run."""
+    grams = set()
+    for run in _SPLIT_RE.split(text):
+        grams.update(run)
+        grams.update(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+
+def _query_grams(term: str) -> set[str]:
+    """Grams that every document containing `term` must have indexed."""
+    if len(term) < 2:
+        return {term}
+    return {term[i:i + 2] for i in range(len(term) - 1)}
+
+
+def _values(doc: dict, field: str) -> list[str]:
+    value = doc.get(field)
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [normalize(value)]
+    return [normalize(v) for v in value if v]
+
+
+class MemorySearchIndex:
+    """Inverted index over search documents, recipes by default."""
+
+    def __init__(self, field_weights: dict[str, int] = FIELD_WEIGHTS):
+        self.field_weights = field_weights
+        self._lock = threading.RLock()
+        self._docs: dict[int, dict] = {}
+        self._order: dict[int, int] = {}
+        self._seq = 0
+        self._texts: dict[int, dict[str, list[str]]] = {}
+        self._postings: dict[str, dict[str, set[int]]] = {f: {} for f in field_weights}
+        self._synonyms: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._order.clear()
+            self._texts.clear()
+            for postings in self._postings.values():
+                postings.clear()
+
+    def add_documents(self, docs: list[dict]):
+        """Add or replace documents, keyed on their 'id'."""
+        with self._lock:
+            for doc in docs:
+                doc_id = doc["id"]
+                self._remove(doc_id)
+                self._seq += 1
+                self._docs[doc_id] = dict(doc)
+                self._order[doc_id] = self._seq
+                texts = {field: _values(doc, field) for field in self.field_weights}
+                self._texts[doc_id] = texts
+                for field, values in texts.items():
+                    postings = self._postings[field]
+                    for value in values:
+                        for gram in _index_grams(value):
+                            postings.setdefault(gram, set()).add(doc_id)
+
+    def update_documents(self, docs: list[dict]):
+        """Merge fields into existing documents (Meili partial update); unknown ids are ignored."""
+        with self._lock:
+            merged = [{**self._docs[d["id"]], **d} for d in docs if d["id"] in self._docs]
+            order = {d["id"]: self._order[d["id"]] for d in merged}
+            self.add_documents(merged)
+            self._order.update(order)
+
+    def delete_document(self, doc_id: int):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: int):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._order.pop(doc_id, None)
+        texts = self._texts.pop(doc_id)
+        for field, values in texts.items():
+            postings = self._postings[field]
+            for value in values:
+                for gram in _index_grams(value):
+                    ids = postings.get(gram)
+                    if ids is not None:
+                        ids.discard(doc_id)
+                        if not ids:
+                            del postings[gram]
+
+    def get_synonyms(self) -> dict[str, list[str]]:
+        return {k: list(v) for k, v in self._synonyms.items()}
+
+    def update_synonyms(self, synonyms: dict[str, list[str]]):
+        """Replace the synonym map; expects the already-expanded bidirectional form."""
+        with self._lock:
+            self._synonyms = {normalize(k): [normalize(v) for v in vals] for k, vals in synonyms.items()}
+
+    def _term_scores(self, term: str) -> dict[int, float]:
+        """Best field score per document for a term or any of its synonyms."""
+        scores: dict[int, float] = {}
+        for alt in [term, *self._synonyms.get(term, [])]:
+            grams = _query_grams(alt)
+            for field, weight in self.field_weights.items():
+                postings = self._postings[field]
+                candidates = None
+                for gram in grams:
+                    ids = postings.get(gram)
+                    if not ids:
+                        candidates = set()
+                        break
+                    candidates = set(ids) if candidates is None else candidates & ids
+                for doc_id in candidates or ():
+                    values = self._texts[doc_id][field]
+                    if not any(alt in v for v in values):
+                        continue
+                    score = weight + (EXACT_BONUS if alt in values else 0)
+                    if score > scores.get(doc_id, 0):
+                        scores[doc_id] = score
+        return scores
+
+    def _passes(self, doc_id: int, filters) -> bool:
+        """Apply a search.SearchFilters to one document."""
+        doc = self._docs[doc_id]
+        if filters.tags:
+            doc_tags = set(doc.get("tags") or [])
+            wanted = set(filters.tags)
+            if filters.tag_mode == "or":
+                if not doc_tags & wanted:
+                    return False
+            elif not wanted <= doc_tags:
+                return False
+        if filters.ingredients and not set(filters.ingredients) <= set(doc.get("main_ingredients") or []):
+            return False
+        calories = doc.get("calories") or 0
+        if filters.min_calories is not None and calories < filters.min_calories:
+            return False
+        if filters.max_calories is not None and calories > filters.max_calories:
+            return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        filters=None,
+        limit: int = 20,
+        offset: int = 0,
+        facets: list[str] | None = None,
+    ) -> dict:
+        """Search documents, returning the MeiliSearch result shape.
+
+        `filters` is a search.SearchFilters; `facets` lists attributes to count
+        values of across all matching documents ('facetDistribution').
+        """
+        terms = [t for t in _SPLIT_RE.split(normalize(query)) if t]
+        with self._lock:
+            if terms:
+                totals: dict[int, float] | None = None
+                for term in terms:
+                    scores = self._term_scores(term)
+                    if totals is None:
+                        totals = scores
+                    else:
+                        totals = {d: totals[d] + s for d, s in scores.items() if d in totals}
+                    if not totals:
+                        break
+                matched = totals or {}
+            else:
+                matched = dict.fromkeys(self._docs, 0)
+            if filters is not None:
+                matched = {d: s for d, s in matched.items() if self._passes(d, filters)}
+            # Ties go to the most viewed, then the earliest added
+            ranked = sorted(matched, key=lambda d: (-matched[d], -(self._docs[d].get("views") or 0), self._order[d]))
+            hits = [dict(self._docs[d]) for d in ranked[offset:offset + limit]]
+            result = {
+                "hits": hits,
+                "query": query,
+                "limit": limit,
+                "offset": offset,
+                "estimatedTotalHits": len(ranked),
+            }
+            if facets:
+                distribution: dict[str, dict[str, int]] = {}
+                for field in facets:
+                    counts: dict[str, int] = {}
+                    for d in ranked:
+                        for value in self._docs[d].get(field) or []:
+                            counts[value] = counts.get(value, 0) + 1
+                    distribution[field] = counts
+                result["facetDistribution"] = distribution
+        return result
+
+
+memory_index = MemorySearchIndex()
+memory_ingredient_index = MemorySearchIndex(NAME_CATEGORY_WEIGHTS)
+memory_tag_index = MemorySearchIndex(NAME_CATEGORY_WEIGHTS)
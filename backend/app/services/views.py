@@ -0,0 +1,79 @@
+"""Recipe view counting, coalesced in memory and written in batches.
+
+`get_recipe` only bumps an in-process counter; a background task flushes all
+pending increments every VIEW_FLUSH_INTERVAL_SECONDS in a single
+`UPDATE recipes ... FROM (VALUES ...)` and pushes the new totals to the search
+index. Increments are additive, so several workers can flush independently.
+Views recorded since the last flush are lost if the process is killed.
+"""
+import asyncio
+import logging
+from collections import Counter
+
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.metrics import SEARCH_SYNC_FAILURES
+from app.models.models import Recipe
+from app.services.search import INDEX_NAME, update_view_counts
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Pending view increments per recipe id."""
+
+    def __init__(self):
+        self._pending: Counter[int] = Counter()
+
+    def record(self, recipe_id: int):
+        self._pending[recipe_id] += 1
+
+    def pending(self) -> dict[int, int]:
+        return dict(self._pending)
+
+    async def flush(self, session_factory: async_sessionmaker) -> int:
+        """Write pending increments in one UPDATE; returns the number of recipes updated.
+
+        On failure the increments are put back for the next flush.
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, Counter()
+        increments = values(
+            column("id", Integer), column("n", Integer), name="increments",
+        ).data(list(batch.items()))
+        stmt = (
+            update(Recipe)
+            .where(Recipe.id == increments.c.id)
+            # Keep updated_at: a view is not an edit
+            .values(view_count=Recipe.view_count + increments.c.n, updated_at=Recipe.updated_at)
+            .returning(Recipe.id, Recipe.view_count)
+        )
+        try:
+            async with session_factory() as db:
+                totals = dict((await db.execute(stmt)).all())
+                await db.commit()
+        except Exception as e:
+            self._pending.update(batch)
+            logger.warning(f"Failed to flush {len(batch)} recipe view counts: {e}")
+            return 0
+        try:
+            # Meili's client is synchronous: keep the HTTP call off the event loop
+            await asyncio.to_thread(update_view_counts, totals)
+        except Exception as e:
+            SEARCH_SYNC_FAILURES.labels(INDEX_NAME).inc()
+            logger.warning(f"Failed to sync view counts to search index: {e}")
+        return len(totals)
+
+    async def run(self, session_factory: async_sessionmaker, interval: float):
+        """Flush every `interval` seconds until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush(session_factory)
+        finally:
+            await self.flush(session_factory)
+
+
+view_counter = ViewCounter()
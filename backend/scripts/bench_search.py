@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark search latency: in-process memory backend vs MeiliSearch.
+
+Builds the memory index from the current database, then runs the same
+queries against both backends and prints per-backend latency percentiles.
+MeiliSearch must already be indexed (e.g. via scripts/seed.py).
+
+Usage:
+  cd backend
+  python scripts/bench_search.py                  # default query set, 200 rounds
+  python scripts/bench_search.py --rounds 1000
+  python scripts/bench_search.py 鸡蛋 川菜 番茄    # custom queries
+"""
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.config import settings
+from app.services.search import INDEX_NAME, get_meili_client, load_search_documents
+from app.services.search_memory import MemorySearchIndex
+
+DEFAULT_QUERIES = ["鸡蛋", "川菜", "番茄", "豆腐", "红烧", "牛", "快手菜", "排骨 家常菜", ""]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _run(label: str, search, queries: list[str], rounds: int):
+    samples = []
+    for _ in range(rounds):
+        for q in queries:
+            start = time.perf_counter()
+            search(q)
+            samples.append((time.perf_counter() - start) * 1000)
+    print(
+        f"  {label:<8} n={len(samples):<6} "
+        f"mean={statistics.mean(samples):7.3f}ms  "
+        f"p50={_percentile(samples, 0.50):7.3f}ms  "
+        f"p95={_percentile(samples, 0.95):7.3f}ms  "
+        f"p99={_percentile(samples, 0.99):7.3f}ms"
+    )
+
+
+async def main():
+    args = sys.argv[1:]
+    rounds = 200
+    if "--rounds" in args:
+        i = args.index("--rounds")
+        rounds = int(args[i + 1])
+        del args[i:i + 2]
+    queries = args or DEFAULT_QUERIES
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        start = time.perf_counter()
+        docs = await load_search_documents(db)
+        memory = MemorySearchIndex()
+        memory.add_documents(docs)
+        print(f"[OK] Memory index built: {len(docs)} recipes in {time.perf_counter() - start:.2f}s")
+    await engine.dispose()
+
+    print(f"Queries: {queries}, rounds: {rounds}")
+    _run("memory", lambda q: memory.search(q, limit=20), queries, rounds)
+    try:
+        index = get_meili_client().index(INDEX_NAME)
+        index.search("", {"limit": 1})
+    except Exception as e:
+        print(f"  [WARN] MeiliSearch unavailable, skipped: {e}")
+        return
+    _run("meili", lambda q: index.search(q, {"limit": 20}), queries, rounds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Generate a large, reproducible synthetic dataset for load testing.
+
+Replaces ALL recipes, tags and ingredients (TRUNCATE ... RESTART IDENTITY;
+the schema and admin credentials are kept). The same --seed always produces
+the same data.
+
+Distributions, roughly like a real recipe collection:
+  - tag and ingredient popularity is Zipf-like (a few very common, a long tail)
+  - each recipe has 1-3 main, 0-3 side and 2-5 seasoning ingredients, 1-6 tags
+  - 0-5 images per recipe, most recipes having one or two
+  - view counts are Pareto-distributed, created_at spread over three years
+
+Rows are bulk-loaded with COPY in chunks of --chunk recipes, one transaction
+per chunk. Images are a pool of --image-pool placeholder JPEGs drawn with
+Pillow under UPLOAD_DIR/synthetic/ and shared between recipes. With the
+Meili backend each chunk is sent to the search index in batches as it is
+loaded; the memory backend rebuilds from the database at API startup.
+
+Usage:
+  cd backend
+  python scripts/generate_dataset.py --recipes 100000
+  python scripts/generate_dataset.py --recipes 1000000 --tags 300 --ingredients 3000 --seed 7
+  python scripts/generate_dataset.py --recipes 10000 --no-index --force
+"""
+import asyncio
+import bisect
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.config import settings
+from app.services.search import (
+    INDEX_NAME, INGREDIENT_INDEX, TAG_INDEX, MAIN_INGREDIENT_CATEGORIES,
+    bulk_index, get_meili_client, load_ingredient_documents, load_tag_documents,
+    recipe_document, setup_index,
+)
+from seed import INGREDIENTS, INGREDIENT_CATEGORIES, TAGS, TAG_CATEGORIES
+
+DEFAULTS = {
+    "--recipes": 10000,
+    "--tags": 150,
+    "--ingredients": 1500,
+    "--image-pool": 200,
+    "--seed": 42,
+    "--chunk": 10000,
+}
+
+COLORS = [
+    "#c45d3e", "#5b7a5e", "#b8860b", "#6b5b95", "#2e86ab", "#d4726a",
+    "#3d7068", "#a0522d", "#708090", "#8b6914", "#c44569", "#3c6382",
+]
+# Extra names beyond the seed vocabulary are variants of it
+INGREDIENT_PREFIXES = ["新鲜", "有机", "冷冻", "散养", "进口", "本地", "精选", "野生", "嫩", "老"]
+TAG_SUFFIXES = ["风味", "做法", "系列", "精选", "经典", "创意", "改良", "私房"]
+COOK_METHODS = [
+    "红烧", "清蒸", "爆炒", "干煸", "油焖", "水煮", "糖醋", "蒜蓉", "葱爆", "酱爆",
+    "椒盐", "香煎", "炖", "卤", "焗", "烤", "凉拌", "酸辣", "麻辣", "鱼香", "宫保", "家常",
+]
+NAME_SUFFIXES = ["", "", "", "丁", "片", "丝", "块", "卷", "煲", "汤", "饭", "面"]
+STEP_SENTENCES = [
+    "{main}洗净切块，用料酒和盐腌制十分钟。",
+    "锅中加油烧至七成热，下入{main}翻炒至变色。",
+    "加入{side}爆香，再倒入调好的酱汁。",
+    "转中小火{method}约{minutes}分钟，期间翻动一次。",
+    "起锅烧水，{main}焯水去腥后捞出沥干。",
+    "调入生抽、老抽和少许糖，翻炒均匀上色。",
+    "大火收汁，淋少许香油，撒葱花出锅。",
+    "将{side}切末备用，{main}切成均匀的小块。",
+    "加入适量清水没过食材，盖上锅盖焖煮{minutes}分钟。",
+    "尝一下味道，按口味补盐后装盘。",
+]
+DESCRIPTIONS = [
+    "经典{method}做法，{main}鲜嫩入味，老少皆宜，是一道适合家庭烹饪的菜肴。",
+    "简单易学的{method}{main}，食材简单，步骤清晰，{minutes}分钟即可上桌。",
+    "这道{method}{main}是家常菜的代表，口感层次丰富，非常下饭。",
+    "色香味俱全的{method}{main}，搭配{side}，营养均衡，适合日常餐桌。",
+]
+TIPS = [
+    "火候很关键，大火快炒能锁住{main}的水分。",
+    "{main}提前焯水可以去掉腥味和杂质。",
+    "喜欢口感更嫩可以给{main}上浆，调味料可按口味调整。",
+    "出锅前再尝味，{side}不要放太早以免发苦。",
+]
+NUMERIC_UNITS = {"克": ["50", "100", "150", "200", "250", "300", "500"]}
+COUNT_AMOUNTS = ["1", "1", "2", "2", "3", "0.5"]
+SEASONING_AMOUNTS = ["适量", "少许", "1", "2", "0.5", "1", "适量"]
+IMAGES_PER_RECIPE = ([0, 1, 2, 3, 4, 5], [15, 45, 20, 10, 6, 4])
+IMAGE_SIZES = [(800, 600), (600, 800), (800, 800), (960, 540)]
+THREE_YEARS = timedelta(days=3 * 365)
+
+
+def _option(args: list[str], name: str) -> int:
+    if name in args:
+        return int(args[args.index(name) + 1])
+    return DEFAULTS[name]
+
+
+class Zipf:
+    """Weighted picker where the item at rank r has weight 1 / (r + 1) ** s."""
+
+    def __init__(self, rng: random.Random, items: list, s: float = 1.0):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum = list(itertools.accumulate(1 / (r + 1) ** s for r in range(len(self.items))))
+        self.rng = rng
+
+    def sample(self, k: int) -> list:
+        """Up to k distinct items (fewer when popular items repeat)."""
+        if not self.items:
+            return []
+        total = self.cum[-1]
+        picks = (self.items[bisect.bisect(self.cum, self.rng.random() * total)] for _ in range(k))
+        return list(dict.fromkeys(picks))
+
+
+def _variant_names(base: list[str], count: int, affixes: list[str], prefix: bool) -> list[tuple[str, str]]:
+    """`count` distinct (name, base name) pairs: the base names, affixed variants, then numbered ones."""
+    names = {name: name for name in base}
+    variants = ([f"{a}{b}" if prefix else f"{b}{a}", b] for a in affixes for b in base)
+    numbered = ([f"{b}{n}", b] for n in itertools.count(2) for b in base)
+    for name, origin in itertools.chain(variants, numbered):
+        if len(names) >= count:
+            break
+        names.setdefault(name, origin)
+    return list(names.items())[:count]
+
+
+def build_vocabulary(rng: random.Random, n_tags: int, n_ingredients: int) -> dict:
+    """Categories, tags and ingredients as rows with explicit ids."""
+    tag_categories = [(i + 1, name, COLORS[i % len(COLORS)]) for i, name in enumerate(TAG_CATEGORIES)]
+    ing_categories = [(i + 1, name, COLORS[i % len(COLORS)]) for i, name in enumerate(INGREDIENT_CATEGORIES)]
+    tag_cat_ids = {name: cid for cid, name, _ in tag_categories}
+    ing_cat_ids = {name: cid for cid, name, _ in ing_categories}
+
+    tag_base = {name: cat for name, cat in TAGS}
+    tags = []
+    for i, (name, origin) in enumerate(_variant_names(list(tag_base), n_tags, TAG_SUFFIXES, prefix=False)):
+        tags.append((i + 1, name[:50], tag_cat_ids[tag_base[origin]]))
+
+    ing_base = {name: (unit, cal, cat) for name, unit, cal, cat in INGREDIENTS}
+    ingredients = []
+    for i, (name, origin) in enumerate(_variant_names(list(ing_base), n_ingredients, INGREDIENT_PREFIXES, prefix=True)):
+        unit, cal, category = ing_base[origin]
+        # Vary calories a little between variants of the same ingredient
+        calorie = round(cal * rng.uniform(0.85, 1.15), 2) if cal is not None else None
+        ingredients.append((i + 1, name[:100], unit, calorie, ing_cat_ids[category]))
+
+    return {
+        "tag_categories": tag_categories,
+        "tags": tags,
+        "ingredient_categories": ing_categories,
+        "ingredients": ingredients,
+        "ing_category_names": {cid: name for name, cid in ing_cat_ids.items()},
+    }
+
+
+def make_placeholder_images(rng: random.Random, count: int, directory: str) -> list[str]:
+    """Draw `count` gradient JPEGs; returns their /uploads paths."""
+    from PIL import Image, ImageDraw
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        width, height = rng.choice(IMAGE_SIZES)
+        start, end = (tuple(rng.randrange(40, 230) for _ in range(3)) for _ in range(2))
+        mask = Image.linear_gradient("L").resize((width, height))
+        img = Image.composite(Image.new("RGB", (width, height), start), Image.new("RGB", (width, height), end), mask)
+        draw = ImageDraw.Draw(img)
+        r = min(width, height) // 4
+        cx, cy = width // 2, height // 2
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), outline=(255, 255, 255), width=6)
+        draw.text((16, 16), f"#{i}", fill=(255, 255, 255))
+        filename = f"{i:05d}.jpg"
+        img.save(os.path.join(directory, filename), format="JPEG", quality=80)
+        paths.append(f"/uploads/synthetic/{filename}")
+    return paths
+
+
+def _amount(rng: random.Random, unit: str, seasoning: bool) -> str:
+    if seasoning:
+        return rng.choice(SEASONING_AMOUNTS)
+    return rng.choice(NUMERIC_UNITS.get(unit, COUNT_AMOUNTS))
+
+
+def generate_chunk(rng: random.Random, first_id: int, count: int, vocab: dict, pickers: dict,
+                   image_paths: list[str], ids: dict, now: datetime) -> dict:
+    """Rows for recipes first_id .. first_id + count - 1 plus their search documents."""
+    ingredients = {row[0]: row for row in vocab["ingredients"]}
+    tag_names = {row[0]: row[1] for row in vocab["tags"]}
+    category_names = vocab["ing_category_names"]
+    rows = {"recipes": [], "recipe_tags": [], "recipe_ingredients": [], "recipe_images": []}
+    docs = []
+    for recipe_id in range(first_id, first_id + count):
+        main = pickers["主料"].sample(rng.randint(1, 3))
+        side = pickers["辅料"].sample(rng.randint(0, 3))
+        seasoning = pickers["调料"].sample(rng.randint(2, 5)) + pickers["酱料"].sample(rng.randint(0, 1))
+        main_name = ingredients[main[0]][1]
+        side_name = ingredients[side[0]][1] if side else "葱姜蒜"
+        method = rng.choice(COOK_METHODS)
+        fill = {"main": main_name, "side": side_name, "method": method, "minutes": rng.choice([5, 10, 15, 20, 30, 45])}
+        name = f"{method}{main_name}{rng.choice(NAME_SUFFIXES)}"[:100]
+        description = f"<p>{rng.choice(DESCRIPTIONS).format(**fill)}</p>"
+        steps = "<ol>" + "".join(
+            f"<li>{s.format(**fill)}</li>" for s in rng.sample(STEP_SENTENCES, rng.randint(3, 8))
+        ) + "</ol>"
+        tips = f"<ul><li>{rng.choice(TIPS).format(**fill)}</li></ul>"
+        views = min(int((rng.paretovariate(1.2) - 1) * 20), 10_000_000)
+        created = now - THREE_YEARS * rng.random()
+        rows["recipes"].append((recipe_id, name, description, steps, tips, views, created, created))
+
+        tag_ids = pickers["tags"].sample(rng.randint(1, 6))
+        rows["recipe_tags"].extend((recipe_id, tag_id) for tag_id in tag_ids)
+
+        calories = 0.0
+        main_ingredients = []
+        for ing_id in main + side + seasoning:
+            _, ing_name, unit, calorie, category_id = ingredients[ing_id]
+            amount = _amount(rng, unit, ing_id in seasoning)
+            ids["recipe_ingredients"] += 1
+            rows["recipe_ingredients"].append((ids["recipe_ingredients"], recipe_id, ing_id, amount))
+            try:
+                calories += float(amount) * calorie
+            except (TypeError, ValueError):
+                pass
+            if category_names[category_id] in MAIN_INGREDIENT_CATEGORIES:
+                main_ingredients.append(ing_name)
+
+        if image_paths:
+            n_images = rng.choices(*IMAGES_PER_RECIPE)[0]
+            for order, path in enumerate(rng.sample(image_paths, min(n_images, len(image_paths)))):
+                ids["recipe_images"] += 1
+                rows["recipe_images"].append((ids["recipe_images"], recipe_id, path, order))
+
+        docs.append(recipe_document(
+            recipe_id, name, [tag_names[t] for t in tag_ids], main_ingredients, round(calories),
+            description, steps, tips, views,
+        ))
+    return {"rows": rows, "docs": docs}
+
+
+COLUMNS = {
+    "tag_categories": ["id", "name", "color"],
+    "tags": ["id", "name", "category_id"],
+    "ingredient_categories": ["id", "name", "color"],
+    "ingredients": ["id", "name", "unit", "calorie", "category_id"],
+    "recipes": ["id", "name", "description", "steps", "tips", "view_count", "created_at", "updated_at"],
+    "recipe_tags": ["recipe_id", "tag_id"],
+    "recipe_ingredients": ["id", "recipe_id", "ingredient_id", "amount"],
+    "recipe_images": ["id", "recipe_id", "image_path", "sort_order"],
+}
+SERIAL_TABLES = [
+    "tag_categories", "tags", "ingredient_categories", "ingredients",
+    "recipes", "recipe_ingredients", "recipe_images",
+]
+
+
+async def _copy(conn: asyncpg.Connection, table: str, records: list[tuple]):
+    if records:
+        await conn.copy_records_to_table(table, records=records, columns=COLUMNS[table])
+
+
+async def main():
+    args = sys.argv[1:]
+    n_recipes = _option(args, "--recipes")
+    seed = _option(args, "--seed")
+    chunk = _option(args, "--chunk")
+    index = "--no-index" not in args and settings.SEARCH_BACKEND != "memory"
+
+    print(f"WARNING: This replaces all recipes, tags and ingredients in {settings.POSTGRES_DB}")
+    if "--force" not in args:
+        response = input("Are you sure you want to continue? (yes/no): ")
+        if response.lower() not in ["yes", "y"]:
+            print("Operation cancelled.")
+            return
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    vocab = build_vocabulary(rng, _option(args, "--tags"), _option(args, "--ingredients"))
+    image_paths = make_placeholder_images(
+        rng, _option(args, "--image-pool"), os.path.join(os.path.abspath(settings.UPLOAD_DIR), "synthetic"),
+    )
+    print(f"[OK] {len(image_paths)} placeholder images in {time.perf_counter() - started:.1f}s")
+
+    by_category = {}
+    for ing_id, _, _, _, category_id in vocab["ingredients"]:
+        by_category.setdefault(vocab["ing_category_names"][category_id], []).append(ing_id)
+    pickers = {
+        category: Zipf(rng, by_category.get(category, []), s=1.1)
+        for category in INGREDIENT_CATEGORIES
+    }
+    pickers["tags"] = Zipf(rng, [row[0] for row in vocab["tags"]], s=0.9)
+
+    if index:
+        setup_index()
+        for name in (INDEX_NAME, INGREDIENT_INDEX, TAG_INDEX):
+            get_meili_client().index(name).delete_all_documents()
+
+    conn = await asyncpg.connect(settings.DATABASE_URL_SYNC)
+    try:
+        async with conn.transaction():
+            await conn.execute(
+                "TRUNCATE recipe_tags, recipe_ingredients, recipe_images, recipes, "
+                "tags, tag_categories, ingredients, ingredient_categories RESTART IDENTITY CASCADE"
+            )
+            for table in ("tag_categories", "tags", "ingredient_categories", "ingredients"):
+                await _copy(conn, table, vocab[table])
+        print(f"[OK] {len(vocab['tags'])} tags, {len(vocab['ingredients'])} ingredients")
+
+        ids = {"recipe_ingredients": 0, "recipe_images": 0}
+        now = datetime.now()
+        last_task = None
+        for first_id in range(1, n_recipes + 1, chunk):
+            batch = generate_chunk(
+                rng, first_id, min(chunk, n_recipes - first_id + 1), vocab, pickers, image_paths, ids, now,
+            )
+            async with conn.transaction():
+                for table, records in batch["rows"].items():
+                    await _copy(conn, table, records)
+            if index:
+                last_task = bulk_index(INDEX_NAME, batch["docs"], batch_size=chunk)
+            done = first_id + len(batch["docs"]) - 1
+            rate = done / (time.perf_counter() - started)
+            print(f"     {done}/{n_recipes} recipes ({rate:.0f}/s)")
+
+        # Explicit ids bypass the sequences; move them past the loaded rows
+        for table in SERIAL_TABLES:
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST((SELECT MAX(id) FROM {table}), 1))"
+            )
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+    print(f"[OK] Loaded {n_recipes} recipes, {ids['recipe_ingredients']} recipe ingredients, "
+          f"{ids['recipe_images']} images in {time.perf_counter() - started:.1f}s")
+
+    if index:
+        engine = create_async_engine(settings.DATABASE_URL)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as db:
+            bulk_index(INGREDIENT_INDEX, await load_ingredient_documents(db))
+            bulk_index(TAG_INDEX, await load_tag_documents(db))
+        await engine.dispose()
+        if last_task is not None:
+            print("     Waiting for MeiliSearch to finish indexing...")
+            get_meili_client().wait_for_task(last_task, timeout_in_ms=3_600_000, interval_in_ms=1000)
+        print(f"[OK] Search indexes populated in {time.perf_counter() - started:.1f}s total")
+    elif settings.SEARCH_BACKEND == "memory":
+        print("[OK] Memory search backend: the API rebuilds its index at startup")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
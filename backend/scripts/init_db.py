@@ -361,8 +361,7 @@ async def main():
 
     # Sync MeiliSearch index
     try:
-        from app.services.search import index_recipe, setup_index
-        from sqlalchemy.orm import selectinload
+        from app.services.search import reindex_all, setup_index
 
         setup_index()
         print("[OK] MeiliSearch index configured.")
@@ -370,24 +369,9 @@ async def main():
         engine2 = create_async_engine(settings.DATABASE_URL)
         sf2 = async_sessionmaker(engine2, class_=AsyncSession, expire_on_commit=False)
         async with sf2() as db2:
-            result = await db2.execute(
-                select(Recipe).options(
-                    selectinload(Recipe.tags),
-                    selectinload(Recipe.recipe_ingredients)
-                    .selectinload(RecipeIngredient.ingredient)
-                    .selectinload(Ingredient.category_rel),
-                )
-            )
-            for r in result.scalars().unique().all():
-                tag_names = [t.name for t in r.tags]
-                main_ings = [
-                    ri.ingredient.name for ri in r.recipe_ingredients
-                    if ri.ingredient and ri.ingredient.category_rel
-                    and ri.ingredient.category_rel.name in {"主料", "辅料"}
-                ]
-                index_recipe(r.id, r.name, tag_names, main_ings)
+            counts = await reindex_all(db2)
         await engine2.dispose()
-        print("[OK] Search index synced.")
+        print(f"[OK] Search indexes synced: {counts}")
     except Exception as e:
         print(f"[WARN] Search index sync failed: {e}")
 
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+HTTP load test with baseline comparison.
+
+Starts the API under uvicorn on a free local port (or targets --url), then
+runs each scenario for --duration seconds with --concurrency virtual users,
+each looping over its scenario as fast as responses come back. Reports
+p50/p95/p99 latency per endpoint and requests per second per scenario.
+
+Scenarios:
+  home     recipe list, newest and most viewed
+  detail   recipe detail pages, popular recipes more often (Zipf-like)
+  search   search-as-you-type: suggestions per keystroke, then the full search
+  upload   recipe image upload (then deleted again)
+  export   batch export of 10 recipes
+  import   import of an exported recipe ZIP (then deleted again)
+  mixed    weighted mix of the above plus create / update / delete
+
+Results are compared against a baseline file (default: loadtest_baseline.json
+next to this script). A regression is a p50/p95/p99 more than --tolerance
+slower (and at least MIN_REGRESSION_MS), RPS more than --tolerance lower,
+or an error rate more than one point higher; any regression exits with 1.
+Record a baseline on the reference machine with --save-baseline, against a
+dataset from scripts/generate_dataset.py. Writes clean up after themselves.
+
+Usage:
+  cd backend
+  python scripts/loadtest.py                           # all scenarios, local server
+  python scripts/loadtest.py detail search --duration 30 --concurrency 50
+  python scripts/loadtest.py --workers 4 --save-baseline
+  python scripts/loadtest.py --url http://localhost:8000 --password admin123
+"""
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.core.config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest_baseline.json")
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+# Latency differences below this are noise, whatever the ratio
+MIN_REGRESSION_MS = 5.0
+MAX_ERROR_RATE_INCREASE = 0.01
+EXPORT_BATCH_SIZE = 10
+SUGGEST_KEYSTROKES = 4
+MAX_RECIPE_IDS = 1000
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint for one scenario run."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        """Send a request, recording it under `name`; returns None on failure."""
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            resp = None
+        self.samples[name].append((time.perf_counter() - start) * 1000)
+        if resp is None or resp.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return resp
+
+    def summary(self, elapsed: float) -> dict:
+        total = sum(len(s) for s in self.samples.values())
+        errors = sum(self.errors.values())
+        endpoints = {}
+        for name, samples in sorted(self.samples.items()):
+            endpoints[name] = {
+                "count": len(samples),
+                "errors": self.errors[name],
+                **{key: round(_percentile(samples, pct), 2) for key, pct in PERCENTILES.items()},
+            }
+        return {
+            "requests": total,
+            "rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+class Context:
+    """What the scenarios need from the target: ids, names, auth and payloads."""
+
+    def __init__(self, headers: dict, recipe_ids: list[int], names: list[str],
+                 scratch_recipe_id: int, image: bytes, recipe_zip: bytes | None):
+        self.headers = headers
+        self.recipe_ids = recipe_ids
+        # Earlier ids (most relevant first) are requested more often
+        self.recipe_weights = [1 / (rank + 1) for rank in range(len(recipe_ids))]
+        self.names = names
+        self.scratch_recipe_id = scratch_recipe_id
+        self.image = image
+        self.recipe_zip = recipe_zip
+
+    def pick_recipe(self, rng: random.Random) -> int:
+        return rng.choices(self.recipe_ids, weights=self.recipe_weights)[0]
+
+
+# --- Scenarios: one iteration of a virtual user -----------------------------
+
+async def home(client, ctx: Context, rec: Recorder, rng: random.Random):
+    sort = rng.choice(["new", "new", "popular"])
+    await rec.request(client, f"GET /api/recipes?sort={sort}", "GET", "/api/recipes", params={"sort": sort})
+
+
+async def detail(client, ctx: Context, rec: Recorder, rng: random.Random):
+    await rec.request(client, "GET /api/recipes/{id}", "GET", f"/api/recipes/{ctx.pick_recipe(rng)}")
+
+
+async def search(client, ctx: Context, rec: Recorder, rng: random.Random):
+    query = rng.choice(ctx.names)
+    for end in range(1, min(len(query), SUGGEST_KEYSTROKES) + 1):
+        await rec.request(client, "GET /api/search/suggest", "GET", "/api/search/suggest", params={"q": query[:end]})
+    await rec.request(
+        client, "GET /api/search", "GET", "/api/search",
+        params={"q": query[:SUGGEST_KEYSTROKES], "hydrate": "card"},
+    )
+
+
+async def upload(client, ctx: Context, rec: Recorder, rng: random.Random):
+    resp = await rec.request(
+        client, "POST /api/recipes/{id}/images", "POST", f"/api/recipes/{ctx.scratch_recipe_id}/images",
+        files={"file": ("loadtest.jpg", ctx.image, "image/jpeg")}, headers=ctx.headers,
+    )
+    if resp is not None:
+        await rec.request(
+            client, "DELETE /api/images/{id}", "DELETE", f"/api/images/{resp.json()['id']}", headers=ctx.headers,
+        )
+
+
+async def export(client, ctx: Context, rec: Recorder, rng: random.Random):
+    ids = rng.sample(ctx.recipe_ids, min(EXPORT_BATCH_SIZE, len(ctx.recipe_ids)))
+    await rec.request(
+        client, "POST /api/recipes/export-batch", "POST", "/api/recipes/export-batch",
+        json={"recipe_ids": ids}, headers=ctx.headers,
+    )
+
+
+async def import_zip(client, ctx: Context, rec: Recorder, rng: random.Random):
+    if ctx.recipe_zip is None:
+        return
+    resp = await rec.request(
+        client, "POST /api/recipes/import", "POST", "/api/recipes/import",
+        files={"file": ("recipe.zip", ctx.recipe_zip, "application/zip")}, headers=ctx.headers,
+    )
+    if resp is not None:
+        for recipe_id in resp.json()["recipe_ids"]:
+            await rec.request(client, "DELETE /api/recipes/{id}", "DELETE", f"/api/recipes/{recipe_id}", headers=ctx.headers)
+
+
+async def write(client, ctx: Context, rec: Recorder, rng: random.Random):
+    """Create a recipe, edit it, delete it."""
+    resp = await rec.request(
+        client, "POST /api/recipes", "POST", "/api/recipes",
+        json={"name": f"压测菜谱{rng.randrange(10 ** 6)}", "description": "<p>load test</p>"}, headers=ctx.headers,
+    )
+    if resp is None:
+        return
+    recipe_id = resp.json()["id"]
+    await rec.request(
+        client, "PUT /api/recipes/{id}", "PUT", f"/api/recipes/{recipe_id}",
+        json={"steps": "<ol><li>load test</li></ol>"}, headers=ctx.headers,
+    )
+    await rec.request(client, "DELETE /api/recipes/{id}", "DELETE", f"/api/recipes/{recipe_id}", headers=ctx.headers)
+
+
+MIXED_WEIGHTS = {detail: 50, search: 25, home: 10, write: 5, upload: 4, export: 3, import_zip: 3}
+
+
+async def mixed(client, ctx: Context, rec: Recorder, rng: random.Random):
+    scenario = rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+    await scenario(client, ctx, rec, rng)
+
+
+SCENARIOS = {
+    "home": home,
+    "detail": detail,
+    "search": search,
+    "upload": upload,
+    "export": export,
+    "import": import_zip,
+    "mixed": mixed,
+}
+
+
+# --- Running and comparing ---------------------------------------------------
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Context, scenario, concurrency: int,
+                       duration: float, seed: int = 0) -> dict:
+    """Run `scenario` with `concurrency` virtual users for `duration` seconds."""
+    rec = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def user(rng: random.Random):
+        while time.perf_counter() < deadline:
+            await scenario(client, ctx, rec, rng)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(random.Random(seed * 10_000 + i)) for i in range(concurrency)))
+    return rec.summary(time.perf_counter() - start)
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list[str]:
+    """Regressions of `results` against `baseline`, as readable lines."""
+    regressions = []
+    for scenario, current in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: rps {base['rps']} -> {current['rps']}")
+        if current["error_rate"] > base["error_rate"] + MAX_ERROR_RATE_INCREASE:
+            regressions.append(f"{scenario}: error rate {base['error_rate']:.2%} -> {current['error_rate']:.2%}")
+        for name, stats in current["endpoints"].items():
+            base_stats = base["endpoints"].get(name)
+            if base_stats is None:
+                continue
+            for key in PERCENTILES:
+                before, after = base_stats[key], stats[key]
+                if after > before * (1 + tolerance) and after - before >= MIN_REGRESSION_MS:
+                    regressions.append(f"{scenario}: {name} {key} {before}ms -> {after}ms")
+    return regressions
+
+
+def print_results(scenario: str, result: dict, baseline: dict | None):
+    base = (baseline or {}).get(scenario, {})
+    vs = f" (baseline {base['rps']})" if base else ""
+    print(f"\n{scenario}: {result['requests']} requests, {result['rps']} rps{vs}, "
+          f"errors {result['error_rate']:.2%}")
+    for name, stats in result["endpoints"].items():
+        line = f"  {name:<36} n={stats['count']:<6} " + "  ".join(
+            f"{key}={stats[key]:8.2f}ms" for key in PERCENTILES
+        )
+        base_stats = base.get("endpoints", {}).get(name)
+        if base_stats:
+            line += "  vs " + "/".join(f"{base_stats[key]:.2f}" for key in PERCENTILES)
+        print(line)
+
+
+# --- Target setup -------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(workers: int) -> tuple[subprocess.Popen, str]:
+    """Start uvicorn on a free port and wait until /api/health answers."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=url) as client:
+        for _ in range(120):
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return proc, url
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+def _jpeg() -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.linear_gradient("L").resize((800, 600)).convert("RGB").save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+async def build_context(client: httpx.AsyncClient, username: str, password: str) -> Context:
+    """Log in, collect recipe ids and names, create the scratch recipe for uploads."""
+    resp = await client.post("/api/auth/login", json={"username": username, "password": password})
+    resp.raise_for_status()
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    recipe_ids, names = [], []
+    for offset in range(0, MAX_RECIPE_IDS, 100):
+        resp = await client.get("/api/search", params={"q": "", "limit": 100, "offset": offset})
+        resp.raise_for_status()
+        hits = resp.json()["hits"]
+        recipe_ids.extend(h["id"] for h in hits)
+        names.extend(h["name"] for h in hits)
+        if len(hits) < 100:
+            break
+    if not recipe_ids:
+        raise RuntimeError("No recipes found; seed the database first (scripts/generate_dataset.py)")
+
+    resp = await client.post("/api/recipes", json={"name": "压测图片上传"}, headers=headers)
+    resp.raise_for_status()
+    scratch_recipe_id = resp.json()["id"]
+    resp = await client.get(f"/api/recipes/{recipe_ids[0]}/export", headers=headers)
+    recipe_zip = resp.content if resp.status_code == 200 else None
+    return Context(headers, recipe_ids, names, scratch_recipe_id, _jpeg(), recipe_zip)
+
+
+def _option(args: list[str], name: str, default):
+    if name in args:
+        i = args.index(name)
+        value = type(default)(args[i + 1])
+        del args[i:i + 2]
+        return value
+    return default
+
+
+async def main() -> int:
+    args = sys.argv[1:]
+    duration = _option(args, "--duration", 20.0)
+    warmup = _option(args, "--warmup", 3.0)
+    concurrency = _option(args, "--concurrency", 20)
+    workers = _option(args, "--workers", 1)
+    tolerance = _option(args, "--tolerance", 0.2)
+    url = _option(args, "--url", "")
+    baseline_path = _option(args, "--baseline", DEFAULT_BASELINE)
+    password = _option(args, "--password", settings.ADMIN_PASSWORD)
+    save = "--save-baseline" in args
+    names = [a for a in args if not a.startswith("--")] or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+        return 2
+
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    proc = None
+    if not url:
+        proc, url = await start_server(workers)
+        print(f"[OK] uvicorn with {workers} worker(s) at {url}")
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            ctx = await build_context(client, settings.ADMIN_USERNAME, password)
+            print(f"[OK] {len(ctx.recipe_ids)} recipes; {concurrency} users, {duration:g}s per scenario")
+            results = {}
+            try:
+                for i, name in enumerate(names):
+                    if warmup:
+                        await run_scenario(client, ctx, SCENARIOS[name], concurrency, warmup, seed=i)
+                    results[name] = await run_scenario(client, ctx, SCENARIOS[name], concurrency, duration, seed=i)
+                    print_results(name, results[name], baseline and baseline["scenarios"])
+            finally:
+                await client.delete(f"/api/recipes/{ctx.scratch_recipe_id}", headers=ctx.headers)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if save:
+        scenarios = {**(baseline["scenarios"] if baseline else {}), **results}
+        with open(baseline_path, "w") as f:
+            json.dump({
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "recipes": len(ctx.recipe_ids),
+                "concurrency": concurrency,
+                "duration": duration,
+                "workers": workers,
+                "scenarios": scenarios,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] Baseline written to {baseline_path}")
+        return 0
+    if baseline is None:
+        print(f"\n[WARN] No baseline at {baseline_path}; record one with --save-baseline")
+        return 0
+    if (baseline["concurrency"], baseline["duration"]) != (concurrency, duration):
+        print(f"\n[WARN] Baseline used concurrency={baseline['concurrency']} duration={baseline['duration']}; "
+              f"numbers are not directly comparable")
+    regressions = compare(baseline["scenarios"], results, tolerance)
+    if regressions:
+        print(f"\n[FAIL] {len(regressions)} regression(s) beyond {tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\n[OK] No regressions beyond {tolerance:.0%} against {os.path.basename(baseline_path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
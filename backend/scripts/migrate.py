@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Upgrade the database schema to the latest migration.
+
+Run once per deploy, before starting the API workers. Holds a PostgreSQL
+advisory lock, so several containers starting at once are safe. Runs
+without the API's statement timeout; DDL waits at most
+MIGRATION_LOCK_TIMEOUT_MS for table locks.
+
+Usage:
+  cd backend
+  python scripts/migrate.py
+"""
+import asyncio
+import logging
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.migrations import migrate
+
+
+async def main():
+    revision = await migrate()
+    print(f"[OK] Database schema at revision {revision}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
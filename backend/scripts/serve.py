@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Production entrypoint: migrate once, then serve the API with several workers.
+
+Worker processes default to one per CPU available to this process (honouring
+container CPU sets); set WEB_CONCURRENCY to override. Each worker may open
+DB_POOL_SIZE + DB_MAX_OVERFLOW + 1 Postgres connections, and all of them must
+fit in DB_MAX_CONNECTIONS: the default worker count is capped to fit, and an
+explicit WEB_CONCURRENCY that does not fit stops startup. The supervisor restarts
+crashed workers, and on SIGHUP replaces workers one at a time, so code or
+config can be reloaded without dropping the service.
+
+Per-process state and how it is shared across workers:
+  - search result / suggestion caches: invalidated in every worker through
+    PostgreSQL LISTEN/NOTIFY (app.core.events), TTL-bounded otherwise
+  - view counters: buffered per worker, flushed as additive increments
+  - Meili client, circuit breaker, DB pools: per worker by design
+  - Prometheus metrics: each worker writes to PROMETHEUS_MULTIPROC_DIR
+    (default: a directory under the system temp dir, emptied at startup)
+    and /metrics on any worker reports the sum over all of them
+  - SEARCH_BACKEND=memory: a per-process index, so it needs a single worker
+
+Usage:
+  cd backend
+  python scripts/serve.py                  # port 8000, one worker per CPU
+  WEB_CONCURRENCY=4 python scripts/serve.py --port 8080
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+from app.core.config import settings
+from migrate import main as migrate
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+def connections_per_worker() -> int:
+    # A full pool, plus the LISTEN connection of app.core.events
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW + 1
+
+
+def fit_connection_budget(workers: int) -> int:
+    """Workers to start so all their connections fit in DB_MAX_CONNECTIONS."""
+    budget, per_worker = settings.DB_MAX_CONNECTIONS, connections_per_worker()
+    if not budget or workers * per_worker <= budget:
+        return workers
+    fits = budget // per_worker
+    if settings.WEB_CONCURRENCY > 0 or fits < 1:
+        sys.exit(
+            f"[ERROR] {workers} worker(s) x {per_worker} connections exceed DB_MAX_CONNECTIONS={budget}; "
+            f"lower WEB_CONCURRENCY or DB_POOL_SIZE / DB_MAX_OVERFLOW"
+        )
+    print(f"[WARN] {workers} worker(s) x {per_worker} connections exceed DB_MAX_CONNECTIONS={budget}; using {fits}")
+    return fits
+
+
+def prepare_metrics_dir():
+    """Point the workers at an empty shared directory for their metric files."""
+    path = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "recipe-metrics"),
+    )
+    os.makedirs(path, exist_ok=True)
+    # Files left by a previous run would be added to this run's totals
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+
+
+def main():
+    args = sys.argv[1:]
+    port = 8000
+    if "--port" in args:
+        port = int(args[args.index("--port") + 1])
+    workers = worker_count()
+    if settings.SEARCH_BACKEND == "memory" and workers > 1:
+        print("[WARN] SEARCH_BACKEND=memory keeps the index in one process; using 1 worker")
+        workers = 1
+    workers = fit_connection_budget(workers)
+
+    asyncio.run(migrate())
+    prepare_metrics_dir()
+    print(f"[OK] Starting {workers} worker(s) on port {port}")
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        timeout_graceful_shutdown=30,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
+import contextlib
+
 import pytest
 import httpx
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.core.config import settings
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
 from app.core.auth import create_access_token
+from app.core.query_stats import capture_queries
 from app.main import app
 from app.models.models import Recipe, Tag, Ingredient  # noqa: F401 - ensure models loaded
 
@@ -41,6 +44,7 @@ async def client(db_engine):
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     async with httpx.AsyncClient(
         transport=httpx.ASGITransport(app=app),
         base_url="http://test",
@@ -49,8 +53,35 @@ async def client(db_engine):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+async def app_client():
+    """A client on the app without DB overrides, for endpoints that do not touch the database."""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+    ) as ac:
+        yield ac
+
+
 @pytest.fixture
 def auth_headers():
     """Return authorization headers with a valid admin JWT token."""
     token = create_access_token(data={"sub": "admin"})
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def assert_num_queries():
+    """`with assert_num_queries(n): ...` fails unless exactly n SQL statements ran inside.
+
+    Pins an endpoint's query count, so a missing eager load (an N+1) fails a test.
+    """
+    @contextlib.contextmanager
+    def check(expected: int):
+        with capture_queries() as statements:
+            yield statements
+        assert len(statements) == expected, (
+            f"expected {expected} queries, got {len(statements)}:\n" + "\n\n".join(statements)
+        )
+
+    return check
@@ -0,0 +1,151 @@
+"""Admin diagnostics endpoint tests."""
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats(client, auth_headers):
+    """GET /api/admin/db/pool reports live pool counters for the app engine."""
+    resp = await client.get("/api/admin/db/pool", headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert {"pool_size", "checked_out", "overflow", "waiters"} <= set(data["primary"])
+    assert data["primary"]["checked_out"] >= 0
+    assert data["replica"] is None
+
+
+@pytest.mark.asyncio
+async def test_admin_requires_auth(client):
+    resp = await client.get("/api/admin/db/pool")
+    assert resp.status_code in (401, 403)
+
+
+def test_engine_options_from_settings(monkeypatch):
+    from app.core.config import settings
+    from app.core.database import engine_options
+
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+    options = engine_options()
+    assert options["connect_args"] == {"statement_cache_size": 0}
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert engine_options()["connect_args"]["server_settings"] == {"statement_timeout": "5000"}
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_records_blocking_call():
+    """A synchronous sleep inside a coroutine is reported with its coroutine and stack."""
+    import asyncio
+    import time
+
+    from app.core.loop_monitor import LoopMonitor
+
+    monitor = LoopMonitor(threshold=0.05)
+
+    async def blocking_handler():
+        time.sleep(0.3)
+
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    await blocking_handler()
+    # Let the heartbeat resume and the watchdog close the stall
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    stats = monitor.stats()
+    assert stats["max_lag_ms"] >= 200
+    [offender] = stats["offenders"]
+    assert "blocking_handler" in offender["coroutine"]
+    assert offender["count"] == 1
+    assert offender["max_ms"] >= 200
+    assert any("time.sleep(0.3)" in line for line in offender["stack"])
+    monitor.reset()
+    assert monitor.stats()["offenders"] == []
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_catches_blocks_just_over_threshold():
+    """A block only slightly longer than the threshold is caught and recorded at its length."""
+    import asyncio
+    import time
+
+    from app.core.loop_monitor import LoopMonitor
+
+    monitor = LoopMonitor(threshold=0.1)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.05)
+    time.sleep(0.12)
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    [offender] = monitor.stats()["offenders"]
+    assert 120 <= offender["max_ms"] < 120 + monitor.interval * 1000 + 10
+
+
+@pytest.mark.asyncio
+async def test_loop_stats_endpoint(client, auth_headers):
+    resp = await client.get("/api/admin/loop", headers=auth_headers)
+    assert resp.status_code == 200
+    assert {"running", "threshold_ms", "max_lag_ms", "offenders"} <= set(resp.json())
+    assert (await client.delete("/api/admin/loop", headers=auth_headers)).status_code == 204
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.mark.asyncio
+async def test_profile_returns_collapsed_stacks(app_client, auth_headers):
+    import threading
+
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        resp = await app_client.post("/api/admin/profile?seconds=0.3&hz=200", headers=auth_headers)
+    finally:
+        stop.set()
+        worker.join()
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert int(resp.headers["x-profile-samples"]) > 0
+    lines = resp.text.splitlines()
+    # "frame;frame;... count", outermost frame first
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("spinner;") and "test_admin.py:_spin" in line for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_profile_next_request(app_client, auth_headers):
+    import asyncio
+
+    profile = asyncio.create_task(app_client.post(
+        "/api/admin/profile/next", params={"route": "/api/health", "timeout": 5}, headers=auth_headers,
+    ))
+    await asyncio.sleep(0.1)
+    # Only one profile at a time
+    busy = await app_client.post("/api/admin/profile?seconds=0.1", headers=auth_headers)
+    assert busy.status_code == 409
+    assert (await app_client.get("/api/health")).status_code == 200
+    resp = await profile
+    assert resp.status_code == 200
+    assert "x-profile-samples" in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_profile_next_request_errors(app_client, auth_headers):
+    resp = await app_client.post(
+        "/api/admin/profile/next", params={"route": "/api/nope"}, headers=auth_headers,
+    )
+    assert resp.status_code == 404
+    resp = await app_client.post(
+        "/api/admin/profile/next", params={"route": "/api/health", "timeout": 0.1}, headers=auth_headers,
+    )
+    assert resp.status_code == 408
+    resp = await app_client.post("/api/admin/profile?seconds=600", headers=auth_headers)
+    assert resp.status_code == 422
@@ -0,0 +1,61 @@
+"""Admin login and password change tests."""
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def _clear_credential_cache():
+    from app.services.credentials import _credential_cache
+
+    _credential_cache.clear()
+    yield
+    _credential_cache.clear()
+
+
+async def _login(client, password):
+    return await client.post("/api/auth/login", json={
+        "username": settings.ADMIN_USERNAME, "password": password,
+    })
+
+
+@pytest.mark.asyncio
+async def test_login_with_settings_password(client):
+    assert (await _login(client, settings.ADMIN_PASSWORD)).status_code == 200
+    assert (await _login(client, "wrong")).status_code == 401
+    resp = await client.post("/api/auth/login", json={"username": "other", "password": settings.ADMIN_PASSWORD})
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_changed_password_is_stored_hashed(client, auth_headers, db_session):
+    """The new password is persisted as a hash and survives a cold cache (another worker / restart)."""
+    from sqlalchemy import select
+    from app.models.models import AdminCredential
+    from app.services.credentials import _credential_cache
+
+    resp = await client.post("/api/auth/change-password", json={
+        "old_password": settings.ADMIN_PASSWORD, "new_password": "n3w-pass",
+    }, headers=auth_headers)
+    assert resp.status_code == 200
+    stored = await db_session.scalar(select(AdminCredential.password_hash))
+    assert stored and "n3w-pass" not in stored
+
+    _credential_cache.clear()
+    assert (await _login(client, "n3w-pass")).status_code == 200
+    assert (await _login(client, settings.ADMIN_PASSWORD)).status_code == 401
+
+    resp = await client.post("/api/auth/change-password", json={
+        "old_password": settings.ADMIN_PASSWORD, "new_password": "again",
+    }, headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_credential_change_event_clears_cache():
+    import json
+    from app.core import events
+    from app.services.credentials import CREDENTIAL_CHANGED_EVENT, _credential_cache
+
+    _credential_cache.set(settings.ADMIN_USERNAME, "stale-hash")
+    events._dispatch(json.dumps({"event": CREDENTIAL_CHANGED_EVENT, "origin": "other-host:1"}))
+    assert _credential_cache.get(settings.ADMIN_USERNAME) is None
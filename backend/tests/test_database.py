@@ -0,0 +1,198 @@
+"""Database engine routing tests: read replica and post-write pinning."""
+import contextlib
+import json
+
+import pytest
+
+from app.core import database
+from app.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_successful_writes_pin_reads_to_primary(app_client, auth_headers, monkeypatch):
+    """With a replica configured, a successful write sets the short-lived primary cookie."""
+    import app.main as main
+
+    monkeypatch.setattr(main, "read_engine", object())
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    resp = await app_client.post("/api/search/setup")
+    assert resp.status_code in (401, 403)
+    assert database.READ_PRIMARY_COOKIE not in resp.cookies
+    resp = await app_client.post("/api/search/setup", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.cookies[database.READ_PRIMARY_COOKIE] == "1"
+    assert f"Max-Age={settings.READ_PRIMARY_AFTER_WRITE_SECONDS}" in resp.headers["set-cookie"]
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_routes_pinned_clients_to_primary(monkeypatch):
+    @contextlib.asynccontextmanager
+    async def primary():
+        yield "primary"
+
+    @contextlib.asynccontextmanager
+    async def replica():
+        yield "replica"
+
+    monkeypatch.setattr(database, "async_session", primary)
+    monkeypatch.setattr(database, "read_session", replica)
+
+    class FakeRequest:
+        def __init__(self, cookies):
+            self.cookies = cookies
+
+    assert await anext(database.get_read_db(FakeRequest({}))) == "replica"
+    pinned = FakeRequest({database.READ_PRIMARY_COOKIE: "1"})
+    assert await anext(database.get_read_db(pinned)) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_migrate_adopts_create_all_schema(db_engine):
+    """migrate() stamps a create_all schema at its baseline, upgrades it, and is idempotent."""
+    from sqlalchemy import text
+    from app.core.migrations import check_schema, current_revision, head_revision, migrate
+
+    async with db_engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    with pytest.raises(RuntimeError):
+        await check_schema(db_engine)
+
+    assert await migrate(db_engine) == head_revision()
+    assert await current_revision(db_engine) == head_revision()
+    await migrate(db_engine)
+    await check_schema(db_engine)
+
+    async with db_engine.begin() as conn:
+        await conn.execute(text("DROP TABLE alembic_version"))
+
+
+@pytest.mark.asyncio
+async def test_migrate_runs_without_statement_timeout(db_engine, monkeypatch):
+    """Migrations ignore the app's statement_timeout and bound DDL lock waits instead."""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.core import migrations
+
+    seen = {}
+
+    def record(connection):
+        for name in ("statement_timeout", "lock_timeout"):
+            seen[name] = connection.execute(text(f"SHOW {name}")).scalar()
+
+    monkeypatch.setattr(migrations, "_upgrade", record)
+    monkeypatch.setattr(settings, "MIGRATION_LOCK_TIMEOUT_MS", 3000)
+    # Connections configured like the app's, with a 15s statement timeout
+    app_engine = create_async_engine(
+        settings.DATABASE_URL, pool_size=1, max_overflow=0,
+        connect_args={"server_settings": {"statement_timeout": "15000"}},
+    )
+    try:
+        await migrations.migrate(app_engine)
+        assert seen == {"statement_timeout": "0", "lock_timeout": "3s"}
+        # The pooled connection goes back with its own settings
+        async with app_engine.connect() as conn:
+            assert await conn.scalar(text("SHOW statement_timeout")) == "15s"
+            assert await conn.scalar(text("SHOW lock_timeout")) == "0"
+    finally:
+        await app_engine.dispose()
+
+    seen.clear()
+    await migrations.migrate()
+    assert seen["statement_timeout"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_migrate_waits_for_lock_without_holding_a_snapshot(db_engine, monkeypatch):
+    """A waiting migrator sits idle between lock attempts, so concurrent index builds can finish."""
+    import asyncio
+    from sqlalchemy import text
+    from app.core import migrations
+
+    monkeypatch.setattr(migrations, "_upgrade", lambda connection: None)
+    monkeypatch.setattr(migrations, "MIGRATION_LOCK_POLL_SECONDS", 0.05)
+    async with db_engine.connect() as holder:
+        await holder.execute(text("SELECT pg_advisory_lock(:key)"), {"key": migrations.MIGRATION_LOCK_KEY})
+        await holder.commit()
+        waiter = asyncio.create_task(migrations.migrate(db_engine))
+        await asyncio.sleep(0.3)
+        assert not waiter.done()
+        # The oldest snapshot other than this query's: none while the waiter is idle
+        xmin = await holder.scalar(text(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE pid <> pg_backend_pid() AND datname = current_database() AND backend_xmin IS NOT NULL"
+        ))
+        await holder.commit()
+        assert xmin == 0
+        await holder.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": migrations.MIGRATION_LOCK_KEY})
+        await holder.commit()
+        await asyncio.wait_for(waiter, 5)
+
+
+@pytest.mark.asyncio
+async def test_drop_invalid_index_removes_failed_concurrent_build(db_engine):
+    from alembic.operations import Operations
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import text
+    from app.core.migrations import drop_invalid_index
+
+    def index_valid(sync_conn):
+        return sync_conn.scalar(text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass('ix_dup_x')"))
+
+    def drop(sync_conn):
+        with Operations.context(MigrationContext.configure(sync_conn)):
+            drop_invalid_index("ix_dup_x")
+
+    async with db_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("CREATE TABLE dup (x int)"))
+        try:
+            await conn.execute(text("INSERT INTO dup VALUES (1), (1)"))
+            with pytest.raises(Exception):
+                await conn.execute(text("CREATE UNIQUE INDEX CONCURRENTLY ix_dup_x ON dup (x)"))
+            assert await conn.run_sync(index_valid) is False
+            await conn.run_sync(drop)
+            assert await conn.run_sync(index_valid) is None
+        finally:
+            await conn.execute(text("DROP TABLE dup"))
+
+
+def test_events_dispatch_skips_own_notifications():
+    """Handlers run for notifications from other workers, not for this process's own."""
+    from app.core import events
+
+    seen = []
+    events.subscribe("test_event", seen.append)
+    events._dispatch(json.dumps({"event": "test_event", "origin": events._origin(), "data": 1}))
+    events._dispatch(json.dumps({"event": "test_event", "origin": "other-host:1", "data": 2}))
+    assert seen == [2]
+    events._handlers.pop("test_event")
+
+
+@pytest.mark.asyncio
+async def test_publish_soon_from_worker_thread(monkeypatch):
+    """Sync code run through asyncio.to_thread can still notify the other workers."""
+    import asyncio
+    from app.core import events
+
+    published = []
+
+    async def record(event, data):
+        published.append(event)
+
+    monkeypatch.setattr(events, "_publish_logged", record)
+    monkeypatch.setattr(events, "_listening", True)
+    monkeypatch.setattr(events, "_loop", asyncio.get_running_loop())
+    await asyncio.to_thread(events.publish_soon, "from_thread")
+    events.publish_soon("from_loop")
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert sorted(published) == ["from_loop", "from_thread"]
+
+
+def test_remote_index_change_invalidates_search_cache():
+    from app.core import events
+    from app.services import search as search_service
+
+    version = search_service.get_index_version()
+    events._dispatch(json.dumps({"event": search_service.INDEX_CHANGED_EVENT, "origin": "other-host:1"}))
+    assert search_service.get_index_version() == version + 1
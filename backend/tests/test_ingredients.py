@@ -58,6 +58,21 @@ async def test_search_ingredients(client, auth_headers):
         assert "油" in item["name"]
 
 
+@pytest.mark.asyncio
+async def test_search_ingredients_ranked_and_limited(client, auth_headers):
+    """GET /api/ingredients?q=xxx&limit=n should rank closest names first and cap results."""
+    for name in ["鸡蛋黄", "鸡蛋", "土鸡蛋清", "鸭蛋"]:
+        await client.post("/api/ingredients", json={"name": name, "unit": "个"}, headers=auth_headers)
+    resp = await client.get("/api/ingredients?q=鸡蛋&limit=2")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data) == 2
+    assert data[0]["name"] == "鸡蛋"
+    # LIKE wildcards in the query are matched literally
+    resp = await client.get("/api/ingredients?q=%")
+    assert resp.json() == []
+
+
 @pytest.mark.asyncio
 async def test_update_ingredient(client, auth_headers):
     """PUT /api/ingredients/:id should update the ingredient."""
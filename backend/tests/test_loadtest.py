@@ -0,0 +1,65 @@
+"""Load-test harness (scripts/loadtest.py): statistics, baseline comparison, scenario runs."""
+import os
+import sys
+
+import pytest
+
+from app.core.config import settings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import loadtest  # noqa: E402
+
+
+def _result(rps=100.0, error_rate=0.0, **percentiles) -> dict:
+    stats = {"count": 100, "errors": 0, "p50": 10.0, "p95": 20.0, "p99": 40.0, **percentiles}
+    return {"requests": 100, "rps": rps, "error_rate": error_rate, "endpoints": {"GET /api/recipes/{id}": stats}}
+
+
+def test_summary_percentiles_and_errors():
+    rec = loadtest.Recorder()
+    rec.samples["GET /x"] = [float(ms) for ms in range(1, 101)]
+    rec.errors["GET /x"] = 5
+    summary = rec.summary(elapsed=2.0)
+    assert summary["rps"] == 50.0
+    assert summary["error_rate"] == 0.05
+    stats = summary["endpoints"]["GET /x"]
+    assert (stats["p50"], stats["p95"], stats["p99"]) == (51.0, 96.0, 100.0)
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"detail": _result()}
+    assert loadtest.compare(baseline, {"detail": _result(p95=23.0)}, tolerance=0.2) == []
+    assert loadtest.compare(baseline, {"detail": _result(rps=85.0)}, tolerance=0.2) == []
+
+    [latency] = loadtest.compare(baseline, {"detail": _result(p99=60.0)}, tolerance=0.2)
+    assert "p99 40.0ms -> 60.0ms" in latency
+    [rps] = loadtest.compare(baseline, {"detail": _result(rps=70.0)}, tolerance=0.2)
+    assert "rps 100.0 -> 70.0" in rps
+    [errors] = loadtest.compare(baseline, {"detail": _result(error_rate=0.05)}, tolerance=0.2)
+    assert "error rate" in errors
+
+
+def test_compare_ignores_small_absolute_changes_and_new_scenarios():
+    baseline = {"detail": _result(p50=0.5)}
+    # 3x slower, but by 1ms only
+    assert loadtest.compare(baseline, {"detail": _result(p50=1.5)}, tolerance=0.2) == []
+    assert loadtest.compare(baseline, {"search": _result(p50=500.0)}, tolerance=0.2) == []
+
+
+@pytest.mark.asyncio
+async def test_search_scenario_runs_against_app(app_client, monkeypatch):
+    """Suggestions per keystroke, then the search; memory backend, so no database needed."""
+    from app.services import search as search_service
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    search_service.suggest_cache.clear()
+    ctx = loadtest.Context({}, [1], ["番茄炒蛋"], scratch_recipe_id=0, image=b"", recipe_zip=None)
+    result = await loadtest.run_scenario(app_client, ctx, loadtest.search, concurrency=2, duration=0.2)
+    endpoints = result["endpoints"]
+    assert set(endpoints) == {"GET /api/search/suggest", "GET /api/search"}
+    # Four keystrokes per search
+    assert endpoints["GET /api/search/suggest"]["count"] == 4 * endpoints["GET /api/search"]["count"]
+    assert result["error_rate"] == 0.0
+    assert result["rps"] > 0
+    search_service.suggest_cache.clear()
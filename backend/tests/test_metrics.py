@@ -0,0 +1,68 @@
+"""Prometheus metrics endpoint tests."""
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.models import Tag
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(app_client):
+    labels = {"method": "GET", "route": "/api/recipes/{recipe_id}", "status": "422"}
+    before = _sample("http_requests_total", **labels)
+    unmatched = _sample("http_requests_total", method="GET", route=metrics.UNMATCHED_ROUTE, status="404")
+
+    await app_client.get("/api/recipes/not-a-number")
+    await app_client.get("/no/such/page")
+
+    assert _sample("http_requests_total", **labels) == before + 1
+    assert _sample(
+        "http_requests_total", method="GET", route=metrics.UNMATCHED_ROUTE, status="404",
+    ) == unmatched + 1
+    assert _sample(
+        "http_request_duration_seconds_count", method="GET", route="/api/recipes/{recipe_id}",
+    ) >= 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_prometheus_text(app_client):
+    await app_client.get("/api/health")
+    resp = await app_client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/health",status="200"}' in resp.text
+    assert "# TYPE http_requests_in_progress gauge" in resp.text
+    assert "/metrics" not in (await app_client.get("/openapi.json")).text
+
+
+@pytest.mark.asyncio
+async def test_search_latency_is_recorded(monkeypatch):
+    from app.services import search as search_service
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    search_service.search_cache.clear()
+    before = _sample("search_backend_duration_seconds_count", backend="memory", operation="search")
+    search_service.search_recipes("metrics-probe")
+    # Served from the cache: not a backend call
+    search_service.search_recipes("metrics-probe")
+    assert _sample(
+        "search_backend_duration_seconds_count", backend="memory", operation="search",
+    ) == before + 1
+    search_service.search_cache.clear()
+
+
+def test_search_sync_failures_are_counted(monkeypatch):
+    from app.api import tags
+
+    def fail(_tag):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(tags, "index_tag", fail)
+    before = _sample("search_sync_failures_total", index="tags")
+    tags._sync_search_index(Tag(id=1, name="metrics"))
+    assert _sample("search_sync_failures_total", index="tags") == before + 1
@@ -0,0 +1,93 @@
+"""Per-request SQL accounting: pinned query counts, Server-Timing and the slow-query log."""
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.models import (
+    Recipe, RecipeImage, RecipeIngredient, Tag, TagCategory, Ingredient, IngredientCategory,
+)
+
+# One query for the recipes, then one per eager-loaded relationship:
+# images, tags, tag categories, recipe_ingredients, ingredients, ingredient categories
+RECIPE_QUERIES = 7
+
+
+async def _seed(db_session, recipe_count: int) -> list[int]:
+    """Recipes with every relationship the recipe endpoints load populated."""
+    tag_cat = TagCategory(name="菜系")
+    ing_cat = IngredientCategory(name="主料")
+    db_session.add_all([tag_cat, ing_cat])
+    await db_session.flush()
+    tag = Tag(name="川菜", category_id=tag_cat.id)
+    ing = Ingredient(name="鸡蛋", unit="个", calorie=70, category_id=ing_cat.id)
+    db_session.add_all([tag, ing])
+    await db_session.flush()
+    ids = []
+    for i in range(recipe_count):
+        recipe = Recipe(name=f"菜谱{i}", tags=[tag])
+        db_session.add(recipe)
+        await db_session.flush()
+        db_session.add(RecipeImage(recipe_id=recipe.id, image_path=f"/uploads/{i}.jpg"))
+        db_session.add(RecipeIngredient(recipe_id=recipe.id, ingredient_id=ing.id, amount="2"))
+        ids.append(recipe.id)
+    await db_session.commit()
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_get_recipe_query_count(client, db_session, assert_num_queries):
+    [recipe_id] = await _seed(db_session, 1)
+    with assert_num_queries(RECIPE_QUERIES):
+        resp = await client.get(f"/api/recipes/{recipe_id}")
+    assert resp.status_code == 200
+    assert 'db;dur=' in resp.headers["server-timing"]
+    assert f'desc="{RECIPE_QUERIES} queries"' in resp.headers["server-timing"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("recipe_count", [1, 5])
+async def test_list_recipes_query_count_does_not_grow(client, db_session, assert_num_queries, recipe_count):
+    """Eager loading keeps the list to a fixed number of queries however many recipes there are."""
+    await _seed(db_session, recipe_count)
+    with assert_num_queries(RECIPE_QUERIES):
+        resp = await client.get("/api/recipes")
+    assert len(resp.json()) == recipe_count
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_search_time(app_client, monkeypatch):
+    """Memory-backend suggestions need no database: 0 queries, some search time."""
+    from app.services import search as search_service
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    search_service.suggest_cache.clear()
+    resp = await app_client.get("/api/search/suggest", params={"q": "server-timing"})
+    assert resp.status_code == 200
+    timing = dict(part.strip().split(";", 1) for part in resp.headers["server-timing"].split(","))
+    assert set(timing) == {"db", "search", "app", "total"}
+    assert timing["db"].endswith('desc="0 queries"')
+    search_service.suggest_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_plan(db_session, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.001)
+    with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+        await db_session.execute(select(Recipe).where(Recipe.id == 1))
+    [record] = [r for r in caplog.records if r.getMessage().startswith("Slow query")]
+    assert "FROM recipes" in record.getMessage()
+    assert "Scan" in record.getMessage()
+
+
+@pytest.mark.asyncio
+async def test_failed_explain_leaves_transaction_usable(db_session):
+    """A slow-query EXPLAIN that errors does not abort the request's transaction."""
+    from app.core import query_stats
+
+    await db_session.execute(select(Recipe).limit(1))
+    conn = await db_session.connection()
+    plan = await conn.run_sync(lambda sync_conn: query_stats._explain(sync_conn, "SELECT * FROM no_such_table", None))
+    assert plan.startswith("(EXPLAIN failed")
+    assert (await db_session.execute(select(Recipe).limit(1))).all() == []
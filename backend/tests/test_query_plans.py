@@ -0,0 +1,94 @@
+"""Query-plan regression checks: hot lookups must be served by an index."""
+import pytest
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import postgresql
+
+from app.api.ingredients import name_search
+from app.models.models import (
+    Recipe, RecipeImage, RecipeIngredient, RecipeTag,
+    Tag, TagCategory, Ingredient, IngredientCategory,
+)
+
+
+async def _seed(db_session, recipe_count: int = 50):
+    """Insert a small but realistic dataset and refresh planner statistics."""
+    tag_cat = TagCategory(name="菜系")
+    ing_cat = IngredientCategory(name="主料")
+    db_session.add_all([tag_cat, ing_cat])
+    await db_session.flush()
+    tags = [Tag(name=f"标签{i}", category_id=tag_cat.id) for i in range(10)]
+    ings = [Ingredient(name=f"食材{i}", unit="克", category_id=ing_cat.id) for i in range(20)]
+    db_session.add_all(tags + ings)
+    await db_session.flush()
+    for i in range(recipe_count):
+        recipe = Recipe(name=f"菜谱{i}", tags=[tags[i % 10], tags[(i + 3) % 10]])
+        db_session.add(recipe)
+        await db_session.flush()
+        db_session.add(RecipeImage(recipe_id=recipe.id, image_path=f"/uploads/{i}.jpg"))
+        for j in range(3):
+            db_session.add(RecipeIngredient(
+                recipe_id=recipe.id, ingredient_id=ings[(i + j) % 20].id, amount="100",
+            ))
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE"))
+
+
+def _scans(plan: dict):
+    """Yield (node type, relation) for every node in an EXPLAIN JSON plan."""
+    yield plan.get("Node Type"), plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+
+async def _explain(db_session, stmt) -> list:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    # Discourage seq scans so a usable index always wins on a small table;
+    # a seq scan in the plan then means no index exists for the predicate.
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    result = await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar()[0]["Plan"]
+    await db_session.rollback()
+    return list(_scans(plan))
+
+
+HOT_QUERIES = {
+    "recipe_ingredients by recipe": (
+        select(RecipeIngredient).where(RecipeIngredient.recipe_id.in_([1, 2, 3])),
+        "recipe_ingredients",
+    ),
+    "recipe_ingredients by ingredient": (
+        select(func.count()).where(RecipeIngredient.ingredient_id == 1),
+        "recipe_ingredients",
+    ),
+    "recipe_images by recipe": (
+        select(RecipeImage).where(RecipeImage.recipe_id.in_([1, 2, 3])),
+        "recipe_images",
+    ),
+    "recipe_tags by tag": (
+        select(func.count()).where(RecipeTag.tag_id == 1),
+        "recipe_tags",
+    ),
+    "tags by category": (
+        select(func.count()).where(Tag.category_id == 1),
+        "tags",
+    ),
+    "ingredients by category": (
+        select(func.count()).where(Ingredient.category_id == 1),
+        "ingredients",
+    ),
+    # Too short for trigrams, like 鸡蛋: narrowed on the name characters index
+    "ingredients by short name query": (
+        name_search(select(Ingredient.id), "食材"),
+        "ingredients",
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+async def test_hot_query_uses_index(db_session, name):
+    """Foreign-key lookups (selectinload, delete handlers) and short ingredient searches must not seq scan."""
+    await _seed(db_session)
+    stmt, table = HOT_QUERIES[name]
+    scans = await _explain(db_session, stmt)
+    assert ("Seq Scan", table) not in scans, f"{name} falls back to a seq scan: {scans}"
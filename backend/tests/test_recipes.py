@@ -132,3 +132,32 @@ async def test_create_recipe_with_ingredients(client, auth_headers):
     assert data["ingredients"][0]["ingredient_name"] == "西红柿B"
     assert data["ingredients"][0]["category"] == "主料"
     assert data["ingredients"][0]["category_id"] == cat_id
+
+
+@pytest.mark.asyncio
+async def test_views_are_buffered_and_flushed_in_batch(client, auth_headers, db_engine, monkeypatch):
+    """GET /api/recipes/:id counts views in memory; a flush writes them and drives ?sort=popular."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.api import recipes as recipes_api
+    from app.services.views import ViewCounter
+
+    counter = ViewCounter()
+    monkeypatch.setattr(recipes_api, "view_counter", counter)
+    first = (await client.post("/api/recipes", json={"name": "Quiet"}, headers=auth_headers)).json()
+    second = (await client.post("/api/recipes", json={"name": "Popular"}, headers=auth_headers)).json()
+    assert counter.pending() == {}
+
+    for _ in range(3):
+        await client.get(f"/api/recipes/{first['id']}")
+    assert counter.pending() == {first["id"]: 3}
+    await client.get(f"/api/recipes/{second['id']}")
+    await client.get("/api/recipes/999999")
+    assert counter.pending() == {first["id"]: 3, second["id"]: 1}
+
+    session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    assert await counter.flush(session_factory) == 2
+    assert counter.pending() == {}
+    resp = await client.get("/api/recipes?sort=popular")
+    assert [r["id"] for r in resp.json()][:2] == [first["id"], second["id"]]
+    detail = (await client.get(f"/api/recipes/{first['id']}")).json()
+    assert detail["updated_at"] == first["updated_at"]
@@ -63,3 +63,442 @@ async def test_set_synonyms(client, auth_headers):
     }, headers=auth_headers)
     assert resp.status_code == 200
     assert resp.json()["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_synonym_groups_are_stored_and_merged(client, auth_headers, db_engine, monkeypatch):
+    """Concurrent group adds all land; groups sharing a word merge; removing one keeps the others."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.core.config import settings
+    from app.services import search as search_service
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "SEARCH_SYNONYMS_FILE", "")
+    memory_index.update_synonyms({})
+    session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def add(words):
+        async with session_factory() as db:
+            return await search_service.add_synonym_group(db, words)
+
+    await asyncio.gather(add(["番茄", "西红柿"]), add(["土豆", "马铃薯"]), add(["青椒", "菜椒"]))
+    assert set(memory_index.get_synonyms()) == {"番茄", "西红柿", "土豆", "马铃薯", "青椒", "菜椒"}
+
+    resp = await client.post("/api/search/synonyms/groups", json={"words": [" 西红柿", "番茄"]}, headers=auth_headers)
+    assert resp.json()["changed"] is False
+    resp = await client.post("/api/search/synonyms/groups", json={"words": ["马铃薯", "洋芋"]}, headers=auth_headers)
+    assert resp.json()["changed"] is True
+    assert memory_index.get_synonyms()["土豆"] == ["洋芋", "马铃薯"]
+
+    resp = await client.delete("/api/search/synonyms/groups?words=土豆&words=马铃薯", headers=auth_headers)
+    assert resp.json()["changed"] is True
+    synonyms = memory_index.get_synonyms()
+    assert "土豆" not in synonyms
+    assert synonyms["洋芋"] == ["马铃薯"]
+    assert synonyms["番茄"] == ["西红柿"]
+    memory_index.update_synonyms({})
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_database(client, auth_headers, monkeypatch):
+    """GET /api/search should answer from PostgreSQL when MeiliSearch fails."""
+    from app.services import search as search_service
+
+    def meili_down(*args, **kwargs):
+        raise ConnectionError("meili down")
+
+    monkeypatch.setattr(search_service, "search_recipes", meili_down)
+    search_service.meili_breaker.reset()
+    tag_resp = await client.post("/api/tags", json={"name": "家常"}, headers=auth_headers)
+    tag_id = tag_resp.json()["id"]
+    await client.post("/api/recipes", json={"name": "西红柿炒鸡蛋", "tag_ids": [tag_id]}, headers=auth_headers)
+    await client.post("/api/recipes", json={"name": "红烧排骨"}, headers=auth_headers)
+
+    resp = await client.get("/api/search?q=西红柿")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 1
+    assert data["hits"][0]["name"] == "西红柿炒鸡蛋"
+    assert data["hits"][0]["tags"] == ["家常"]
+
+    resp = await client.get("/api/search?q=&tag=家常")
+    assert [h["name"] for h in resp.json()["hits"]] == ["西红柿炒鸡蛋"]
+    search_service.meili_breaker.reset()
+
+
+@pytest.mark.asyncio
+async def test_database_calorie_filter_matches_indexed_calories(client, auth_headers, monkeypatch):
+    """Amounts float() would accept but the SQL pattern does not (".5", "1e2", "+2") count as zero in both."""
+    from app.services import search as search_service
+
+    def meili_down(*args, **kwargs):
+        raise ConnectionError("meili down")
+
+    monkeypatch.setattr(search_service, "search_recipes", meili_down)
+    search_service.meili_breaker.reset()
+    ing_resp = await client.post(
+        "/api/ingredients", json={"name": "米饭C", "unit": "碗", "calorie": 100}, headers=auth_headers,
+    )
+    for amount in ("2", " 1.5 ", ".5", "1e2", "+2", "适量"):
+        await client.post("/api/recipes", json={
+            "name": f"饭{amount}", "ingredients": [{"ingredient_id": ing_resp.json()["id"], "amount": amount}],
+        }, headers=auth_headers)
+
+    resp = await client.get("/api/search", params={"q": "饭", "min_calories": 1, "limit": 20})
+    assert sorted(h["calories"] for h in resp.json()["hits"]) == [150, 200]
+    resp = await client.get("/api/search", params={"q": "饭", "max_calories": 0, "limit": 20})
+    assert [h["calories"] for h in resp.json()["hits"]] == [0, 0, 0, 0]
+    search_service.meili_breaker.reset()
+
+
+@pytest.mark.asyncio
+async def test_meili_calls_run_off_the_event_loop(monkeypatch):
+    """The sync Meili client must not block other requests in the worker."""
+    import threading
+    from app.core.config import settings
+    from app.services import search as search_service
+
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def fake_search(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return {"hits": [], "estimatedTotalHits": 0}
+
+    def fake_multi(query, limits):
+        threads.append(threading.get_ident())
+        return {}
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "meili")
+    monkeypatch.setattr(search_service, "search_recipes", fake_search)
+    monkeypatch.setattr(search_service, "multi_search", fake_multi)
+    search_service.meili_breaker.reset()
+    await search_service.search_with_fallback(None, "番茄")
+    await search_service.multi_search_with_fallback(None, "番茄", {search_service.INDEX_NAME: 5})
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    """The breaker opens after repeated failures and half-opens after the timeout."""
+    from app.core import circuit_breaker
+    from app.core.circuit_breaker import CircuitBreaker
+
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    now[0] += 10
+    assert breaker.allow()       # single trial request
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_ttl_cache_evicts_lru_and_expired(monkeypatch):
+    """TTLCache drops the least recently used entry and expired entries."""
+    from app.core import cache
+    from app.core.cache import TTLCache
+
+    now = [0.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = TTLCache(maxsize=2, ttl=10)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1
+    c.set("c", 3)  # evicts "b", the least recently used
+    assert c.get("b") is None
+    now[0] = 11
+    assert c.get("a") is None
+    assert c.stats()["hits"] == 1
+    assert c.stats()["misses"] == 2
+
+
+def test_search_cache_invalidated_by_index_writes(monkeypatch):
+    """Cached results are reused until an index write bumps the index version."""
+    from app.core.config import settings
+    from app.services import search as search_service
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    memory_index.clear()
+    search_service.search_cache.clear()
+    search_service.index_recipe(1, "西红柿炒鸡蛋", [], ["鸡蛋"])
+    first = search_service.search_recipes("鸡蛋")
+    hits_before = search_service.search_cache.hits
+    assert search_service.search_recipes("  鸡蛋 ") is first
+    assert search_service.search_cache.hits == hits_before + 1
+
+    search_service.index_recipe(2, "蛋炒饭", [], ["鸡蛋"])
+    assert search_service.search_recipes("鸡蛋")["estimatedTotalHits"] == 2
+    memory_index.clear()
+    search_service.search_cache.clear()
+
+
+def test_search_cache_skipped_while_meili_write_is_pending(monkeypatch):
+    """Results read before Meili applies a write are not cached under the new version."""
+    import threading
+    from types import SimpleNamespace
+    from app.core.config import settings
+    from app.services import search as search_service
+
+    applied = threading.Event()
+    documents = {1: {"id": 1, "name": "西红柿炒鸡蛋"}}
+
+    class FakeIndex:
+        def add_documents(self, docs):
+            return SimpleNamespace(task_uid=7)
+
+        def search(self, query, params):
+            hits = list(documents.values())
+            return {"hits": hits, "estimatedTotalHits": len(hits)}
+
+    class FakeClient:
+        def index(self, name):
+            return FakeIndex()
+
+        def wait_for_task(self, task_uid, timeout_in_ms=None):
+            applied.wait(5)
+            documents[2] = {"id": 2, "name": "蛋炒饭"}
+            return SimpleNamespace(status="succeeded", error=None)
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "meili")
+    monkeypatch.setattr(search_service, "get_meili_client", lambda: FakeClient())
+    search_service.search_cache.clear()
+
+    search_service.index_recipe(2, "蛋炒饭", [], ["鸡蛋"])
+    version = search_service.get_index_version()
+    # Task 7 still enqueued: Meili answers with the old documents, which must not be cached
+    assert search_service.search_recipes("鸡蛋")["estimatedTotalHits"] == 1
+    assert len(search_service.search_cache) == 0
+
+    applied.set()
+    search_service._task_waiter.submit(lambda: None).result(timeout=5)
+    assert search_service.get_index_version() == version + 1
+    assert search_service.search_recipes("鸡蛋")["estimatedTotalHits"] == 2
+    assert len(search_service.search_cache) == 1
+    search_service.search_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_hydrate_card(client, auth_headers, monkeypatch):
+    """GET /api/search?hydrate=card returns card data in search ranking order."""
+    from app.core.config import settings
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    memory_index.clear()
+    cat_resp = await client.post("/api/tags/categories", json={"name": "菜系H"}, headers=auth_headers)
+    tag_resp = await client.post(
+        "/api/tags", json={"name": "家常H", "category_id": cat_resp.json()["id"]}, headers=auth_headers,
+    )
+    ing_resp = await client.post(
+        "/api/ingredients", json={"name": "鸡蛋H", "unit": "个", "calorie": 70}, headers=auth_headers,
+    )
+    await client.post("/api/recipes", json={
+        "name": "蛋饼",
+        "tag_ids": [tag_resp.json()["id"]],
+        "ingredients": [{"ingredient_id": ing_resp.json()["id"], "amount": "2"}],
+    }, headers=auth_headers)
+    await client.post("/api/recipes", json={"name": "蛋炒饭饭"}, headers=auth_headers)
+
+    resp = await client.get("/api/search?q=蛋&hydrate=card")
+    assert resp.status_code == 200
+    hits = resp.json()["hits"]
+    assert [h["name"] for h in hits] == ["蛋饼", "蛋炒饭饭"]
+    assert hits[0]["calories"] == 140
+    assert hits[0]["cover_image"] is None
+    assert hits[0]["tags"][0]["color"] == cat_resp.json()["color"]
+    memory_index.clear()
+
+
+def test_build_meili_filter_escapes_values():
+    """Filter values are quoted and escaped; OR groups become nested lists."""
+    from app.services.search import SearchFilters, build_meili_filter
+
+    filters = SearchFilters(
+        tags=('川菜', 'x" OR tags = "y'), tag_mode="or",
+        ingredients=("鸡蛋",), min_calories=100, max_calories=500,
+    )
+    assert build_meili_filter(filters) == [
+        ['tags = "川菜"', 'tags = "x\\" OR tags = \\"y"'],
+        'main_ingredients = "鸡蛋"',
+        "calories >= 100",
+        "calories <= 500",
+    ]
+    assert build_meili_filter(SearchFilters()) is None
+
+
+@pytest.mark.asyncio
+async def test_single_flight_collapses_concurrent_calls():
+    """Concurrent calls for one key share a single execution."""
+    from app.core.cache import SingleFlight
+
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["hit"]
+
+    results = await asyncio.gather(*(flight.do("鸡", fetch) for _ in range(5)))
+    assert results == [["hit"]] * 5
+    assert len(calls) == 1
+    assert len(flight) == 0
+    await flight.do("鸡", fetch)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_suggest_limits_share_one_backend_call(monkeypatch):
+    """Concurrent suggestions for one prefix with different limits make one Meili call."""
+    from app.core.config import settings
+    from app.services import search as search_service
+
+    calls = []
+
+    def fake_suggest(prefix, limit):
+        calls.append(limit)
+        return [{"id": i, "name": f"番茄{i}", "highlight": ""} for i in range(limit)]
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "meili")
+    monkeypatch.setattr(search_service, "suggest_recipes", fake_suggest)
+    search_service.suggest_cache.clear()
+    results = await asyncio.gather(*(search_service.suggest_with_fallback(None, "番茄", n) for n in (5, 8, 20)))
+    assert [len(hits) for hits in results] == [5, 8, 20]
+    assert len(await search_service.suggest_with_fallback(None, "番茄 ", 3)) == 3
+    assert calls == [search_service.SUGGEST_MAX_LIMIT]
+    search_service.suggest_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_suggest_returns_lean_highlighted_hits(client, auth_headers, monkeypatch):
+    """GET /api/search/suggest returns only id, name and the highlighted name."""
+    from app.core.config import settings
+    from app.services import search as search_service
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    memory_index.clear()
+    search_service.suggest_cache.clear()
+    await client.post("/api/recipes", json={"name": "红烧肉", "description": "长描述"}, headers=auth_headers)
+
+    resp = await client.get("/api/search/suggest?q=红烧")
+    assert resp.status_code == 200
+    assert "max-age" in resp.headers["cache-control"]
+    hits = resp.json()["hits"]
+    assert len(hits) == 1
+    assert set(hits[0]) == {"id", "name", "highlight"}
+    assert hits[0]["highlight"] == "<em>红烧</em>肉"
+    assert (await client.get("/api/search/suggest?q=")).json() == {"hits": []}
+    memory_index.clear()
+    search_service.suggest_cache.clear()
+
+
+def test_settings_diff_only_reports_changes():
+    """Index setup only sends settings that differ; set-like settings ignore order."""
+    from app.services.search import INDEX_NAME, INDEX_SETTINGS, settings_diff
+
+    desired = INDEX_SETTINGS[INDEX_NAME]
+    current = {
+        "searchableAttributes": list(desired["searchableAttributes"]),
+        "filterableAttributes": [{"attributePatterns": ["calories", "id", "tags", "main_ingredients"]}],
+        "sortableAttributes": ["views", "calories", "name"],
+        "rankingRules": list(desired["rankingRules"]),
+    }
+    assert settings_diff(current, desired) == {}
+    current["searchableAttributes"] = ["tags", "name", "main_ingredients"]
+    current["sortableAttributes"] = []
+    assert settings_diff(current, desired) == {
+        "searchableAttributes": desired["searchableAttributes"],
+        "sortableAttributes": desired["sortableAttributes"],
+    }
+    assert settings_diff({}, desired) == desired
+
+
+def test_setup_index_raises_when_meili_rejects_settings(monkeypatch):
+    """A failed settings task is an error, not an applied change."""
+    from types import SimpleNamespace
+    from app.core.config import settings
+    from app.services import search as search_service
+
+    class FakeMeili:
+        def index(self, name):
+            return self
+
+        def get_settings(self):
+            return {}
+
+        def update_settings(self, diff):
+            return SimpleNamespace(task_uid=3)
+
+        def wait_for_task(self, uid, timeout_in_ms=None):
+            return SimpleNamespace(status="failed", error={"code": "invalid_settings_ranking_rules"})
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "meili")
+    monkeypatch.setattr(search_service, "get_meili_client", lambda: FakeMeili())
+    with pytest.raises(search_service.SearchSetupError, match="invalid_settings_ranking_rules"):
+        search_service.setup_index()
+
+
+def test_rebuild_removes_documents_deleted_from_database(monkeypatch):
+    """Reindexing deletes ids Meili still has but the database no longer does."""
+    from types import SimpleNamespace
+    from app.core.config import settings
+    from app.services import search as search_service
+
+    stored = {i: {"id": i} for i in range(1, 6)}
+    deleted = []
+
+    class FakeIndex:
+        def add_documents_in_batches(self, docs, batch_size=1000):
+            stored.update({d["id"]: d for d in docs})
+            return [SimpleNamespace(task_uid=10)]
+
+        def get_documents(self, params):
+            ids = sorted(stored)[params["offset"]:params["offset"] + params["limit"]]
+            return SimpleNamespace(results=[SimpleNamespace(id=i) for i in ids], total=len(stored))
+
+        def delete_documents(self, ids):
+            deleted.extend(ids)
+            return SimpleNamespace(task_uid=11)
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "meili")
+    monkeypatch.setattr(search_service, "get_meili_client", lambda: SimpleNamespace(index=lambda name: FakeIndex()))
+    task_uid = search_service.replace_meili_documents("tags", [{"id": 2}, {"id": 4}, {"id": 6}], page_size=2)
+    assert sorted(deleted) == [1, 3, 5]
+    assert task_uid == 11
+
+    deleted.clear()
+    assert search_service.replace_meili_documents("tags", [{"id": i} for i in range(1, 7)]) == 10
+    assert deleted == []
+
+
+def test_view_counts_skip_recipes_missing_from_meili(monkeypatch):
+    """A view count for an unindexed recipe must not create a nameless stub document."""
+    from types import SimpleNamespace
+    from app.core.config import settings
+    from app.services import search as search_service
+
+    indexed = {1, 3}
+    calls = {}
+
+    class FakeIndex:
+        def get_documents(self, params):
+            calls["filter"] = params["filter"]
+            return SimpleNamespace(results=[SimpleNamespace(id=i) for i in sorted(indexed)])
+
+        def update_documents(self, docs):
+            calls["docs"] = docs
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "meili")
+    monkeypatch.setattr(search_service, "get_meili_client", lambda: SimpleNamespace(index=lambda name: FakeIndex()))
+    search_service.update_view_counts({1: 10, 2: 20, 3: 30})
+    assert calls["filter"] == "id IN [1, 2, 3]"
+    assert calls["docs"] == [{"id": 1, "views": 10}, {"id": 3, "views": 30}]
@@ -0,0 +1,221 @@
+"""In-process search backend tests."""
+import pytest
+
+from app.core.config import settings
+from app.services.search import SearchFilters, expand_synonyms
+from app.services.search_memory import MemorySearchIndex
+
+
+def _index() -> MemorySearchIndex:
+    index = MemorySearchIndex()
+    index.add_documents([
+        {"id": 1, "name": "西红柿炒鸡蛋", "tags": ["家常菜", "快手菜"], "main_ingredients": ["西红柿", "鸡蛋"]},
+        {"id": 2, "name": "番茄牛腩煲", "tags": ["家常菜", "汤羹"], "main_ingredients": ["牛腩", "西红柿", "土豆"]},
+        {"id": 3, "name": "麻婆豆腐", "tags": ["川菜"], "main_ingredients": ["嫩豆腐", "肉末"]},
+        {"id": 4, "name": "蛋炒饭", "tags": ["快手菜"], "main_ingredients": ["鸡蛋", "米饭"]},
+    ])
+    return index
+
+
+def _ids(result: dict) -> list[int]:
+    return [h["id"] for h in result["hits"]]
+
+
+def test_cjk_substring_match():
+    """Multi-character CJK queries match substrings of any searchable field."""
+    index = _index()
+    assert _ids(index.search("豆腐")) == [3]
+    assert _ids(index.search("牛")) == [2]
+    assert index.search("豆腐炒")["estimatedTotalHits"] == 0
+
+
+def test_ranking_name_before_ingredients_before_tags():
+    """Name hits rank above main_ingredients hits, which rank above tag hits."""
+    index = _index()
+    index.add_documents([{"id": 5, "name": "凉拌黄瓜", "tags": ["鸡蛋控"], "main_ingredients": ["黄瓜"]}])
+    assert _ids(index.search("鸡蛋")) == [1, 4, 5]
+
+
+def test_all_terms_must_match():
+    index = _index()
+    assert _ids(index.search("鸡蛋 快手")) == [1, 4]
+    assert _ids(index.search("鸡蛋 汤羹")) == []
+
+
+def test_synonyms_are_bidirectional():
+    index = _index()
+    index.update_synonyms(expand_synonyms({"番茄": ["西红柿"]}))
+    assert set(_ids(index.search("番茄"))) == {1, 2}
+    assert set(_ids(index.search("西红柿"))) == {1, 2}
+
+
+def test_tag_filter_and_pagination():
+    index = _index()
+    assert _ids(index.search("", filters=SearchFilters(tags=("家常菜",)))) == [1, 2]
+    result = index.search("", limit=2, offset=1)
+    assert _ids(result) == [2, 3]
+    assert result["estimatedTotalHits"] == 4
+
+
+def test_update_and_delete_documents():
+    index = _index()
+    index.add_documents([{"id": 3, "name": "家常豆腐", "tags": [], "main_ingredients": []}])
+    assert _ids(index.search("麻婆")) == []
+    assert _ids(index.search("家常豆腐")) == [3]
+    index.delete_document(3)
+    assert _ids(index.search("豆腐")) == []
+    assert len(index) == 3
+
+
+@pytest.mark.asyncio
+async def test_search_api_with_memory_backend(client, auth_headers, monkeypatch):
+    """With SEARCH_BACKEND=memory, writes are searchable immediately."""
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    memory_index.clear()
+    await client.post("/api/recipes", json={"name": "西红柿炒鸡蛋"}, headers=auth_headers)
+    resp = await client.post("/api/recipes", json={"name": "红烧排骨"}, headers=auth_headers)
+    recipe_id = resp.json()["id"]
+
+    resp = await client.get("/api/search?q=排骨")
+    assert resp.status_code == 200
+    assert [h["id"] for h in resp.json()["hits"]] == [recipe_id]
+
+    await client.delete(f"/api/recipes/{recipe_id}", headers=auth_headers)
+    resp = await client.get("/api/search?q=排骨")
+    assert resp.json()["total"] == 0
+    memory_index.clear()
+
+
+def test_filters_and_facets():
+    """Multi-tag AND/OR, ingredient and calorie filters, with facet counts."""
+    index = _index()
+    index.add_documents([
+        {"id": 1, "name": "西红柿炒鸡蛋", "tags": ["家常菜", "快手菜"], "main_ingredients": ["西红柿", "鸡蛋"], "calories": 300},
+        {"id": 4, "name": "蛋炒饭", "tags": ["快手菜"], "main_ingredients": ["鸡蛋", "米饭"], "calories": 600},
+    ])
+    both = SearchFilters(tags=("家常菜", "快手菜"))
+    either = SearchFilters(tags=("家常菜", "快手菜"), tag_mode="or")
+    assert set(_ids(index.search("", filters=both))) == {1}
+    assert set(_ids(index.search("", filters=either))) == {1, 2, 4}
+    assert set(_ids(index.search("", filters=SearchFilters(ingredients=("鸡蛋",))))) == {1, 4}
+    assert set(_ids(index.search("", filters=SearchFilters(min_calories=100, max_calories=400)))) == {1}
+
+    result = index.search("鸡蛋", facets=["tags", "main_ingredients"])
+    assert result["facetDistribution"]["tags"] == {"家常菜": 1, "快手菜": 2}
+    assert result["facetDistribution"]["main_ingredients"]["鸡蛋"] == 2
+
+
+def test_ingredient_index_ranks_name_before_category():
+    from app.services.search_memory import NAME_CATEGORY_WEIGHTS
+
+    index = MemorySearchIndex(NAME_CATEGORY_WEIGHTS)
+    index.add_documents([
+        {"id": 1, "name": "猪肉", "unit": "g", "category": "主料"},
+        {"id": 2, "name": "主料汤", "unit": "ml", "category": "调料"},
+        {"id": 3, "name": "鸡蛋", "unit": "个", "category": "主料"},
+    ])
+    assert _ids(index.search("主料")) == [2, 1, 3]
+    assert _ids(index.search("猪")) == [1]
+
+
+@pytest.mark.asyncio
+async def test_multi_search_api_with_memory_backend(client, auth_headers, monkeypatch):
+    """/api/search/multi returns recipes, ingredients and tags with per-group limits."""
+    from app.services.search_memory import memory_index, memory_ingredient_index, memory_tag_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    for index in (memory_index, memory_ingredient_index, memory_tag_index):
+        index.clear()
+    await client.post("/api/ingredients", json={"name": "鸡蛋", "unit": "个"}, headers=auth_headers)
+    await client.post("/api/ingredients", json={"name": "鸡腿", "unit": "个"}, headers=auth_headers)
+    await client.post("/api/tags", json={"name": "鸡肉菜"}, headers=auth_headers)
+    await client.post("/api/recipes", json={"name": "宫保鸡丁"}, headers=auth_headers)
+
+    resp = await client.get("/api/search/multi?q=鸡&ingredients_limit=1&tags_limit=0")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [h["name"] for h in data["recipes"]["hits"]] == ["宫保鸡丁"]
+    assert len(data["ingredients"]["hits"]) == 1
+    assert data["ingredients"]["total"] == 2
+    assert data["tags"] == {"hits": [], "total": 0}
+    for index in (memory_index, memory_ingredient_index, memory_tag_index):
+        index.clear()
+
+
+def test_synonym_groups_merge_transitively():
+    """Groups sharing a word merge, so {A, B} and {B, C} link A with C."""
+    from app.services.search import expand_groups
+
+    assert expand_groups([["土豆", "马铃薯"], ["番茄", "西红柿"], [" 马铃薯", "洋芋"], ["葱"]]) == {
+        "土豆": ["洋芋", "马铃薯"], "洋芋": ["土豆", "马铃薯"], "马铃薯": ["土豆", "洋芋"],
+        "番茄": ["西红柿"], "西红柿": ["番茄"],
+    }
+
+
+def test_text_fields_searchable_with_snippets(monkeypatch):
+    """Description/steps/tips are searched as plain text below the name and come back as a snippet."""
+    from app.services import search as search_service
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    memory_index.clear()
+    search_service.index_recipe(
+        1, "白切鸡", ["粤菜"], ["鸡"], 300,
+        description="<p>经典<b>粤菜</b></p>", steps="1. 整鸡**焯水**去血沫 ![图](/uploads/a.jpg)",
+    )
+    search_service.index_recipe(2, "焯水白菜", [], ["白菜"])
+
+    result = search_service.search_recipes("焯水")
+    assert _ids(result) == [2, 1]
+    hit = result["hits"][1]
+    assert set(hit) == {"id", "name", "tags", "main_ingredients", "calories", "snippet"}
+    assert hit["snippet"] == "1. 整鸡<em>焯水</em>去血沫"
+    memory_index.clear()
+
+
+def test_snippets_and_highlights_escape_stored_markup():
+    """Escaped markup in stored text must not come back as live HTML around the highlight tags."""
+    from app.services import search as search_service
+
+    text = search_service.plain_text("<p>番茄 &lt;img src=x onerror=alert(1)&gt;</p>")
+    assert search_service.crop_snippet(text, "番茄") == "<em>番茄</em> &lt;img src=x onerror=alert(1)"
+    assert search_service.crop_snippet(text, "") == "番茄 &lt;img src=x onerror=alert(1)"
+    assert search_service._suggestion({"id": 1, "name": "<b>番茄</b>炒蛋"}, "番茄")["highlight"] == (
+        "&lt;b&gt;<em>番茄</em>&lt;/b&gt;炒蛋"
+    )
+    meili_hit = {"_formatted": {"description": f"<script>x</script>{search_service.MEILI_PRE_TAG}番茄"
+                                               f"{search_service.MEILI_POST_TAG}"}}
+    assert search_service._meili_snippet(meili_hit) == "&lt;script&gt;x&lt;/script&gt;<em>番茄</em>"
+
+
+@pytest.mark.asyncio
+async def test_ingredient_calorie_change_reindexes_recipes(client, auth_headers, monkeypatch):
+    """Recipe calories in the index follow an edit of an ingredient's calorie value."""
+    from app.services import search as search_service
+    from app.services.search_memory import memory_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    memory_index.clear()
+    search_service.search_cache.clear()
+    cat = await client.post("/api/ingredients/categories", json={"name": "主料"}, headers=auth_headers)
+    ing = await client.post("/api/ingredients", json={
+        "name": "鸡蛋", "unit": "个", "calorie": 70, "category_id": cat.json()["id"],
+    }, headers=auth_headers)
+    ing_id = ing.json()["id"]
+    await client.post("/api/recipes", json={
+        "name": "蒸蛋", "ingredients": [{"ingredient_id": ing_id, "amount": "2"}],
+    }, headers=auth_headers)
+
+    resp = await client.get("/api/search", params={"q": "", "max_calories": 150})
+    assert [h["calories"] for h in resp.json()["hits"]] == [140]
+
+    resp = await client.put(f"/api/ingredients/{ing_id}", json={"calorie": 90}, headers=auth_headers)
+    assert resp.status_code == 200
+    resp = await client.get("/api/search", params={"q": "", "max_calories": 150})
+    assert resp.json()["hits"] == []
+    resp = await client.get("/api/search", params={"q": "", "min_calories": 180})
+    assert [h["calories"] for h in resp.json()["hits"]] == [180]
+    memory_index.clear()
+    search_service.search_cache.clear()
@@ -0,0 +1,39 @@
+"""Production entrypoint (scripts/serve.py): worker count against the connection budget."""
+import os
+import sys
+
+import pytest
+
+from app.core.config import settings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import serve  # noqa: E402
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 90)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+
+
+def test_default_workers_capped_to_connection_budget(pools):
+    """One worker per CPU is cut down to what 90 connections allow at 21 per worker."""
+    assert serve.fit_connection_budget(2) == 2
+    assert serve.fit_connection_budget(16) == 4
+
+
+def test_explicit_workers_over_budget_stop_startup(pools, monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 8)
+    with pytest.raises(SystemExit, match="DB_MAX_CONNECTIONS=90"):
+        serve.fit_connection_budget(8)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 0)
+    assert serve.fit_connection_budget(8) == 8
+
+
+def test_pool_larger_than_budget_stops_startup(pools, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 100)
+    with pytest.raises(SystemExit):
+        serve.fit_connection_budget(1)
@@ -0,0 +1,48 @@
+"""Cold-start cost of importing the app.
+
+Each check runs in a fresh interpreter, since this process already has
+everything imported.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# Cumulative `import app.main` time; override for slow CI machines
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2000"))
+# Only needed by some requests or one search backend; must load on first use
+LAZY_MODULES = ["meilisearch", "jose", "PIL", "pillow_heif", "passlib", "alembic"]
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+
+
+def _import_time_ms() -> float:
+    """`import app.main` cumulative time from `python -X importtime`."""
+    stderr = _python("-X", "importtime", "-c", "import app.main").stderr
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _self, cumulative, name = line.split("|")
+        if name.strip() == "app.main":
+            return int(cumulative) / 1000
+    raise AssertionError("app.main missing from -X importtime output")
+
+
+def test_heavy_dependencies_load_lazily():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    assert _python("-c", code).stdout.strip() == ""
+
+
+def test_import_time_budget():
+    # Best of three, to ride out scheduler noise
+    elapsed = min(_import_time_ms() for _ in range(3))
+    assert elapsed < IMPORT_TIME_BUDGET_MS, (
+        f"import app.main took {elapsed:.0f}ms, budget {IMPORT_TIME_BUDGET_MS:.0f}ms"
+    )
@@ -103,3 +103,24 @@ async def test_delete_tag_category_in_use(client, auth_headers):
     await client.post("/api/tags", json={"name": "引用标签", "category_id": cat_id}, headers=auth_headers)
     resp = await client.delete(f"/api/tags/categories/{cat_id}", headers=auth_headers)
     assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_category_color_backfill_reindexes_tags(client, auth_headers, db_session, monkeypatch):
+    """Tag documents carry the category color, so assigning one re-indexes the category's tags."""
+    from app.core.config import settings
+    from app.models.models import TagCategory
+    from app.services.search_memory import memory_tag_index
+
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    cat_id = (await client.post("/api/tags/categories", json={"name": "无色"}, headers=auth_headers)).json()["id"]
+    tag_id = (await client.post("/api/tags", json={"name": "素食", "category_id": cat_id}, headers=auth_headers)).json()["id"]
+    cat = await db_session.get(TagCategory, cat_id)
+    cat.color = None
+    await db_session.commit()
+    memory_tag_index.update_documents([{"id": tag_id, "color": None}])
+
+    colors = {c["id"]: c["color"] for c in (await client.get("/api/tags/categories")).json()}
+    assert colors[cat_id]
+    assert memory_tag_index._docs[tag_id]["color"] == colors[cat_id]
+    memory_tag_index.delete_document(tag_id)